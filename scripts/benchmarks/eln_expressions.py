@@ -0,0 +1,100 @@
+"""
+Speed benchmark for the temperature and duration parsing of the Sciformation ELN.
+
+Formats the temperature and duration of every experiment of the cleaned MOCOF-1
+ELN once with sympy.sympify (the former implementation) and once with the cached
+arithmetic evaluator used by sciformation2mofsy, checks that both give the same
+values and reports the time per experiment. It also measures in fresh interpreters
+how long importing sympy takes and checks that sciformation2mofsy no longer
+imports it.
+
+Usage:
+    uv run scripts/benchmarks/eln_expressions.py
+"""
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from sympy import sympify
+
+from fair_synthesis.formatting.arithmetic import evaluate_arithmetic
+from fair_synthesis.formatting.sciformation2mofsy import format_temperature, format_time
+from fair_synthesis.generated_apis.sciformation_eln_cleaned_data_structure import SciformationCleanedELNSchema
+
+BASE = Path(__file__).parents[2]  # repository root
+eln_path = BASE / "data" / "MOCOF-1" / "converted" / "sciformation_eln_cleaned.json"
+REPEAT = 10
+IMPORT_REPEAT = 5
+
+
+def sympify_temperature(temp: str) -> float:
+    temperature_string = temp.replace("RT", "25")
+    if "->" in temperature_string:
+        return float(sympify(temperature_string.split("->")[1]))
+    return round(float(sympify(temperature_string)), 2)
+
+
+def sympify_duration(duration: str) -> float:
+    return float(sympify(duration))
+
+
+def best_of(func, repeat: int = REPEAT) -> float:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def import_time(statement: str) -> float:
+    """Best wall time of running the import statement in a fresh interpreter."""
+    code = (f"import time; start = time.perf_counter(); {statement}; "
+            f"print(time.perf_counter() - start)")
+    return min(float(subprocess.run([sys.executable, "-c", code], check=True,
+                                    capture_output=True, text=True).stdout)
+               for _ in range(IMPORT_REPEAT))
+
+
+if __name__ == "__main__":
+    with open(eln_path) as f:
+        experiments = SciformationCleanedELNSchema.from_dict(json.load(f)).experiments
+
+    def via_sympify():
+        for experiment in experiments:
+            sympify_temperature(experiment.temperature)
+            sympify_duration(experiment.duration)
+
+    def via_evaluator():
+        for experiment in experiments:
+            format_temperature(experiment.temperature)
+            format_time(experiment.duration, experiment.duration_unit)
+
+    for experiment in experiments:
+        assert sympify_temperature(experiment.temperature) == \
+            format_temperature(experiment.temperature).value, experiment.code
+        assert sympify_duration(experiment.duration) == \
+            evaluate_arithmetic(experiment.duration), experiment.code
+
+    sympify_time = best_of(via_sympify)
+    evaluate_arithmetic.cache_clear()
+    cold_time = best_of(via_evaluator, repeat=1)
+    warm_time = best_of(via_evaluator)
+    n = len(experiments)
+    print(f"MOCOF-1 ELN ({n} experiments), temperature + duration, best of {REPEAT}:")
+    print(f"  sympify            : {sympify_time / n * 1e6:8.1f} µs/experiment")
+    print(f"  evaluator (cold)   : {cold_time / n * 1e6:8.1f} µs/experiment")
+    print(f"  evaluator (cached) : {warm_time / n * 1e6:8.1f} µs/experiment")
+    print(f"  speedup (cached)   : {sympify_time / warm_time:8.1f}x")
+
+    loaded = subprocess.run(
+        [sys.executable, "-c",
+         "import sys, fair_synthesis.formatting.sciformation2mofsy; print('sympy' in sys.modules)"],
+        check=True, capture_output=True, text=True).stdout.strip()
+    print(f"Import time, best of {IMPORT_REPEAT} fresh interpreters:")
+    print(f"  import sympy                         : {import_time('import sympy') * 1000:8.1f} ms")
+    print(f"  import formatting.sciformation2mofsy : "
+          f"{import_time('import fair_synthesis.formatting.sciformation2mofsy') * 1000:8.1f} ms"
+          f" (sympy loaded: {loaded})")
@@ -0,0 +1,91 @@
+"""
+Startup-time check for the fair_synthesis entry points.
+
+Imports format_and_serialize_all.py and fair_synthesis.formatting.mofsy_api in
+fresh interpreters, reports the best wall time of several runs and fails (exit
+code 1) if an import exceeds its budget or loads one of the heavy dependencies
+that are only needed by single functions (openai, pubchempy, starfile, yaml,
+sympy). Pass --importtime to print the slowest modules of each import as
+reported by python -X importtime.
+
+Usage:
+    uv run scripts/benchmarks/import_time.py [--importtime]
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+BASE = Path(__file__).parents[2]  # repository root
+SCRIPTS_DIR = BASE / "scripts"
+REPEAT = 5
+
+# Deferred to first use, importing any of these at startup is a regression
+DEFERRED_MODULES = ("openai", "pubchempy", "starfile", "yaml", "sympy")
+
+# Budgets in seconds, with headroom over the measured time for slower machines
+IMPORT_BUDGETS = {
+    "format_and_serialize_all": 0.8,
+    "fair_synthesis.formatting.mofsy_api": 0.2,
+}
+
+_MEASURE = """
+import sys, time
+sys.path.insert(0, {scripts_dir!r})
+start = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start
+print(duration)
+print(",".join(name for name in {deferred!r} if name in sys.modules))
+"""
+
+
+def measure_import(module: str):
+    """(best import time in seconds, deferred modules that were loaded) in fresh interpreters."""
+    code = _MEASURE.format(scripts_dir=str(SCRIPTS_DIR), module=module, deferred=DEFERRED_MODULES)
+    durations = []
+    loaded = set()
+    for _ in range(REPEAT):
+        output = subprocess.run([sys.executable, "-c", code], check=True,
+                                capture_output=True, text=True).stdout.splitlines()
+        durations.append(float(output[0]))
+        loaded.update(name for name in output[1].split(",") if name)
+    return min(durations), sorted(loaded)
+
+
+def print_slowest_imports(module: str, count: int = 10):
+    code = f"import sys; sys.path.insert(0, {str(SCRIPTS_DIR)!r}); import {module}"
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", code], check=True,
+                            capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    for cumulative, name in sorted(rows, reverse=True)[:count]:
+        print(f"    {cumulative / 1000:8.1f} ms {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the import time of the fair_synthesis entry points.")
+    parser.add_argument("--importtime", action="store_true",
+                        help="Print the slowest modules of every import.")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"Import time, best of {REPEAT} fresh interpreters:")
+    for module, budget in IMPORT_BUDGETS.items():
+        duration, loaded = measure_import(module)
+        problems = []
+        if duration > budget:
+            problems.append(f"over budget of {budget * 1000:.0f} ms")
+        if loaded:
+            problems.append(f"imports {', '.join(loaded)} at startup")
+        failed = failed or bool(problems)
+        status = "FAIL: " + "; ".join(problems) if problems else "ok"
+        print(f"  {module:40s} {duration * 1000:8.1f} ms  {status}")
+        if args.importtime:
+            print_slowest_imports(module)
+    if failed:
+        raise SystemExit(1)
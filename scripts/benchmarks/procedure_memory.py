@@ -0,0 +1,52 @@
+"""
+Memory benchmark for the MOFSY class structures.
+
+Loads the full MOCOF-1 procedure and characterization files into the generated
+API classes and reports the memory retained by the object trees (measured with
+tracemalloc, excluding the already parsed JSON dictionaries).
+
+Usage:
+    uv run scripts/benchmarks/procedure_memory.py
+"""
+import gc
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+from fair_synthesis.generated_apis.procedure_data_structure import SynthesisProcedure
+from fair_synthesis.generated_apis.characterization_data_structure import Characterization
+
+BASE = Path(__file__).parents[2]  # repository root
+converted_dir = BASE / "data" / "MOCOF-1" / "converted"
+proc_path = converted_dir / "procedure_from_sciformation.json"
+char_path = converted_dir / "characterization_from_sciformation.json"
+
+
+def measure(label: str, file_path: Path, from_dict):
+    with open(file_path) as f:
+        data = json.load(f)
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = from_dict(data)
+    duration = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label}:")
+    print(f"  file size       : {file_path.stat().st_size / 1024:10.1f} KiB")
+    print(f"  object tree     : {retained / 1024:10.1f} KiB")
+    print(f"  peak during load: {peak / 1024:10.1f} KiB")
+    print(f"  from_dict time  : {duration * 1000:10.1f} ms")
+    return tree
+
+
+if __name__ == "__main__":
+    procedure = measure("MOCOF-1 procedure", proc_path,
+                        SynthesisProcedure.from_dict)
+    print(f"  syntheses       : {len(procedure.synthesis):10d}")
+    characterization = measure("MOCOF-1 characterization", char_path,
+                               Characterization.from_dict)
+    print(f"  entries         : {len(characterization.product_characterization):10d}")
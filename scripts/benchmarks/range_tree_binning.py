@@ -0,0 +1,78 @@
+"""
+Benchmark of the histogram-binned training mode (max_bins) of RangeDecisionTreeClassifier.
+
+Pooled data sets have many unique values of the continuous parameters, which
+makes the exact range split search slow. This benchmark resamples the MOCOF-1
+feature matrix to larger sizes with multiplicative noise on the numeric
+parameters (so that almost every value is unique) and compares the fit time of
+the range tree of create_model in exact mode and with max_bins. The
+cross-validated accuracy is reported on the original data.
+
+Usage:
+    uv run scripts/benchmarks/range_tree_binning.py
+"""
+import time
+
+import numpy as np
+from sklearn.model_selection import RepeatedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder
+
+from fair_synthesis.analysis.decision_tree.cross_validation import cross_validate_model
+from fair_synthesis.analysis.decision_tree.range_decision_tree import RangeDecisionTreeClassifier
+from fair_synthesis.analysis.feature_matrix import build_feature_matrix
+
+REPEAT = 3
+MODEL_TARGET = "main_product"
+SIZES = (139, 300, 600)
+MAX_BINS = (None, 32, 64)
+NOISE = 0.05  # relative standard deviation of the noise on the numeric parameters
+
+
+def best_of(func, repeat: int = REPEAT) -> float:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def range_tree(max_bins=None) -> RangeDecisionTreeClassifier:
+    # settings of the range tree in create_model
+    return RangeDecisionTreeClassifier(
+        max_depth=4, min_samples_leaf=5, split_strategy='both', max_range_splits=10,
+        random_state=0, categorical_features="from_dtype", max_bins=max_bins)
+
+
+def pooled(X, y, n_samples: int, seed: int = 0):
+    """n_samples rows drawn from X, y with noise on the numeric columns."""
+    rng = np.random.RandomState(seed)
+    rows = rng.choice(len(X), size=n_samples, replace=True)
+    X_pooled = X.iloc[rows].reset_index(drop=True)
+    for column in X_pooled.select_dtypes(include="float64").columns:
+        X_pooled[column] *= 1 + NOISE * rng.randn(n_samples)
+    return X_pooled, y[rows]
+
+
+if __name__ == "__main__":
+    X, y = build_feature_matrix(MODEL_TARGET, verbose=False)
+    X = X.drop(columns=["id", MODEL_TARGET])
+    y_encoded = LabelEncoder().fit_transform(y)
+
+    print("Fit time of the range tree (max_depth=4) on the resampled MOCOF-1 feature matrix:")
+    print(f"  {'samples':>7s} {'unique Acid_conc_M':>18s} " +
+          " ".join(f"{'exact' if max_bins is None else f'max_bins={max_bins}':>12s}" for max_bins in MAX_BINS))
+    for n_samples in SIZES:
+        X_n, y_n = (X, y_encoded) if n_samples == len(X) else pooled(X, y_encoded, n_samples)
+        durations = [best_of(lambda: range_tree(max_bins).fit(X_n, y_n)) for max_bins in MAX_BINS]
+        print(f"  {n_samples:7d} {X_n['Acid_conc_M'].nunique():18d} " +
+              " ".join(f"{duration * 1000:9.1f} ms" for duration in durations))
+
+    print("\nCross-validated accuracy on the original data (5-fold, 3 repeats):")
+    cv = RepeatedKFold(n_splits=5, n_repeats=3, random_state=42)
+    for max_bins in MAX_BINS:
+        model = Pipeline([("preprocess", "passthrough"), ("classifier", range_tree(max_bins))])
+        result = cross_validate_model(model, X, y_encoded, cv, task_is_classification=True)
+        label = "exact" if max_bins is None else f"max_bins={max_bins}"
+        print(f"  {label:12s} {result.summary()}", end="")
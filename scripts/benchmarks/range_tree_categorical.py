@@ -0,0 +1,73 @@
+"""
+Benchmark of native categorical splits in RangeDecisionTreeClassifier.
+
+Trains the range tree of create_model on the MOCOF-1 feature matrix once with
+the one-hot encoded categorical parameters (as generate_decision_trees.py does)
+and once with the categorical parameters passed through and split natively by
+category subsets. Reports the number of input features, the fit time (best of
+several runs), the size of the fitted tree and the cross-validated accuracy.
+
+Usage:
+    uv run scripts/benchmarks/range_tree_categorical.py
+"""
+import time
+
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.model_selection import RepeatedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder
+
+from fair_synthesis.analysis.decision_tree.cross_validation import cross_validate_model
+from fair_synthesis.analysis.decision_tree.decision_tree_model import create_preprocess
+from fair_synthesis.analysis.decision_tree.range_decision_tree import RangeDecisionTreeClassifier
+from fair_synthesis.analysis.feature_matrix import build_feature_matrix
+
+REPEAT = 5
+MODEL_TARGET = "main_product"
+
+
+def best_of(func, repeat: int = REPEAT) -> float:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def range_tree(**kwargs) -> RangeDecisionTreeClassifier:
+    # settings of the range tree in create_model
+    return RangeDecisionTreeClassifier(
+        max_depth=4, min_samples_leaf=5, split_strategy='both', max_range_splits=10,
+        random_state=0, **kwargs)
+
+
+if __name__ == "__main__":
+    X, y = build_feature_matrix(MODEL_TARGET, verbose=False)
+    X = X.drop(columns=["id", MODEL_TARGET])
+    y_encoded = LabelEncoder().fit_transform(y)
+
+    one_hot_preprocess, numeric_cols, categorical_cols = create_preprocess(X)
+    one_hot = Pipeline([("preprocess", one_hot_preprocess), ("classifier", range_tree())])
+
+    native_preprocess = ColumnTransformer(
+        [("num", SimpleImputer(strategy="median"), numeric_cols),
+         ("cat", "passthrough", categorical_cols)])
+    native = Pipeline([
+        ("preprocess", native_preprocess),
+        ("classifier", range_tree(categorical_features=list(
+            range(len(numeric_cols), len(numeric_cols) + len(categorical_cols)))))])
+
+    cv = RepeatedKFold(n_splits=5, n_repeats=3, random_state=42)
+    print(f"MOCOF-1 feature matrix ({len(X)} experiments, {len(numeric_cols)} numeric and "
+          f"{len(categorical_cols)} categorical parameters), range tree with max_depth=4:")
+    print(f"  {'':10s} {'features':>8s} {'fit [ms]':>9s} {'leaves':>6s} {'depth':>5s} {'CV accuracy':>12s}")
+    for name, model in [("one-hot", one_hot), ("native", native)]:
+        fit_time = best_of(lambda: model.fit(X, y_encoded))
+        tree = model.named_steps["classifier"]
+        n_features = model.named_steps["preprocess"].transform(X).shape[1]
+        accuracy = cross_validate_model(
+            model, X, y_encoded, cv, task_is_classification=True).fold_scores["accuracy"]
+        print(f"  {name:10s} {n_features:8d} {fit_time * 1000:9.1f} {tree.get_n_leaves():6d} "
+              f"{tree.get_depth():5d} {accuracy.mean():6.2f} ± {accuracy.std():.2f}")
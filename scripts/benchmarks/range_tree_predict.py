@@ -0,0 +1,79 @@
+"""
+Benchmark of vectorized prediction with RangeDecisionTreeClassifier.
+
+Screening candidate synthesis conditions means scoring many more rows than
+the tree was trained on. This benchmark fits the range tree of create_model on
+the MOCOF-1 feature matrix, draws candidate conditions by sampling every
+parameter independently from its observed values, and compares predict_proba
+on the flattened tree (flat_tree_) with a per-sample traversal of the Node
+graph (tree_), as predict did before. The traversal is timed on a subset and
+extrapolated.
+
+Usage:
+    uv run scripts/benchmarks/range_tree_predict.py
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from fair_synthesis.analysis.decision_tree.range_decision_tree import (
+    RangeDecisionTreeClassifier, _missing_goes_left)
+from fair_synthesis.analysis.feature_matrix import build_feature_matrix
+
+MODEL_TARGET = "main_product"
+N_CANDIDATES = 1_000_000
+N_TRAVERSAL = 20_000  # candidates scored by the per-sample traversal
+
+
+def candidates(X, n_samples: int, seed: int = 0) -> pd.DataFrame:
+    """n_samples rows with every column drawn independently from the values of X."""
+    rng = np.random.RandomState(seed)
+    return pd.DataFrame({
+        column: X[column].to_numpy()[rng.randint(len(X), size=n_samples)] for column in X.columns})
+
+
+def traverse(x, node):
+    """Class counts of the leaf of one encoded sample, following tree_ node by node."""
+    while node.value is None:
+        value = x[node.feature]
+        if np.isnan(value):
+            go_left = _missing_goes_left(node)
+        elif node.split_type == 'standard':
+            go_left = value <= node.threshold
+        elif node.split_type == 'range':
+            go_left = node.range_bounds[0] <= value <= node.range_bounds[1]
+        else:
+            go_left = value >= 0 and int(value) in node.categories
+        node = node.left if go_left else node.right
+    return node.distribution
+
+
+if __name__ == "__main__":
+    X, y = build_feature_matrix(MODEL_TARGET, verbose=False)
+    X = X.drop(columns=["id", MODEL_TARGET])
+    y_encoded = LabelEncoder().fit_transform(y)
+
+    # settings of the range tree in create_model
+    tree = RangeDecisionTreeClassifier(
+        max_depth=4, min_samples_leaf=5, split_strategy='both', max_range_splits=10,
+        random_state=0, categorical_features="from_dtype").fit(X, y_encoded)
+    X_candidates = candidates(X, N_CANDIDATES)
+
+    start = time.perf_counter()
+    probabilities = tree.predict_proba(X_candidates)
+    vectorized = time.perf_counter() - start
+
+    subset = X_candidates.iloc[:N_TRAVERSAL]
+    start = time.perf_counter()
+    encoded = tree._transform(subset)
+    counts = np.array([traverse(x, tree.tree_) for x in encoded])
+    traversal = (time.perf_counter() - start) * N_CANDIDATES / N_TRAVERSAL
+
+    assert np.allclose(counts / counts.sum(axis=1, keepdims=True), probabilities[:N_TRAVERSAL])
+    print(f"predict_proba of {N_CANDIDATES:,} candidate conditions with the range tree "
+          f"({tree.flat_tree_.node_count} nodes, depth {tree.get_depth()}):")
+    print(f"  {'flat_tree_ (vectorized)':28s} {vectorized:8.2f} s")
+    print(f"  {'tree_ (per sample, extrap.)':28s} {traversal:8.2f} s")
+    print(f"  speedup {traversal / vectorized:.0f}x")
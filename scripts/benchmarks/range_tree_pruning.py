@@ -0,0 +1,74 @@
+"""
+Benchmark of choosing the size of RangeDecisionTreeClassifier by cost-complexity pruning.
+
+generate_decision_trees.py compares trees of different size by refitting them
+(MAX_DEPTH vs the unlimited model_endless), and a search over max_depth pays
+the full split search once per depth and fold. This benchmark cross-validates
+the range tree of create_model on the MOCOF-1 feature matrix for every
+max_depth with one fit per depth and fold, and for every ccp_alpha of the
+pruning path of the fully grown tree with cross_validate_ccp_alphas, which
+grows one tree per fold and predicts with all of its pruned subtrees.
+
+Usage:
+    uv run scripts/benchmarks/range_tree_pruning.py
+"""
+import time
+
+import numpy as np
+from sklearn.model_selection import RepeatedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder
+
+from fair_synthesis.analysis.decision_tree.cross_validation import (
+    cross_validate_ccp_alphas, cross_validate_models)
+from fair_synthesis.analysis.decision_tree.range_decision_tree import RangeDecisionTreeClassifier
+from fair_synthesis.analysis.feature_matrix import build_feature_matrix
+
+MODEL_TARGET = "main_product"
+MAX_DEPTHS = range(1, 9)
+
+
+def range_tree(max_depth=None) -> Pipeline:
+    # settings of the range tree in create_model
+    return Pipeline([("preprocess", "passthrough"), ("classifier", RangeDecisionTreeClassifier(
+        max_depth=max_depth, min_samples_leaf=5, split_strategy='both', max_range_splits=10,
+        random_state=0, categorical_features="from_dtype"))])
+
+
+def best(results):
+    """(parameter, mean accuracy) of the best cross-validated model."""
+    accuracies = {name: result.fold_scores["accuracy"].mean() for name, result in results.items()}
+    name = max(accuracies, key=accuracies.get)
+    return name, accuracies[name]
+
+
+if __name__ == "__main__":
+    X, y = build_feature_matrix(MODEL_TARGET, verbose=False)
+    X = X.drop(columns=["id", MODEL_TARGET])
+    y_encoded = LabelEncoder().fit_transform(y)
+    cv = RepeatedKFold(n_splits=5, n_repeats=3, random_state=42)
+    n_folds = cv.get_n_splits()
+
+    start = time.perf_counter()
+    depth_results = cross_validate_models(
+        {max_depth: range_tree(max_depth) for max_depth in MAX_DEPTHS},
+        X, y_encoded, cv, task_is_classification=True)
+    depth_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    path = range_tree().named_steps["classifier"].cost_complexity_pruning_path(X, y_encoded)
+    alpha_results = cross_validate_ccp_alphas(
+        range_tree(), X, y_encoded, cv, path.ccp_alphas, task_is_classification=True)
+    alpha_time = time.perf_counter() - start
+
+    depth, depth_accuracy = best(depth_results)
+    alpha, alpha_accuracy = best(alpha_results)
+    pruned = range_tree().set_params(classifier__ccp_alpha=alpha).fit(X, y_encoded).named_steps["classifier"]
+    print("Cross-validated range tree on the MOCOF-1 feature matrix (5-fold, 3 repeats):")
+    print(f"  {'':28s} {'models':>6s} {'fits':>5s} {'time [s]':>8s}  best")
+    print(f"  {'refit per max_depth':28s} {len(MAX_DEPTHS):6d} {len(MAX_DEPTHS) * n_folds:5d} "
+          f"{depth_time:8.2f}  max_depth={depth}: accuracy {depth_accuracy:.3f}")
+    print(f"  {'pruning path (ccp_alpha)':28s} {len(path.ccp_alphas):6d} {n_folds + 1:5d} "
+          f"{alpha_time:8.2f}  ccp_alpha={alpha:.4f}: accuracy {alpha_accuracy:.3f} "
+          f"({pruned.get_n_leaves()} leaves, depth {pruned.get_depth()})")
+    print(f"  ccp_alphas: {np.round(path.ccp_alphas, 4)}")
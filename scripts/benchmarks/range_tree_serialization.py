@@ -0,0 +1,89 @@
+"""
+Benchmark of the range tree file format against pickle.
+
+Fits the range tree of create_model on the MOCOF-1 feature matrix, and a fully
+grown tree (with max_bins) on the feature matrix resampled with noise to a
+larger size, then compares pickle with save_range_tree / load_range_tree:
+file size, save time and load time (best of several runs). The loaded trees
+are checked to predict like the fitted ones.
+
+Usage:
+    uv run scripts/benchmarks/range_tree_serialization.py
+"""
+import pickle
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+
+from fair_synthesis.analysis.decision_tree.range_decision_tree import RangeDecisionTreeClassifier
+from fair_synthesis.analysis.decision_tree.range_tree_serialization import load_range_tree, save_range_tree
+from fair_synthesis.analysis.feature_matrix import build_feature_matrix
+
+REPEAT = 20
+MODEL_TARGET = "main_product"
+N_POOLED = 20_000
+NOISE = 0.05  # relative standard deviation of the noise on the numeric parameters
+
+
+def best_of(func, repeat: int = REPEAT) -> float:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def pooled(X, y, n_samples: int, seed: int = 0):
+    """n_samples rows drawn from X, y with noise on the numeric columns."""
+    rng = np.random.RandomState(seed)
+    rows = rng.choice(len(X), size=n_samples, replace=True)
+    X_pooled = X.iloc[rows].reset_index(drop=True)
+    for column in X_pooled.select_dtypes(include="float64").columns:
+        X_pooled[column] *= 1 + NOISE * rng.randn(n_samples)
+    return X_pooled, y[rows]
+
+
+def pickle_dump(tree, path: Path):
+    with open(path, "wb") as file:
+        pickle.dump(tree, file)
+
+
+def pickle_load(path: Path):
+    with open(path, "rb") as file:
+        return pickle.load(file)
+
+
+if __name__ == "__main__":
+    X, y = build_feature_matrix(MODEL_TARGET, verbose=False)
+    X = X.drop(columns=["id", MODEL_TARGET])
+    y_encoded = LabelEncoder().fit_transform(y)
+    X_pooled, y_pooled = pooled(X, y_encoded, N_POOLED)
+
+    trees = {
+        # settings of the range tree in create_model
+        "create_model": (RangeDecisionTreeClassifier(
+            max_depth=4, min_samples_leaf=5, split_strategy='both', max_range_splits=10,
+            random_state=0, categorical_features="from_dtype").fit(X, y_encoded), X),
+        f"grown, {N_POOLED} samples": (RangeDecisionTreeClassifier(
+            min_samples_leaf=1, random_state=0, categorical_features="from_dtype",
+            max_bins=64).fit(X_pooled, y_pooled), X_pooled),
+    }
+
+    print(f"  {'tree':24s} {'nodes':>6s} {'format':>8s} {'size [kB]':>9s} {'save [ms]':>9s} {'load [ms]':>9s}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (tree, X_check) in trees.items():
+            pickle_path, npz_path = Path(directory) / "tree.pkl", Path(directory) / "tree.npz"
+            formats = {
+                "pickle": (lambda: pickle_dump(tree, pickle_path), lambda: pickle_load(pickle_path), pickle_path),
+                "npz": (lambda: save_range_tree(tree, npz_path), lambda: load_range_tree(npz_path), npz_path),
+            }
+            for format_name, (save, load, path) in formats.items():
+                save_time = best_of(save)
+                load_time = best_of(load)
+                assert np.array_equal(load().predict_proba(X_check), tree.predict_proba(X_check))
+                print(f"  {name:24s} {tree.flat_tree_.node_count:6d} {format_name:>8s} "
+                      f"{path.stat().st_size / 1024:9.1f} {save_time * 1000:9.2f} {load_time * 1000:9.2f}")
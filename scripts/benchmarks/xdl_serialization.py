@@ -0,0 +1,50 @@
+"""
+Speed benchmark for the MOFSY to XDL serialization.
+
+Serializes the full MOCOF-1 procedure once via to_dict() and dict_to_xml (the
+generic dict walker) and once via the precompiled per-class emitters used by
+convert_mofsy_procedure_to_xdl_string, checks that both produce the same XML
+and reports the best time of several runs.
+
+Usage:
+    uv run scripts/benchmarks/xdl_serialization.py
+"""
+import json
+import time
+from pathlib import Path
+
+from fair_synthesis.generated_apis.procedure_data_structure import SynthesisProcedure
+from fair_synthesis.serialization.mofsy2xdl import convert_mofsy_procedure_to_xdl_string, dict_to_xml
+
+BASE = Path(__file__).parents[2]  # repository root
+proc_path = BASE / "data" / "MOCOF-1" / "converted" / "procedure_from_sciformation.json"
+REPEAT = 10
+
+
+def best_of(func, repeat: int = REPEAT) -> float:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+if __name__ == "__main__":
+    with open(proc_path) as f:
+        procedure = SynthesisProcedure.from_dict(json.load(f))
+
+    def via_dict():
+        return dict_to_xml("XDL", procedure.to_dict())
+
+    def via_emitters():
+        return convert_mofsy_procedure_to_xdl_string(procedure)
+
+    assert via_dict() == via_emitters(), "emitters and dict_to_xml produce different XDL"
+
+    dict_time = best_of(via_dict)
+    emitter_time = best_of(via_emitters)
+    print(f"MOCOF-1 procedure ({len(procedure.synthesis)} syntheses), best of {REPEAT}:")
+    print(f"  to_dict + dict_to_xml : {dict_time * 1000:8.1f} ms")
+    print(f"  compiled emitters     : {emitter_time * 1000:8.1f} ms")
+    print(f"  speedup               : {dict_time / emitter_time:8.2f}x")
@@ -1,11 +1,137 @@
+import argparse
+import os
+
 from fair_synthesis.formatting.sciformation2mofsy import sciformation2mofsy
 from fair_synthesis.formatting.fe_terephthalate2mofsy import fe_terephthalate2Mofsy
-from fair_synthesis.serialization.mofsy2xdl import mofsy2xdl
+from fair_synthesis.serialization.mofsy2xdl import convert_mofsy_file_to_xdl, convert_mofsy_file_to_xdl_shards
+from fair_synthesis.serialization.xdl2mofsy import validate_xdl_round_trip
+from fair_synthesis.serialization.mofsy2parquet import TABLE_SCHEMAS, convert_mofsy_to_parquet
 from fair_synthesis.serialization.extract_interesting_params import extract_interesting_params
+from fair_synthesis.pipeline import Pipeline, Stage, print_results
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+STATE_FILE_PATH = os.path.join(REPO_ROOT, '.pipeline_state.json')
+
+
+def _path(*parts: str) -> str:
+    return os.path.join(REPO_ROOT, *parts)
+
+
+def _parquet_tables(converted_dir: str):
+    return tuple(os.path.join(converted_dir, 'parquet', f'{table}.parquet')
+                 for table in TABLE_SCHEMAS)
+
+
+MOCOF_1_CONVERTED = _path('data', 'MOCOF-1', 'converted')
+MOCOF_1_PROCEDURE = os.path.join(MOCOF_1_CONVERTED, 'procedure_from_sciformation.json')
+MOCOF_1_CHARACTERIZATION = os.path.join(
+    MOCOF_1_CONVERTED, 'characterization_from_sciformation.json')
+
+FE_CONVERTED = _path('data', 'Fe–terephthalate', 'converted')
+FE_PROCEDURE = os.path.join(FE_CONVERTED, 'procedure_from_Fe–terephthalate.json')
+FE_CHARACTERIZATION = os.path.join(
+    FE_CONVERTED, 'characterization_from_Fe–terephthalate.json')
+
+SCHEMAS = (
+    _path('data_model', 'procedure.schema.json'),
+    _path('data_model', 'characterization.schema.json'),
+)
+
+STAGES = [
+    # MOCOF-1
+    Stage(
+        name='sciformation2mofsy',
+        func=sciformation2mofsy,
+        inputs=(
+            _path('data', 'MOCOF-1', 'Sciformation_KE-MOCOF_jsonRaw.json'),
+            _path('data', 'MOCOF-1', 'PXRD'),
+            _path('data_model', 'sciformation_eln_cleaned.schema.json'),
+            _path('data_model', 'procedure_MOCOF-1.schema.json'),
+        ) + SCHEMAS,
+        outputs=(MOCOF_1_PROCEDURE, MOCOF_1_CHARACTERIZATION)),
+    Stage(
+        name='mofsy2xdl_mocof_1',
+        func=convert_mofsy_file_to_xdl,
+        inputs=(MOCOF_1_PROCEDURE,),
+        outputs=(os.path.join(MOCOF_1_CONVERTED, 'xdl_from_sciformation.xml'),),
+        args=(MOCOF_1_PROCEDURE, os.path.join(MOCOF_1_CONVERTED, 'xdl_from_sciformation.xml'))),
+    Stage(
+        name='xdl_round_trip_mocof_1',
+        func=validate_xdl_round_trip,
+        inputs=(MOCOF_1_PROCEDURE, os.path.join(MOCOF_1_CONVERTED, 'xdl_from_sciformation.xml')),
+        args=(MOCOF_1_PROCEDURE, os.path.join(MOCOF_1_CONVERTED, 'xdl_from_sciformation.xml'))),
+    Stage(
+        name='mofsy2xdl_shards_mocof_1',
+        func=convert_mofsy_file_to_xdl_shards,
+        inputs=(MOCOF_1_PROCEDURE,),
+        # The whole directory, so that deleted or modified shards are detected
+        outputs=(os.path.join(MOCOF_1_CONVERTED, 'xdl'),),
+        args=(MOCOF_1_PROCEDURE, os.path.join(MOCOF_1_CONVERTED, 'xdl'))),
+    Stage(
+        name='mofsy2parquet_mocof_1',
+        func=convert_mofsy_to_parquet,
+        inputs=(MOCOF_1_PROCEDURE, MOCOF_1_CHARACTERIZATION),
+        outputs=_parquet_tables(MOCOF_1_CONVERTED),
+        args=(MOCOF_1_PROCEDURE, MOCOF_1_CHARACTERIZATION,
+              os.path.join(MOCOF_1_CONVERTED, 'parquet'))),
+    Stage(
+        name='extract_interesting_params',
+        func=extract_interesting_params,
+        inputs=(MOCOF_1_PROCEDURE, MOCOF_1_CHARACTERIZATION),
+        outputs=(os.path.join(MOCOF_1_CONVERTED, 'params_from_sciformation.json'),)),
+    # Fe–terephthalate
+    Stage(
+        name='fe_terephthalate2mofsy',
+        func=fe_terephthalate2Mofsy,
+        inputs=(
+            os.path.join(FE_CONVERTED, 'Fe–terephthalate.json'),
+            _path('data', 'Fe–terephthalate', 'PXRD'),
+            _path('data_model', 'Fe–terephthalate.schema.json'),
+        ) + SCHEMAS,
+        outputs=(FE_PROCEDURE, FE_CHARACTERIZATION)),
+    Stage(
+        name='mofsy2xdl_fe_terephthalate',
+        func=convert_mofsy_file_to_xdl,
+        inputs=(FE_PROCEDURE,),
+        outputs=(os.path.join(FE_CONVERTED, 'xdl_from_Fe–terephthalate.xml'),),
+        args=(FE_PROCEDURE, os.path.join(FE_CONVERTED, 'xdl_from_Fe–terephthalate.xml'))),
+    Stage(
+        name='xdl_round_trip_fe_terephthalate',
+        func=validate_xdl_round_trip,
+        inputs=(FE_PROCEDURE, os.path.join(FE_CONVERTED, 'xdl_from_Fe–terephthalate.xml')),
+        args=(FE_PROCEDURE, os.path.join(FE_CONVERTED, 'xdl_from_Fe–terephthalate.xml'))),
+    Stage(
+        name='mofsy2xdl_shards_fe_terephthalate',
+        func=convert_mofsy_file_to_xdl_shards,
+        inputs=(FE_PROCEDURE,),
+        # The whole directory, so that deleted or modified shards are detected
+        outputs=(os.path.join(FE_CONVERTED, 'xdl'),),
+        args=(FE_PROCEDURE, os.path.join(FE_CONVERTED, 'xdl'))),
+    Stage(
+        name='mofsy2parquet_fe_terephthalate',
+        func=convert_mofsy_to_parquet,
+        inputs=(FE_PROCEDURE, FE_CHARACTERIZATION),
+        outputs=_parquet_tables(FE_CONVERTED),
+        args=(FE_PROCEDURE, FE_CHARACTERIZATION, os.path.join(FE_CONVERTED, 'parquet'))),
+    # merge_mofsy  Right now not executed because we do not work with a
+    # merged file.
+]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Format, validate and serialize all datasets. "
+                    "Stages whose inputs did not change since the last run are skipped.")
+    parser.add_argument('stages', nargs='*',
+                        help="Only run these stages, using the existing files of upstream stages.")
+    parser.add_argument('--force', action='store_true',
+                        help="Run stages even if their inputs did not change.")
+    parser.add_argument('--jobs', type=int, default=None,
+                        help="Number of worker processes.")
+    args = parser.parse_args()
 
-sciformation2mofsy()
-fe_terephthalate2Mofsy()
-mofsy2xdl()
-# merge_mofsy()  Right now not executed because we do not work with a
-# merged file.
-extract_interesting_params()
+    results = Pipeline(STAGES, STATE_FILE_PATH).run(
+        only=args.stages or None, force=args.force, max_workers=args.jobs)
+    print_results(results)
+    if any(result.status in ('failed', 'blocked') for result in results):
+        raise SystemExit(1)
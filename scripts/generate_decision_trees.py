@@ -1,19 +1,11 @@
-from fair_synthesis.analysis.decision_tree.decision_tree_model import create_model
-from fair_synthesis.analysis.decision_tree.deduplicate_experiments import get_duplicate_indices
-from molmass import Formula
+from fair_synthesis.analysis.decision_tree.decision_tree_model import create_model, create_preprocess, get_feature_names
+from fair_synthesis.analysis.decision_tree.cross_validation import cross_validate_model
+from fair_synthesis.analysis.feature_matrix import build_feature_matrix
 from fair_synthesis.analysis.decision_tree.plot_decision_tree import plot_decision_tree_dtreeviz, plot_decision_tree_graphviz
-import fair_synthesis.formatting.mofsy_api as api
 from sklearn.preprocessing import LabelEncoder
-from sklearn.preprocessing import OneHotEncoder
-from sklearn.pipeline import Pipeline
-from sklearn.model_selection import KFold
-from sklearn.model_selection import cross_val_predict, RepeatedKFold, cross_val_score
-from sklearn.impute import SimpleImputer
-from sklearn.compose import ColumnTransformer
-import json
+from sklearn.model_selection import RepeatedKFold
 from pathlib import Path
 
-import numpy as np
 import pandas as pd
 
 pd.set_option("display.max_rows", None)
@@ -31,7 +23,11 @@ DEDUPLICATE_RELATIVE_TOLERANCE = 5  # in percent
 HIGH_YIELD_THRESHOLD = 0.90  # unused now
 TARGET_IS_PRODUCT_TYPE = True
 
-if TARGET_IS_PRODUCT_TYPE:
+if not TASK_IS_CLASSIFICATION:
+    # Regression predicts the yield itself
+    MODEL_TARGET = "yield_MOCOF-1"
+    MODEL_TARGET_LABEL = "MOCOF-1 yield"
+elif TARGET_IS_PRODUCT_TYPE:
     MODEL_TARGET = "main_product"
     MODEL_TARGET_LABEL = "Main Product"
 else:
@@ -40,239 +36,24 @@ else:
         int(HIGH_YIELD_THRESHOLD * 100))
 
 
-sum_formula = {
-    "COF-366-Co": "C60H36CoN8",
-    "MOCOF-1": "C52H33CoN8",
-    "amorphous": "C44H31CoN8",  # assuming Co(H−1tapp)
-}
-formula_mass = {k: Formula(v).mass for k, v in sum_formula.items()}
-
-params_path = BASE / "data" / "MOCOF-1" / \
-    "converted" / "params_from_sciformation.json"
-proc_path = BASE / "data" / "MOCOF-1" / \
-    "converted" / "procedure_from_sciformation.json"
-char_path = BASE / "data" / "MOCOF-1" / "converted" / \
-    "characterization_from_sciformation.json"
-frac_path = BASE / "scripts" / "pxrd_analysis" / \
-    "data" / "phase_molar-fractions.csv"
-
-# 1. Load raw data
-with open(params_path) as f:
-    raw_params = json.load(f)
-
-# Load the structured objects
-procedure = api.load_procedure(str(proc_path))
-characterization = api.load_characterization(str(char_path))
-
-# 2. Build flat DataFrames from the three sources
-# 2.1 Parameters (already flat)
-params_df = (
-    pd.DataFrame.from_dict(raw_params, orient="index")
-    .reset_index()
-    .rename(columns={"index": "id"})
-)
-
-# 2.2 Molar fractions (PXRD)
-frac_df = pd.read_csv(frac_path)
-
-# 2.3 Characterisation – extract the product mass (mg) -> g
-char_rows = []
-for exp_id in frac_df["id"]:
-    char_entry = api.get_characterization_by_experiment_id(
-        characterization, exp_id)
-    if char_entry is None:
-        continue
-    w = api.find_product_mass(char_entry)          # returns Quantity or None
-    if w and hasattr(w, "value"):
-        mass_mg = float(w.value)
-    else:
-        mass_mg = np.nan
-    char_rows.append({"id": exp_id, "product_mass_g": mass_mg / 1000.0})
-
-char_df = pd.DataFrame(char_rows)
-
-# 3. Merge everything
-df = (
-    params_df
-    .merge(frac_df, on="id", how="inner")
-    .merge(char_df, on="id", how="left")
-)
-
-# Shorten parameter names for visualization
-df = df.rename(
-    columns={
-        "aminoporphyrin_monomer_type": "Co(tapp)_precursor"}).replace(
-            "C128H104N8O8.Co",
-            "Co(tdpp)").replace(
-                "C128H104N8O8.2C6H6N2O2.CHF3O3S.Co",
-                "Co(III)(tdpp)").replace(
-                    "C44H32N8.Co",
-                    "Co(tapp)").replace(
-                        "C120H88N8.Co",
-    "Co(ttpp)")
-df = df.rename(columns={"acid_pKa_DMSO": "Acid_pKa"})
-df = df.rename(columns={"degassing": "Degas"})
-df = df.rename(columns={"temperature_C": "Temp_degC"})
-df = df.rename(columns={"solvent_2_name": "Solvent2"}).replace(
-    "o-dichlorobenzene", "o-DCB").replace("nitrobenzene", "PhNO2")
-df = df.rename(
-    columns={
-        "aldehyde_monomer_structure": "TPA_substitution"}).replace(
-            "C8H6O2",
-            "none").replace(
-                "C10H10O4",
-                "(OMe)2").replace(
-                    "C8H4F2O2",
-                    "F2").replace(
-                        "C8H2F4O2",
-    "F4")
-df = df.rename(columns={"vessel": "Vessel"})
-df = df.rename(columns={"other_additives": "Additive"}).replace(
-    "C6H6BrN", "PBA").replace("C19H16O", "TrOH")
-
-# 4. Parameter conversion
-df["TPA_eq"] = df["aldehyde_monomer_amount_umol"] / \
-    df["aminoporphyrin_monomer_amount_umol"]
-df["H2O_per_TPA"] = df["water_amount_umol"] / \
-    df["aldehyde_monomer_amount_umol"]
-df["TAPP_conc_mM"] = (((df["aminoporphyrin_monomer_amount_umol"] / df[["solvent_1_volume_uL",
-                      "solvent_2_volume_uL", "solvent_3_volume_uL"]].sum(axis=1) * 1e3) / 2).round()) * 2
-df["Acid_conc_M"] = (df["acid_amount_umol"] / df[["solvent_1_volume_uL",
-                     "solvent_2_volume_uL", "solvent_3_volume_uL"]].sum(axis=1)).round(1)
-df["Solvent2_fraction"] = df["solvent_2_volume_uL"] / \
-    df[["solvent_1_volume_uL", "solvent_2_volume_uL"]].sum(axis=1)
-df["m-DNB"] = (df["solvent_3_volume_uL"] > 0)
-
-# 5. Yield calculation (real values) and categorical main product
-df["yield_MOCOF-1"] = (
-    df["MOCOF-1"]
-    * df["product_mass_g"]
-    / (
-        df["COF-366-Co"] * formula_mass["COF-366-Co"]
-        + df["MOCOF-1"] * formula_mass["MOCOF-1"]
-        + df["amorphous"] * formula_mass["amorphous"]
-    )
-    / df["aminoporphyrin_monomer_amount_umol"] / 1e-6
-).round(2)
-df["yield_COF-366-Co"] = (
-    df["COF-366-Co"]
-    * df["product_mass_g"]
-    / (
-        df["COF-366-Co"] * formula_mass["COF-366-Co"]
-        + df["MOCOF-1"] * formula_mass["MOCOF-1"]
-        + df["amorphous"] * formula_mass["amorphous"]
-    )
-    / df["aminoporphyrin_monomer_amount_umol"] / 1e-6
-).round(2)
-# Assuming the amorphous component was Co(tapp)nXm. Minimum function to
-# avoid overestimation.
-df["yield_Co(tapp)nXm"] = (
-    np.minimum(1 - df["yield_COF-366-Co"] - df["yield_MOCOF-1"],
-               df["amorphous"]
-               * df["product_mass_g"]
-               / (
-        df["COF-366-Co"] * formula_mass["COF-366-Co"]
-        + df["MOCOF-1"] * formula_mass["MOCOF-1"]
-        + df["amorphous"] * formula_mass["amorphous"]
-    )
-        / df["aminoporphyrin_monomer_amount_umol"] / 1e-6
-    )
-).round(2)
-df["yield_Co(tapp)"] = (1 - df["yield_Co(tapp)nXm"] -
-                        df["yield_COF-366-Co"] - df["yield_MOCOF-1"]).round(2)
-df["MOCOF_high_yield"] = df["yield_MOCOF-1"] >= HIGH_YIELD_THRESHOLD
-
-yield_cols = ["yield_COF-366-Co", "yield_MOCOF-1",
-              "yield_Co(tapp)nXm", "yield_Co(tapp)"]
-df["main_product"] = df[yield_cols].idxmax(axis=1).str.replace("yield_", "")
-
-# 6. Remove rows where the target is NaN
-n_before = len(df)
-mask_missing = df[[MODEL_TARGET]].isnull().any(axis=1)
-missing_counts = {
-    "target_nan": int(df[MODEL_TARGET].isnull().sum()),
-}
-dropped_ids = df.loc[mask_missing, "id"].tolist()
-df = df.dropna(subset=[MODEL_TARGET]).reset_index(drop=True)
-n_after = len(df)
-print("\n=== Drop‑NaN‑Report ===")
-print(f"Columns before filtering: {n_before}")
-print(f"Columns after Filtering: {n_after}")
-print(f"Removed (Total): {n_before - n_after}")
-print("Reason (Amount per Column):")
-for k, v in missing_counts.items():
-    print(f"  {k:20s} → {v}")
-print(f"Example‑IDs of removed experiments (max 10): {dropped_ids[:10]}")
-
-# 7.1. Pre-processing: input parameters
-# Remove already converted parameters, characterization parameters, and
-# workup parameters that are irrelevant for phase selectivity.
-X = df.drop(columns=yield_cols + ["product_mass_g",
-                                  "COF-366-Co",
-                                  "MOCOF-1",
-                                  "amorphous",
-                                  "water_amount_umol",
-                                  "acid_amount_umol",
-                                  "acid_name",
-                                  "aminoporphyrin_monomer_amount_umol",
-                                  "aldehyde_monomer_amount_umol",
-                                  "solvent_1_volume_uL",
-                                  "solvent_2_volume_uL",
-                                  "solvent_3_name",
-                                  "solvent_3_volume_uL",
-                                  "activation_with_scCO2",
-                                  "workup_with_NaCl",
-                                  "MeOH_in_scCO2_activation",
-                                  "activation_under_vacuum",
-                                  "duration_h",
-                                  "MOCOF_high_yield"])
-y = df[MODEL_TARGET].values
-
-# Find duplicates
-if DEDUPLICATE:
-    print("\n=== Deduplicating feature matrix ===")
-
-    duplicate_indices, duplicate_pairs, epsilon_dict, param_stats = get_duplicate_indices(
-        X.drop(columns=["id"]),
-        relative_tolerance=DEDUPLICATE_RELATIVE_TOLERANCE,
-        verbose=False
-    )
-
-    print(f"Found {len(duplicate_indices)} duplicate rows")
-    # print the experiment id for all duplicates
-    print("Duplicate experiment IDs:")
-    for (i, j) in duplicate_pairs:
-        print(f"  {df.loc[i, 'id']} is duplicate of {df.loc[j, 'id']}")
-
-    # Remove duplicates from both X and y
-    X = X.drop(duplicate_indices)
-    mask = np.ones(len(y), dtype=bool)
-    mask[duplicate_indices] = False
-    y = y[mask]
-
-    print(f"Final shapes: X={X.shape}, y={y.shape}")
+# 1. - 6. Load and merge the data, derive the parameters and yields, and select
+# the feature matrix (cached in .cache/feature_matrix until the inputs change)
+X, y = build_feature_matrix(
+    MODEL_TARGET, DEDUPLICATE, DEDUPLICATE_RELATIVE_TOLERANCE, HIGH_YIELD_THRESHOLD)
 
 X.to_csv(output_dir / "Decision-tree_input.csv", index=False)
 X = X.drop(columns=["id", MODEL_TARGET])
 
-label_encoder = LabelEncoder()
-y_encoded = label_encoder.fit_transform(y)
-class_names_ordered = label_encoder.classes_
-
-# 7.2. Pre‑processing: numeric vs. categorical
-numeric_cols = X.select_dtypes(include=["int64", "float64"]).columns.tolist()
-numeric_pipe = Pipeline(
-    [("imputer", SimpleImputer(strategy="median"))])  # optional
-
-categorical_cols = X.select_dtypes(include=["object", "bool"]).columns.tolist()
-categorical_pipe = Pipeline([
-    ("onehot", OneHotEncoder(handle_unknown="ignore"))
-])
+if TASK_IS_CLASSIFICATION:
+    label_encoder = LabelEncoder()
+    y_encoded = label_encoder.fit_transform(y)
+    class_names_ordered = label_encoder.classes_
+else:
+    y_encoded = y.astype(float)
+    class_names_ordered = None
 
-preprocess = ColumnTransformer(
-    [("num", numeric_pipe, numeric_cols),
-     ("cat", categorical_pipe, categorical_cols)]
-)
+# 7. Pre‑processing: numeric vs. categorical
+preprocess, numeric_cols, categorical_cols = create_preprocess(X)
 
 # 8. Decision‑Tree pipeline
 model_endless = create_model(
@@ -280,36 +61,21 @@ model_endless = create_model(
 model = create_model(TASK_IS_CLASSIFICATION, RANGE_TREE,
                      EXTRA_TREE, MAX_DEPTH, preprocess)
 
-# 9. Repeated 5‑fold CV (3 repeats) – report R^2 & MSE
-
-
-def print_decision_tree_results(model, X, y):
-    cv = RepeatedKFold(n_splits=5, n_repeats=3, random_state=42)
-    if TASK_IS_CLASSIFICATION:
-        accuracy = cross_val_score(model, X, y, cv=cv, scoring="accuracy")
-        print(f"Accuracy: {accuracy.mean():.2f} ± {accuracy.std():.2f}\n")
-
-    else:
-        r2 = cross_val_score(model, X, y, cv=cv, scoring="r2")
-        mse = -cross_val_score(model, X, y, cv=cv,
-                               scoring="neg_mean_squared_error")
-
-        print(f"R^2  mean ± std : {r2.mean():.3f} ± {r2.std():.3f}")
-        print(f"MSE mean ± std : {mse.mean():.4f} ± {mse.std():.4f}")
-
-
+# 9. Repeated 5‑fold CV (3 repeats) – report accuracy (R^2 & MSE for regression)
+# and out-of-fold predictions from a single pass over the folds
 print("\n=== Decision tree results for limitless tree ===")
-print_decision_tree_results(model_endless, X, y_encoded)
-
-# Cross-validated confusion matrix (validation / out-of-fold)
-cv_cm = KFold(n_splits=5, shuffle=True, random_state=42)
-y_pred_cv = cross_val_predict(
+cv_result = cross_validate_model(
     model_endless,
     X,
     y_encoded,
-    cv=cv_cm,
-    method="predict"
-)
+    cv=RepeatedKFold(n_splits=5, n_repeats=3, random_state=42),
+    task_is_classification=TASK_IS_CLASSIFICATION,
+    n_jobs=-1)
+print(cv_result.summary())
+
+# Cross-validated confusion matrix (validation / out-of-fold). The first
+# repeat uses the same folds as KFold(n_splits=5, shuffle=True, random_state=42)
+y_pred_cv = cv_result.oof_predictions[0]
 
 # 10. Fit on the full data set & extract insights
 model_endless.fit(X, y_encoded)
@@ -321,25 +87,11 @@ else:
     tree_endless = model_endless.named_steps["regressor"]
     tree = model.named_steps["regressor"]
 
-
-def process_dt_results(model):
-    # feature names after one‑hot encoding
-    ohe = model.named_steps["preprocess"].named_transformers_[
-        "cat"].named_steps["onehot"]
-    cat_feature_names = list(ohe.get_feature_names_out(categorical_cols))
-    feature_names = numeric_cols + cat_feature_names
-    clf = model.named_steps["classifier"]
-    importances = clf.feature_importances_
-    return ohe, cat_feature_names, feature_names, clf, importances
-
-
-(ohe_l, cat_feature_names_l, feature_names_l, clf_l,
- importances_l) = process_dt_results(model_endless)
-(ohe, cat_feature_names, feature_names, clf,
- importances) = process_dt_results(model)
+# feature names after one‑hot encoding
+feature_names_l = get_feature_names(model_endless, numeric_cols, categorical_cols)
 print("Feature importances (of full tree):")
 for name, imp in sorted(
-        zip(feature_names_l, importances_l), key=lambda x: -x[1]):
+        zip(feature_names_l, tree_endless.feature_importances_), key=lambda x: -x[1]):
     print(f"{name}: {imp:.4f}")
 print("\n")
 
@@ -347,10 +99,10 @@ print("\n")
 # plot_confusion_matrix(y_encoded, y_pred_cv, class_names_ordered)
 
 plot_decision_tree_graphviz(
-    "Decision-tree_full", clf_l, feature_names_l, max_depth=10000000, plots_dir=output_dir)
+    "Decision-tree_full", tree_endless, feature_names_l, max_depth=10000000, plots_dir=output_dir)
 plot_decision_tree_dtreeviz(
     "Decision-tree_{}-levels".format(MAX_DEPTH),
-    clf,
+    tree,
     model,
     X,
     y_encoded,
@@ -2,7 +2,7 @@ import json
 import os.path
 
 import fair_synthesis.formatting.mofsy_api as api
-from fair_synthesis.generated_apis.procedure_data_structure import SynthesisProcedure
+from fair_synthesis.generated_apis.procedure_data_structure import SynthesisProcedure, Role
 from fair_synthesis.generated_apis.characterization_data_structure import Characterization
 from fair_synthesis.generated_apis.mocof_1_params import Mocof1Param
 
@@ -27,12 +27,13 @@ characterization: Characterization = api.load_characterization(
 # Load Mocof 1 Params file into our Mocof1Param class structure
 params: dict[str, Mocof1Param] = api.load_mocof_1_params(params_file_path)
 
-# Access an individual experiment by id
+# Access an individual experiment by id. The lazy loaders only decode the
+# requested experiment instead of the whole file.
 example_experiment_id = "KE-232"
-example_synthesis = api.get_synthesis_by_experiment_id(
-    procedure, example_experiment_id)
-example_characterization = api.get_characterization_by_experiment_id(
-    characterization, example_experiment_id)
+example_synthesis = api.load_procedure_lazy(
+    procedure_file_path).get(example_experiment_id)
+example_characterization = api.load_characterization_lazy(
+    characterization_file_path).get(example_experiment_id)
 api.print_synthesis_data(example_synthesis, example_characterization)
 
 # Access the product of an individual experiment
@@ -49,11 +50,15 @@ api.print_product(product_2)
 synthesis_list = api.get_synthesis_list(procedure)
 print(f"Total number of experiments: {len(synthesis_list)}")
 
+# Use an indexed store for repeated lookups by experiment id, reagent name or
+# role. Call store.reindex() after changing the procedure or characterization.
+store = api.ExperimentStore(procedure, characterization, params)
+
 # Compute the average number of PXRD files per experiment
 pxrd_files_per_experiment = []
 for synthesis in synthesis_list:
     corresponding_characterization = api.get_characterization_by_experiment_id(
-        characterization, synthesis.metadata.description)
+        store, synthesis.metadata.description)
     pxrd_files = api.find_corresponding_pxrd_files(
         corresponding_characterization)
     pxrd_files_per_experiment.append(len(pxrd_files))
@@ -69,3 +74,10 @@ print(
     f"Parameters for Experiment ID {example_experiment_id_3}: {
         json.dumps(
             Mocof1Param.to_dict(example_synthesis_3))}")
+
+# Find experiments by reagent role
+acid_experiment_ids = store.find_experiments_by_role(Role.ACID)
+print(f"Number of experiments using an acid: {len(acid_experiment_ids)}")
+print(
+    f"Solvents of Experiment ID {example_experiment_id}: {
+        [r.name for r in store.find_reagents_by_role(example_experiment_id, Role.SOLVENT)]}")
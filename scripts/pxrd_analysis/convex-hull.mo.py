@@ -18,15 +18,8 @@ def _():
 
 @app.cell
 def _():
-    import fair_synthesis.formatting.mofsy_api as api
-    from fair_synthesis.generated_apis.procedure_data_structure import (
-        SynthesisProcedure,
-    )
-    from fair_synthesis.generated_apis.characterization_data_structure import (
-        Characterization,
-        CharacterizationEntry,
-    )
-    return (api,)
+    from fair_synthesis.serialization.mofsy2parquet import load_table
+    return (load_table,)
 
 
 @app.cell
@@ -37,72 +30,9 @@ def _():
 
 @app.cell
 def _(mo):
-    procedure_file_path = (
-        mo.notebook_dir() /
-        "../../data/MOCOF-1/converted/procedure_from_sciformation.json")
-    characterization_file_path = (
-        mo.notebook_dir() /
-        "../../data/MOCOF-1/converted/characterization_from_sciformation.json")
-    return characterization_file_path, procedure_file_path
-
-
-@app.cell
-def _(api, characterization_file_path, procedure_file_path):
-    procedure = api.load_procedure(procedure_file_path)
-    characterization = api.load_characterization(characterization_file_path)
-    return characterization, procedure
-
-
-@app.cell(hide_code=True)
-def _(pl):
-    def flatten_nested(obj, prefix="", sep="_"):
-        """Recursively flatten nested dicts/lists into a flat dict."""
-        result = {}
-
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                new_key = f"{prefix}{sep}{k}" if prefix else k
-                result.update(flatten_nested(v, new_key, sep))
-        elif isinstance(obj, list):
-            for i, v in enumerate(obj):
-                new_key = f"{prefix}{sep}{i}" if prefix else str(i)
-                result.update(flatten_nested(v, new_key, sep))
-        else:
-            # Skalar: direkt zuweisen (prefix muss hier gesetzt sein)
-            key = prefix if prefix else "value"
-            result[key] = obj
-
-        return result
-
-    def dict_to_dataframe(data, sep="_"):
-        """Convert nested dict to a Polars DataFrame.
-        Zeilen = Länge der längsten Liste; Dicts/Skalare gelten in jeder Zeile.
-        """
-        # Nur Listen zählen für die Zeilenanzahl
-        list_lengths = [len(v) for v in data.values() if isinstance(v, list)]
-        max_rows = max(list_lengths) if list_lengths else 1
-
-        rows = []
-        for i in range(max_rows):
-            row = {}
-            for key, value in data.items():
-                if isinstance(value, list):
-                    item = value[i] if i < len(value) else None
-                else:
-                    # Dicts & Skalare nicht zeilenbildend: in jeder Zeile
-                    # gleich
-                    item = value
-
-                if item is None:
-                    # explizit Null setzen, damit Spalten konsistent sind
-                    row[key] = None
-                else:
-                    row.update(flatten_nested(item, key, sep))
-
-            rows.append(row)
-
-        return pl.DataFrame(rows)
-    return (dict_to_dataframe,)
+    # Normalized tables written by format_and_serialize_all.py (mofsy2parquet)
+    tables_dir = mo.notebook_dir() / "../../data/MOCOF-1/converted/parquet"
+    return (tables_dir,)
 
 
 @app.cell
@@ -114,34 +44,37 @@ def _(mo, pl):
 
 
 @app.cell
-def _(api, dict_to_dataframe, molar_fraction, pl, procedure):
-    _df = []
-    for _id in molar_fraction["id"]:
-        _df.append(
-            dict_to_dataframe(
-                api.get_synthesis_by_experiment_id(procedure, _id).to_dict()
-            ).with_columns(id=pl.lit(_id))
-        )
-    _df = pl.concat(_df, how="diagonal")
-    _cols = _df.columns
-    _cols.sort()
-    _df = _df.select(_cols)
+def _(load_table, molar_fraction, pl, tables_dir):
+    # The first preparation step adds the aminoporphyrin precursor
+    _first_prep_step = (
+        load_table(
+            tables_dir, "steps",
+            columns=["experiment_id", "section", "position", "amount_value", "amount_unit"])
+        .filter((pl.col("section") == "prep") & (pl.col("position") == 0))
+        .select("experiment_id", "amount_value", "amount_unit")
+    )
+    _df = (
+        load_table(tables_dir, "syntheses", columns=["experiment_id", "product", "vessel"])
+        .join(_first_prep_step, on="experiment_id", how="left")
+        .rename({"experiment_id": "id"})
+    )
     df_procedure = molar_fraction.join(_df, on="id", how="left")
     return (df_procedure,)
 
 
 @app.cell
-def _(api, characterization, dict_to_dataframe, molar_fraction, pl):
-
-    _df = []
-    for _id in molar_fraction["id"]:
-        _df.append(
-            dict_to_dataframe(
-                api.get_characterization_by_experiment_id(
-                    characterization, _id).to_dict()
-            ).with_columns(id=pl.lit(_id))
+def _(load_table, molar_fraction, pl, tables_dir):
+    # The first weighing is the product mass
+    df_characterization = (
+        load_table(tables_dir, "weights", columns=["experiment_id", "position", "value", "unit"])
+        .filter(pl.col("position") == 0)
+        .select(
+            pl.col("experiment_id").alias("id"),
+            pl.col("value").alias("weight_value"),
+            pl.col("unit").alias("weight_unit"),
         )
-    df_characterization = pl.concat(_df, how="diagonal")
+        .join(molar_fraction.select("id"), on="id", how="semi")
+    )
     return (df_characterization,)
 
 
@@ -218,7 +151,7 @@ def _(df_2, df_characterization, df_procedure, formula_mass, pl):
         .join(
             df_characterization.select(
                 "id",
-                (pl.col("Characterization_Weight_0_Weight_Value") * 1e-3).alias(
+                (pl.col("weight_value") * 1e-3).alias(
                     "product_mass_g"
                 ),
             ),
@@ -227,7 +160,7 @@ def _(df_2, df_characterization, df_procedure, formula_mass, pl):
         .join(
             df_procedure.select(
                 "id",
-                (pl.col("Procedure_Prep_Step_0__amount_Value") * 1e-6).alias(
+                (pl.col("amount_value") * 1e-6).alias(
                     "precursor_amount_mol"
                 ),
             ),
@@ -0,0 +1,267 @@
+"""
+Cross-validation of decision tree pipelines in a single pass.
+
+cross_val_score and cross_val_predict each refit the whole pipeline
+(imputer + one-hot encoder + tree) in every fold, and evaluating several
+models repeats the preprocessing for every model. Here every fold fits its
+preprocessor once, all models sharing that preprocessor are trained on the
+transformed fold, and accuracy (or R^2 / MSE), the confusion matrix and the
+out-of-fold predictions are all computed from the same predictions. Folds
+run in parallel with joblib, and with a joblib.Memory the fitted fold
+preprocessing is also reused across calls (like the memory argument of
+sklearn.pipeline.Pipeline). Pipelines with a "passthrough" preprocess step
+(the range tree of create_model) are trained on the folds of X directly.
+
+Usage:
+    from sklearn.model_selection import RepeatedKFold
+
+    result = cross_validate_model(
+        model, X, y_encoded,
+        cv=RepeatedKFold(n_splits=5, n_repeats=3, random_state=42),
+        task_is_classification=True,
+        n_jobs=-1)
+    print(result.summary())
+    y_pred_cv = result.oof_predictions[0]  # out-of-fold predictions of the first repeat
+
+cross_validate_ccp_alphas evaluates a range tree pruned with several ccp_alpha
+values from a single fully grown tree per fold (see
+RangeDecisionTreeClassifier.predict_path) instead of one fit per value.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Sequence
+
+import numpy as np
+from joblib import Memory, Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, confusion_matrix, mean_squared_error, r2_score
+from sklearn.pipeline import Pipeline
+
+PREPROCESS_STEP = "preprocess"
+
+
+@dataclass
+class CrossValidationResult:
+    """Metrics and out-of-fold predictions of one model from one cross-validation pass."""
+    task_is_classification: bool
+    # metric name -> score of every fold (over all repeats)
+    fold_scores: Dict[str, np.ndarray]
+    # shape (n_repeats, n_samples): prediction of every sample by the model that did not see it
+    oof_predictions: np.ndarray
+    # pooled over all repeats, rows are true and columns predicted classes (classification only)
+    confusion_matrix: np.ndarray | None = None
+
+    def summary(self) -> str:
+        if self.task_is_classification:
+            accuracy = self.fold_scores["accuracy"]
+            return f"Accuracy: {accuracy.mean():.2f} ± {accuracy.std():.2f}\n"
+        r2 = self.fold_scores["r2"]
+        mse = self.fold_scores["mse"]
+        return (f"R^2  mean ± std : {r2.mean():.3f} ± {r2.std():.3f}\n"
+                f"MSE mean ± std : {mse.mean():.4f} ± {mse.std():.4f}")
+
+
+def _split_pipeline(model: Pipeline):
+    """(preprocessor, final estimator) of a pipeline built by create_model."""
+    if len(model.steps) != 2 or model.steps[0][0] != PREPROCESS_STEP:
+        raise ValueError(
+            f"Expected a pipeline of '{PREPROCESS_STEP}' and an estimator, got steps "
+            f"{[name for name, _ in model.steps]}")
+    return model.steps[0][1], model.steps[1][1]
+
+
+def _fit_transform_fold(preprocess, X, y, train, test):
+    """Fit the preprocessor on the training part of a fold and transform both parts."""
+    preprocess = clone(preprocess)
+    X_train = preprocess.fit_transform(X.iloc[train], y[train])
+    X_test = preprocess.transform(X.iloc[test])
+    return X_train, X_test
+
+
+def _split_fold(preprocess, X, y, train, test):
+    """The training and test part of a fold, for a "passthrough" preprocess step."""
+    return X.iloc[train], X.iloc[test]
+
+
+def _evaluate_fold(fit_transform_fold, preprocess, estimators, X, y, train, test):
+    X_train, X_test = fit_transform_fold(preprocess, X, y, train, test)
+    predictions = []
+    for estimator in estimators:
+        estimator = clone(estimator)
+        estimator.fit(X_train, y[train])
+        predictions.append(estimator.predict(X_test))
+    return predictions
+
+
+def _evaluate_fold_ccp_alphas(fit_transform_fold, preprocess, estimator, ccp_alphas, X, y, train, test):
+    X_train, X_test = fit_transform_fold(preprocess, X, y, train, test)
+    estimator = clone(estimator).set_params(ccp_alpha=0.0)
+    estimator.fit(X_train, y[train])
+    return list(estimator.predict_path(X_test, ccp_alphas))
+
+
+def _n_repeats(cv) -> int:
+    return getattr(cv, "n_repeats", 1)
+
+
+def _collect_results(
+        names: Sequence[Hashable],
+        tasks,
+        fold_predictions,
+        y,
+        n_repeats: int,
+        n_splits: int,
+        task_is_classification: bool) -> Dict[Hashable, CrossValidationResult]:
+    """
+    Scores, out-of-fold predictions and confusion matrices from the fold predictions.
+
+    tasks holds (model names, test indices) of every evaluated fold, in the
+    order of the splits for every group of models, and fold_predictions the
+    predictions of these models.
+    """
+    folds_per_repeat = n_splits // n_repeats
+    oof = {name: np.empty((n_repeats, len(y)), dtype=y.dtype) for name in names}
+    scores: Dict[Hashable, Dict[str, List[float]]] = {name: {} for name in names}
+    for i, ((task_names, test), predictions) in enumerate(zip(tasks, fold_predictions)):
+        repeat = (i % n_splits) // folds_per_repeat
+        for name, prediction in zip(task_names, predictions):
+            oof[name][repeat, test] = prediction
+            if task_is_classification:
+                metrics = {"accuracy": accuracy_score(y[test], prediction)}
+            else:
+                metrics = {"r2": r2_score(y[test], prediction),
+                           "mse": mean_squared_error(y[test], prediction)}
+            for metric, score in metrics.items():
+                scores[name].setdefault(metric, []).append(score)
+
+    results = {}
+    for name in names:
+        cm = None
+        if task_is_classification:
+            cm = confusion_matrix(
+                np.tile(y, n_repeats), oof[name].ravel(), labels=np.unique(y))
+        results[name] = CrossValidationResult(
+            task_is_classification=task_is_classification,
+            fold_scores={metric: np.array(values) for metric, values in scores[name].items()},
+            oof_predictions=oof[name],
+            confusion_matrix=cm)
+    return results
+
+
+def cross_validate_models(
+        models: Dict[str, Pipeline],
+        X,
+        y,
+        cv,
+        task_is_classification: bool,
+        n_jobs: int | None = None,
+        memory: Memory | str | None = None) -> Dict[str, CrossValidationResult]:
+    """
+    Cross-validate several pipelines on the same folds in one pass.
+
+    Models whose pipelines share the same preprocessor object (as the models of
+    generate_decision_trees.py do) reuse one fitted preprocessor per fold.
+
+    Args:
+        models (Dict[str, Pipeline]): Pipelines of a "preprocess" step and an estimator, by name.
+        X (pd.DataFrame): Feature matrix.
+        y (np.ndarray): Target, label encoded for classification.
+        cv: A KFold-like splitter whose repeats each cover every sample once, e.g. RepeatedKFold.
+        task_is_classification (bool): Report accuracy and confusion matrix instead of R^2 and MSE.
+        n_jobs (int | None): Number of parallel jobs over the folds, -1 for all cores.
+        memory (Memory | str | None): joblib.Memory or cache directory for the fitted fold preprocessing.
+
+    Returns:
+        Dict[str, CrossValidationResult]: Result per model name.
+    """
+    y = np.asarray(y)
+    n_repeats = _n_repeats(cv)
+    splits = list(cv.split(X, y))
+
+    # Group the models by their preprocessor, each group is evaluated with one fit per fold
+    groups: Dict[int, List[str]] = {}
+    for name, model in models.items():
+        groups.setdefault(id(_split_pipeline(model)[0]), []).append(name)
+
+    if isinstance(memory, str) or memory is None:
+        memory = Memory(location=memory, verbose=0)
+    fit_transform_fold = memory.cache(_fit_transform_fold)
+
+    tasks = []
+    for names in groups.values():
+        preprocess = _split_pipeline(models[names[0]])[0]
+        estimators = [_split_pipeline(models[name])[1] for name in names]
+        prepare_fold = _split_fold if preprocess == "passthrough" else fit_transform_fold
+        tasks.extend(((names, test), delayed(_evaluate_fold)(
+            prepare_fold, preprocess, estimators, X, y, train, test))
+            for train, test in splits)
+    fold_predictions = Parallel(n_jobs=n_jobs)(task for _, task in tasks)
+
+    return _collect_results(
+        list(models), [task for task, _ in tasks], fold_predictions, y,
+        n_repeats, len(splits), task_is_classification)
+
+
+def cross_validate_model(
+        model: Pipeline,
+        X,
+        y,
+        cv,
+        task_is_classification: bool,
+        n_jobs: int | None = None,
+        memory: Memory | str | None = None) -> CrossValidationResult:
+    """Cross-validate a single pipeline, see cross_validate_models."""
+    return cross_validate_models(
+        {"model": model}, X, y, cv, task_is_classification, n_jobs, memory)["model"]
+
+
+def cross_validate_ccp_alphas(
+        model: Pipeline,
+        X,
+        y,
+        cv,
+        ccp_alphas,
+        task_is_classification: bool,
+        n_jobs: int | None = None,
+        memory: Memory | str | None = None) -> Dict[float, CrossValidationResult]:
+    """
+    Cross-validate a range tree pipeline pruned with every alpha in ccp_alphas.
+
+    Every fold grows the tree once (with ccp_alpha=0) and predicts with all
+    subtrees of its pruning sequence, so the cost is one fit per fold instead
+    of one per fold and alpha.
+
+    Args:
+        model (Pipeline): Pipeline of a "preprocess" step and a range tree
+            (RangeDecisionTreeClassifier or RangeDecisionTreeRegressor).
+        X (pd.DataFrame): Feature matrix.
+        y (np.ndarray): Target, label encoded for classification.
+        cv: A KFold-like splitter whose repeats each cover every sample once, e.g. RepeatedKFold.
+        ccp_alphas: Complexity parameters, e.g. from cost_complexity_pruning_path on all of X.
+        task_is_classification (bool): Report accuracy and confusion matrix instead of R^2 and MSE.
+        n_jobs (int | None): Number of parallel jobs over the folds, -1 for all cores.
+        memory (Memory | str | None): joblib.Memory or cache directory for the fitted fold preprocessing.
+
+    Returns:
+        Dict[float, CrossValidationResult]: Result per alpha.
+    """
+    y = np.asarray(y)
+    # Every alpha once, duplicates would be scored twice under the same key
+    ccp_alphas = list(dict.fromkeys(float(ccp_alpha) for ccp_alpha in ccp_alphas))
+    n_repeats = _n_repeats(cv)
+    splits = list(cv.split(X, y))
+
+    preprocess, estimator = _split_pipeline(model)
+    if preprocess == "passthrough":
+        prepare_fold = _split_fold
+    else:
+        if isinstance(memory, str) or memory is None:
+            memory = Memory(location=memory, verbose=0)
+        prepare_fold = memory.cache(_fit_transform_fold)
+
+    fold_predictions = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate_fold_ccp_alphas)(prepare_fold, preprocess, estimator, ccp_alphas, X, y, train, test)
+        for train, test in splits)
+    return _collect_results(
+        ccp_alphas, [(ccp_alphas, test) for _, test in splits], fold_predictions, y,
+        n_repeats, len(splits), task_is_classification)
@@ -1,12 +1,47 @@
-from fair_synthesis.analysis.decision_tree.range_decision_tree import RangeDecisionTreeClassifier
+from fair_synthesis.analysis.decision_tree.range_decision_tree import RangeDecisionTreeClassifier, \
+    RangeDecisionTreeRegressor
 from sklearn.tree import DecisionTreeClassifier, ExtraTreeClassifier
 from sklearn.tree import ExtraTreeRegressor
 from sklearn.tree import DecisionTreeRegressor
 from sklearn.pipeline import Pipeline
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import OneHotEncoder
+from sklearn.compose import ColumnTransformer
 import pandas as pd
 pd.set_option("display.max_rows", None)
 
 
+def create_preprocess(X: pd.DataFrame):
+    """
+    Median imputation of the numeric and one-hot encoding of the categorical
+    columns of X. Returns (preprocess, numeric_cols, categorical_cols).
+    """
+    numeric_cols = X.select_dtypes(include=["int64", "float64"]).columns.tolist()
+    numeric_pipe = Pipeline(
+        [("imputer", SimpleImputer(strategy="median"))])  # optional
+
+    categorical_cols = X.select_dtypes(include=["object", "bool", "category"]).columns.tolist()
+    categorical_pipe = Pipeline([
+        ("onehot", OneHotEncoder(handle_unknown="ignore"))
+    ])
+
+    preprocess = ColumnTransformer(
+        [("num", numeric_pipe, numeric_cols),
+         ("cat", categorical_pipe, categorical_cols)]
+    )
+    return preprocess, numeric_cols, categorical_cols
+
+
+def get_feature_names(model: Pipeline, numeric_cols, categorical_cols):
+    """Feature names of a fitted model after one-hot encoding."""
+    if model.named_steps["preprocess"] == "passthrough":
+        # The range tree sees the columns of X unchanged
+        return list(model.steps[-1][1].feature_names_in_)
+    ohe = model.named_steps["preprocess"].named_transformers_[
+        "cat"].named_steps["onehot"]
+    return list(numeric_cols) + list(ohe.get_feature_names_out(categorical_cols))
+
+
 def create_model(
         task_is_classification: bool,
         range_tree: bool,
@@ -15,14 +50,17 @@ def create_model(
         preprocess):
     if task_is_classification:
         if range_tree:
+            # The range tree splits categorical columns and routes missing values
+            # itself, so X is passed through without imputation and one-hot encoding
             model = Pipeline([
-                ("preprocess", preprocess),
+                ("preprocess", "passthrough"),
                 ("classifier", RangeDecisionTreeClassifier(
-                    max_depth=4,
+                    max_depth=max_depth,
                     min_samples_leaf=5,
                     split_strategy='both',  # Evaluates both standard and range splits
                     max_range_splits=10,
-                    random_state=0
+                    random_state=0,
+                    categorical_features="from_dtype"
                 ))
             ])
         elif extra_tree:
@@ -46,7 +84,20 @@ def create_model(
                 ))
             ])
     else:
-        if extra_tree:
+        if range_tree:
+            # Like the range classifier, without imputation and one-hot encoding
+            model = Pipeline([
+                ("preprocess", "passthrough"),
+                ("regressor", RangeDecisionTreeRegressor(
+                    max_depth=max_depth,
+                    min_samples_leaf=5,
+                    split_strategy='both',
+                    max_range_splits=10,
+                    random_state=0,
+                    categorical_features="from_dtype"
+                ))
+            ])
+        elif extra_tree:
             model = Pipeline(
                 [("preprocess", preprocess), ("regressor", ExtraTreeRegressor(
                     max_depth=max_depth,  # Explicit limit
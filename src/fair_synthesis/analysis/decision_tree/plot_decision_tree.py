@@ -25,6 +25,9 @@ def plot_decision_tree_matplotlib(label, clf, feature_names):  # unused now
 
 def plot_decision_tree_graphviz(label, clf, feature_names, max_depth, plots_dir: Path):
     # customized export using graphviz, suitable for full tree
+    if getattr(clf, "tree_", None) is None:
+        raise ValueError(
+            f"Cannot plot {label}: the tree has no tree_, e.g. it is unfitted or loaded with load_range_tree")
     dot = export_graphviz(
         clf,
         feature_names=feature_names,
@@ -131,7 +134,7 @@ def plot_decision_tree_dtreeviz(
         y_train=y_encoded,
         feature_names=feature_names_clean,
         target_name=target_label,
-        class_names=list(class_names_ordered),
+        class_names=list(class_names_ordered) if class_names_ordered is not None else None,
     )
 
     v_subset = viz_model.view(
@@ -1,20 +1,37 @@
 """
-Custom Decision Tree Classifier with Range-Based Splits
-========================================================
+Custom Decision Trees with Range-Based Splits
+=============================================
 
-This module provides a RangeDecisionTreeClassifier that extends traditional
-decision trees to support range-based split conditions.
+This module provides a RangeDecisionTreeClassifier and a
+RangeDecisionTreeRegressor that extend traditional decision trees to support
+range-based split conditions.
 
 Supported split types:
 1. Standard splits: feature <= threshold
 2. Range splits: feature in [lower, upper]
+3. Categorical splits: feature in {category, ...} (for categorical features)
 
-The "outside range" case is automatically the false branch of the range split.
+The "outside range" case is automatically the false branch of the range split,
+and the categories not in the subset form the false branch of a categorical split.
+Missing values (NaN) are sent to the branch that gives the higher information
+gain, learned at every split whose training samples have missing values.
+
+Trees can be pruned by minimal cost-complexity pruning (ccp_alpha), with the
+whole pruning sequence computed once from the grown tree when it is first
+needed (ccp_alpha > 0, predict_path or cost_complexity_pruning_path).
 """
 
 import numpy as np
+import pandas as pd
 from collections import Counter
-from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.base import BaseEstimator, ClassifierMixin, RegressorMixin, clone
+from sklearn.utils import Bunch
+
+# Bin code of missing values in the binned training mode (max_bins)
+MISSING_BIN = 255
+
+# Relative tolerance below which effective alphas of the pruning sequence are equal
+ALPHA_RTOL = 1e-9
 
 
 class Node:
@@ -25,89 +42,213 @@ class Node:
         feature: Index of the feature to split on (None for leaf nodes)
         threshold: Threshold value for standard splits
         range_bounds: Tuple (lower, upper) for range splits
-        split_type: 'standard' or 'range'
+        categories: Frozenset of the category codes of the left branch for categorical splits
+        split_type: 'standard', 'range' or 'categorical'
         left: Left child node (True branch)
         right: Right child node (False branch)
-        value: Class prediction for leaf nodes
+        missing_go_to_left: Whether missing values take the left branch, None if no
+            training sample at this node had a missing value (then they take the
+            branch with more samples)
+        value: Class prediction (classifier) or mean target (regressor) for leaf nodes
         samples: Number of samples at this node
-        impurity: Gini impurity at this node
+        impurity: Gini impurity (classifier) or variance (regressor) at this node
+        distribution: Class counts (classifier) or [mean target] (regressor) at this node
     """
 
     def __init__(self, feature=None, threshold=None, range_bounds=None,
                  split_type='standard', left=None, right=None, value=None,
-                 samples=None, impurity=None):
+                 samples=None, impurity=None, categories=None,
+                 missing_go_to_left=None, distribution=None):
         self.feature = feature
         self.threshold = threshold
         self.range_bounds = range_bounds
+        self.categories = categories
         self.split_type = split_type
         self.left = left
         self.right = right
+        self.missing_go_to_left = missing_go_to_left
         self.value = value
         self.samples = samples
         self.impurity = impurity
+        self.distribution = distribution
 
 
-class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
-    """
-    Decision Tree Classifier with support for range-based splits.
+# Split type codes of FlatTree
+LEAF = -1
+STANDARD = 0
+RANGE = 1
+CATEGORICAL = 2
+SPLIT_TYPE_CODES = {'standard': STANDARD, 'range': RANGE, 'categorical': CATEGORICAL}
 
-    This classifier extends standard decision trees (CART) to evaluate both
-    traditional threshold-based splits (feature <= threshold) and range-based
-    splits (feature in [lower, upper]). At each node, the algorithm evaluates
-    both split types and selects the one with the highest information gain.
 
-    Parameters
-    ----------
-    max_depth : int, default=None
-        The maximum depth of the tree. If None, then nodes are expanded until
-        all leaves are pure or until they contain less than min_samples_split samples.
+class FlatTree:
+    """
+    Array representation of a fitted tree for vectorized prediction.
 
-    min_samples_split : int, default=2
-        The minimum number of samples required to split an internal node.
+    Node i of the Node graph in depth-first order (root = 0) is described by
+    entry i of every array. A sample goes left at a standard or range split if
+    lower <= x <= upper (lower = -inf for standard splits), at a categorical
+    split if category_left[category_offset + code] is set, and if x is missing
+    as given by missing_go_to_left.
 
-    min_samples_leaf : int, default=1
-        The minimum number of samples required to be at a leaf node.
-
-    split_strategy : str, default='both'
-        Strategy for evaluating splits:
-        - 'standard': Only evaluate standard <= threshold splits
-        - 'range': Only evaluate range [a,b] splits
-        - 'both': Evaluate both types at each node and select the best
-
-    max_range_splits : int, default=10
-        Maximum number of range combinations to evaluate per feature.
-        This controls computational cost. Higher values are more thorough
-        but slower. For datasets with ~50 samples, 10 is a good default.
+    Attributes:
+        children_left, children_right: Child node indices, -1 for leaves
+        feature: Feature index of the split, -1 for leaves
+        split_type: LEAF, STANDARD, RANGE or CATEGORICAL
+        lower, upper: Bounds of the left branch of standard and range splits
+        category_offset: Start of the categories of a categorical split in category_left, -1 otherwise
+        category_left: Concatenated masks (one entry per category) of the left branches of categorical splits
+        missing_go_to_left: Direction of missing values (learned or towards the larger child)
+        n_node_samples: Number of training samples at the node
+        impurity: Impurity at the node
+        value: Class counts (classifier) or mean target (regressor) at the node, shape (n_nodes, n_outputs)
+        prediction: Prediction at the node, the class index for classifiers
+        prune_alpha: Effective alpha from which the node is pruned to a leaf (inf for leaves),
+            computed from the pruning sequence on first use
+    """
 
-    random_state : int, default=None
-        Controls the randomness in range split evaluation.
+    def __init__(self, children_left, children_right, feature, split_type, lower, upper,
+                 category_offset, category_left, missing_go_to_left, n_node_samples,
+                 impurity, value, prediction, prune_alpha=None):
+        self.children_left = children_left
+        self.children_right = children_right
+        self.feature = feature
+        self.split_type = split_type
+        self.lower = lower
+        self.upper = upper
+        self.category_offset = category_offset
+        self.category_left = category_left
+        self.missing_go_to_left = missing_go_to_left
+        self.n_node_samples = n_node_samples
+        self.impurity = impurity
+        self.value = value
+        self.prediction = prediction
+        self._prune_alpha = prune_alpha
+
+    @property
+    def node_count(self):
+        return len(self.children_left)
+
+    @property
+    def prune_alpha(self):
+        # Only pruning needs the pruning sequence, so it is not computed in fit
+        if self._prune_alpha is None:
+            self._prune_alpha = _cost_complexity_pruning(self)[0]
+        return self._prune_alpha
+
+    @classmethod
+    def from_node(cls, root, categories, prediction_of):
+        """
+        Flatten a Node graph.
 
-    Attributes
-    ----------
-    tree_ : Node
-        The underlying tree structure.
+        Parameters
+        ----------
+        root : Node
+            Root of the tree.
 
-    classes_ : ndarray of shape (n_classes,)
-        The class labels.
+        categories : list of (ndarray or None)
+            categories_ of the estimator, for the size of the categorical masks.
 
-    n_classes_ : int
-        The number of classes.
+        prediction_of : callable
+            Returns the (numeric) prediction of a node.
+        """
+        nodes = _preorder(root)
+        index = {id(node): i for i, node in enumerate(nodes)}
+
+        n_nodes = len(nodes)
+        children_left = np.full(n_nodes, -1, dtype=np.int32)
+        children_right = np.full(n_nodes, -1, dtype=np.int32)
+        feature = np.full(n_nodes, -1, dtype=np.int32)
+        split_type = np.full(n_nodes, LEAF, dtype=np.int8)
+        lower = np.full(n_nodes, np.nan)
+        upper = np.full(n_nodes, np.nan)
+        category_offset = np.full(n_nodes, -1, dtype=np.int64)
+        category_masks = []
+        n_category_entries = 0
+        missing_go_to_left = np.zeros(n_nodes, dtype=bool)
+        for i, node in enumerate(nodes):
+            if node.value is not None:
+                continue
+            children_left[i] = index[id(node.left)]
+            children_right[i] = index[id(node.right)]
+            feature[i] = node.feature
+            split_type[i] = SPLIT_TYPE_CODES[node.split_type]
+            missing_go_to_left[i] = _missing_goes_left(node)
+            if node.split_type == 'standard':
+                lower[i], upper[i] = -np.inf, node.threshold
+            elif node.split_type == 'range':
+                lower[i], upper[i] = node.range_bounds
+            elif node.split_type == 'categorical':
+                mask = np.zeros(len(categories[node.feature]), dtype=bool)
+                mask[list(node.categories)] = True
+                category_offset[i] = n_category_entries
+                category_masks.append(mask)
+                n_category_entries += len(mask)
+
+        return cls(
+            children_left=children_left,
+            children_right=children_right,
+            feature=feature,
+            split_type=split_type,
+            lower=lower,
+            upper=upper,
+            category_offset=category_offset,
+            category_left=np.concatenate(category_masks) if category_masks else np.zeros(0, dtype=bool),
+            missing_go_to_left=missing_go_to_left,
+            n_node_samples=np.array([node.samples for node in nodes], dtype=np.int64),
+            impurity=np.array([node.impurity for node in nodes], dtype=float),
+            value=np.array([node.distribution for node in nodes], dtype=float),
+            prediction=np.array([prediction_of(node) for node in nodes], dtype=float))
+
+    def apply(self, X, ccp_alpha=None):
+        """
+        Index of the leaf reached by every sample of the encoded X.
 
-    n_features_ : int
-        The number of input features.
+        All samples descend one level per iteration, so the cost is
+        O(depth) vectorized steps instead of a Python call per sample and node.
+        With ccp_alpha, the samples stop at the nodes that are leaves of the
+        tree pruned with ccp_alpha.
+        """
+        is_leaf = self.children_left == -1
+        if ccp_alpha is not None and ccp_alpha > 0:
+            is_leaf = is_leaf | (self.prune_alpha <= ccp_alpha)
+
+        nodes = np.zeros(len(X), dtype=np.intp)
+        active = np.arange(len(X)) if not is_leaf[0] else np.zeros(0, dtype=np.intp)
+        while len(active):
+            current = nodes[active]
+            x = X[active, self.feature[current]]
+            go_left = (self.lower[current] <= x) & (x <= self.upper[current])
+
+            categorical = np.flatnonzero(self.split_type[current] == CATEGORICAL)
+            if len(categorical):
+                codes = x[categorical]
+                known = codes >= 0  # False for unknown (-1) and missing categories
+                entries = self.category_offset[current[categorical]] + np.where(known, codes, 0).astype(np.intp)
+                go_left[categorical] = known & self.category_left[entries]
+
+            missing = np.isnan(x)
+            go_left[missing] = self.missing_go_to_left[current[missing]]
+
+            nodes[active] = np.where(
+                go_left, self.children_left[current], self.children_right[current])
+            active = active[~is_leaf[nodes[active]]]
+        return nodes
+
+
+class BaseRangeDecisionTree(BaseEstimator):
+    """
+    Split engine shared by RangeDecisionTreeClassifier and RangeDecisionTreeRegressor.
 
-    feature_importances_ : ndarray of shape (n_features_,)
-        Impurity-based feature importances.
+    Every candidate split is scored from sums of per-sample statistics over its
+    left branch (class indicators for classification, 1, y and y^2 for
+    regression). The samples of a node are grouped once per feature by unique
+    value, bin or category, so that the statistics of every threshold, range
+    and category subset are differences of cumulative sums and each candidate
+    is scored in O(1). Subclasses define the statistics, the impurity computed
+    from them and the values of the leaves.
 
-    Examples
-    --------
-    >>> from sklearn.datasets import make_classification
-    >>> from sklearn.model_selection import train_test_split
-    >>> X, y = make_classification(n_samples=100, n_features=4, n_classes=2, random_state=42)
-    >>> X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
-    >>> clf = RangeDecisionTreeClassifier(max_depth=3, split_strategy='both')
-    >>> clf.fit(X_train, y_train)
-    >>> clf.score(X_test, y_test)
+    The parameters are documented in RangeDecisionTreeClassifier.
     """
 
     def __init__(
@@ -117,104 +258,155 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
             min_samples_leaf=1,
             split_strategy='both',
             max_range_splits=10,
-            random_state=None):
+            random_state=None,
+            categorical_features=None,
+            max_bins=None,
+            ccp_alpha=0.0):
         self.max_depth = max_depth
         self.min_samples_split = min_samples_split
         self.min_samples_leaf = min_samples_leaf
         self.split_strategy = split_strategy
         self.max_range_splits = max_range_splits
         self.random_state = random_state
+        self.categorical_features = categorical_features
+        self.max_bins = max_bins
+        self.ccp_alpha = ccp_alpha
 
         self.tree_ = None
-        self.classes_ = None
-        self.n_classes_ = None
         self.n_features_ = None
         self.feature_importances_ = None
 
-    def _gini_impurity(self, y):
-        """
-        Calculate Gini impurity for a set of class labels.
+    def _prepare_target(self, y):
+        """Convert y to an array and store target information (e.g. classes_)."""
+        raise NotImplementedError
 
-        Gini impurity measures the probability of incorrectly classifying a
-        randomly chosen element if it were randomly labeled according to the
-        class distribution at this node.
+    def _sample_statistics(self, y):
+        """Per-sample statistics of shape (n_samples, n_statistics) whose sums score splits."""
+        raise NotImplementedError
 
-        Gini = 1 - sum(p_i^2) where p_i is the proportion of class i
+    def _count_from_statistics(self, stats):
+        """Number of samples of summed statistics, for the last axis of stats."""
+        raise NotImplementedError
 
-        Parameters
-        ----------
-        y : array-like of shape (n_samples,)
-            Class labels.
+    def _impurity_from_statistics(self, stats):
+        """Impurity of summed statistics, for the last axis of stats."""
+        raise NotImplementedError
 
-        Returns
-        -------
-        float
-            Gini impurity value between 0 (pure) and 0.5 (maximally impure).
-        """
-        if len(y) == 0:
-            return 0
+    def _category_order_key(self, group_stats, node_stats):
+        """Sort key of the categories of a node for the categorical splits."""
+        raise NotImplementedError
 
-        counter = Counter(y)
-        impurity = 1.0
+    def _leaf_value(self, y):
+        """Prediction of a leaf with the targets y."""
+        raise NotImplementedError
 
-        for count in counter.values():
-            prob = count / len(y)
-            impurity -= prob ** 2
+    def _node_impurity(self, y):
+        """Impurity of a node with the targets y."""
+        raise NotImplementedError
 
-        return impurity
+    def _node_distribution(self, y):
+        """Class counts or [mean target] of a node with the targets y, stored in FlatTree.value."""
+        raise NotImplementedError
+
+    def _node_prediction(self, node):
+        """Numeric prediction of a node for FlatTree.prediction."""
+        raise NotImplementedError
+
+    def _format_leaf(self, node):
+        """Prediction of a leaf for print_tree."""
+        raise NotImplementedError
 
-    def _information_gain(self, y, y_left, y_right):
+    def _predictions_from_values(self, values):
+        """Predictions from the numeric FlatTree.prediction of the leaves."""
+        return values
+
+    def _value_from_distribution(self, distribution):
+        """Leaf value of an internal node that is pruned to a leaf."""
+        raise NotImplementedError
+
+    def _ordered_groups(self, X, feature_idx):
         """
-        Calculate information gain from a split.
+        Group the non-missing samples of a numeric feature by value.
 
-        Information Gain = Impurity(parent) - weighted_average(Impurity(children))
+        The groups are the unique values of the feature at the node, or the bins
+        present at the node in the binned training mode, in ascending order.
 
         Parameters
         ----------
-        y : array-like of shape (n_samples,)
-            Class labels of parent node.
-
-        y_left : array-like of shape (n_left,)
-            Class labels of left child.
+        X : ndarray of shape (n_samples, n_features)
+            Feature matrix (bin codes if max_bins is set).
 
-        y_right : array-like of shape (n_right,)
-            Class labels of right child.
+        feature_idx : int
+            Index of the feature to evaluate.
 
         Returns
         -------
-        float
-            Information gain from the split.
+        missing : ndarray of shape (n_samples,)
+            True for missing values.
+        groups : ndarray of shape (n_samples,)
+            Group index of every sample, -1 for missing values.
+        lower_values, upper_values : ndarray of shape (n_groups,)
+            Smallest and largest training value of every group.
         """
-        n = len(y)
-        n_left = len(y_left)
-        n_right = len(y_right)
-
-        if n_left == 0 or n_right == 0:
-            return 0
+        values = X[:, feature_idx]
+        missing = _is_missing(values)
+        unique_values, present_groups = np.unique(values[~missing], return_inverse=True)
+        if self.max_bins is None:
+            lower_values = upper_values = unique_values
+        else:
+            lower_values = self.bin_min_[feature_idx][unique_values]
+            upper_values = self.bin_max_[feature_idx][unique_values]
 
-        impurity_parent = self._gini_impurity(y)
-        impurity_left = self._gini_impurity(y_left)
-        impurity_right = self._gini_impurity(y_right)
+        groups = np.full(len(values), -1, dtype=np.intp)
+        groups[~missing] = present_groups
+        return missing, groups, lower_values, upper_values
 
-        weighted_impurity = (n_left / n) * impurity_left + \
-            (n_right / n) * impurity_right
+    def _group_statistics(self, stats, missing, groups, n_groups):
+        """
+        Sums of the sample statistics per group and of the missing values.
 
-        return impurity_parent - weighted_impurity
+        Returns
+        -------
+        group_stats : ndarray of shape (n_groups, n_statistics)
+        missing_stats : ndarray of shape (n_statistics,)
+        """
+        present_stats = stats[~missing]
+        group_stats = np.column_stack([
+            np.bincount(groups[~missing], weights=present_stats[:, k], minlength=n_groups)
+            for k in range(stats.shape[1])])
+        return group_stats, stats[missing].sum(axis=0)
 
-    def _evaluate_standard_splits(self, X, y, feature_idx):
+    def _split_gains(self, node_stats, left_stats):
+        """
+        Impurity decrease of candidate splits given by the statistics of their
+        left branches (last axis), -inf where a branch violates min_samples_leaf.
+        """
+        right_stats = node_stats - left_stats
+        n_left = self._count_from_statistics(left_stats)
+        n_right = self._count_from_statistics(right_stats)
+        n = self._count_from_statistics(node_stats)
+
+        gains = self._impurity_from_statistics(node_stats) - (
+            n_left / n * self._impurity_from_statistics(left_stats) +
+            n_right / n * self._impurity_from_statistics(right_stats))
+        valid = (n_left >= self.min_samples_leaf) & (n_right >= self.min_samples_leaf)
+        return np.where(valid, gains, -np.inf)
+
+    def _evaluate_standard_splits(self, X, stats, feature_idx):
         """
         Evaluate all standard threshold splits for a feature.
 
-        Tests splits at midpoints between consecutive unique values of the feature.
-        This is the standard CART approach.
+        Tests splits at midpoints between consecutive unique values (or bins)
+        of the feature, the standard CART approach. The statistics of the left
+        branch of every threshold are a cumulative sum over the sorted values.
 
         Parameters
         ----------
         X : ndarray of shape (n_samples, n_features)
             Feature matrix.
 
-        y : array-like of shape (n_samples,)
-            Class labels.
+        stats : ndarray of shape (n_samples, n_statistics)
+            Sample statistics from _sample_statistics.
 
         feature_idx : int
             Index of the feature to evaluate.
@@ -223,53 +415,49 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
         -------
         dict or None
             Dictionary containing:
-            - 'gain': information gain of the best split
+            - 'gain': impurity decrease of the best split
             - 'feature': feature index
             - 'threshold': threshold value
             - 'split_type': 'standard'
             - 'left_mask': boolean array for left branch
+            - 'missing_go_to_left': direction of missing values (None if none)
             Or None if no valid split found.
         """
-        unique_values = np.unique(X[:, feature_idx])
+        missing, groups, lower_values, upper_values = self._ordered_groups(X, feature_idx)
+        n_values = len(lower_values)
 
-        if len(unique_values) <= 1:
+        if n_values <= 1:
             return None
 
-        # Test midpoints between consecutive unique values
-        thresholds = (unique_values[:-1] + unique_values[1:]) / 2
-
-        best_gain = -np.inf
-        best_threshold = None
-        best_left_mask = None
-
-        for threshold in thresholds:
-            left_mask = X[:, feature_idx] <= threshold
-            right_mask = ~left_mask
-
-            # Check minimum samples constraint
-            if np.sum(left_mask) < self.min_samples_leaf or \
-                    np.sum(right_mask) < self.min_samples_leaf:
-                continue
-
-            gain = self._information_gain(y, y[left_mask], y[right_mask])
-
-            if gain > best_gain:
-                best_gain = gain
-                best_threshold = threshold
-                best_left_mask = left_mask
-
-        if best_threshold is None:
+        group_stats, missing_stats = self._group_statistics(stats, missing, groups, n_values)
+        node_stats = group_stats.sum(axis=0) + missing_stats
+        directions = list(_missing_directions(missing))
+
+        # Left branch = values 0 .. t, for t = 0 .. n_values - 2, shape
+        # (thresholds, directions, statistics) so that ties go to the smallest threshold
+        below_stats = np.cumsum(group_stats, axis=0)[:-1]
+        left_stats = np.stack([
+            below_stats + missing_stats if missing_go_to_left else below_stats
+            for missing_go_to_left in directions], axis=1)
+        gains = self._split_gains(node_stats, left_stats)
+        if not np.any(np.isfinite(gains)):
             return None
+        best, direction = np.unravel_index(np.argmax(gains), gains.shape)
+        missing_go_to_left = directions[direction]
 
+        # Test midpoints between consecutive unique values
+        threshold = (upper_values[best] + lower_values[best + 1]) / 2
         return {
-            'gain': best_gain,
+            'gain': gains[best, direction],
             'feature': feature_idx,
-            'threshold': best_threshold,
+            'threshold': threshold,
             'split_type': 'standard',
-            'left_mask': best_left_mask
+            'left_mask': _route_missing(
+                (groups <= best) & ~missing, missing, missing_go_to_left),
+            'missing_go_to_left': missing_go_to_left
         }
 
-    def _evaluate_range_splits(self, X, y, feature_idx):
+    def _evaluate_range_splits(self, X, stats, feature_idx):
         """
         Evaluate range-based splits for a feature.
 
@@ -277,16 +465,19 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
         1. Left branch: values INSIDE the range
         2. Right branch: values OUTSIDE the range
 
-        To avoid O(n^2) complexity, the number of tested ranges is limited
-        by max_range_splits.
+        The statistics inside every range are the difference of two cumulative
+        sums over the sorted values, O(1) per range. The number of lower bounds
+        is limited by max_range_splits and ranges span at most half of the
+        values, except in the binned training mode where all O(bins^2) ranges
+        are evaluated.
 
         Parameters
         ----------
         X : ndarray of shape (n_samples, n_features)
             Feature matrix.
 
-        y : array-like of shape (n_samples,)
-            Class labels.
+        stats : ndarray of shape (n_samples, n_statistics)
+            Sample statistics from _sample_statistics.
 
         feature_idx : int
             Index of the feature to evaluate.
@@ -295,64 +486,134 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
         -------
         dict or None
             Dictionary containing:
-            - 'gain': information gain of the best split
+            - 'gain': impurity decrease of the best split
             - 'feature': feature index
             - 'range_bounds': tuple (lower, upper)
             - 'split_type': 'range'
             - 'left_mask': boolean array for left branch (inside range)
+            - 'missing_go_to_left': direction of missing values (None if none)
             Or None if no valid split found.
         """
-        unique_values = np.sort(np.unique(X[:, feature_idx]))
+        missing, groups, lower_values, upper_values = self._ordered_groups(X, feature_idx)
+        n_values = len(lower_values)
 
-        if len(unique_values) <= 2:
+        if n_values <= 2:
             return None
 
-        best_gain = -np.inf
-        best_range = None
-        best_left_mask = None
-
         # Limit number of ranges to evaluate
-        n_values = len(unique_values)
-        if n_values > self.max_range_splits:
+        if self.max_bins is None and n_values > self.max_range_splits:
             rng = np.random.RandomState(self.random_state)
             lower_indices = rng.choice(n_values - 1,
                                        size=self.max_range_splits,
                                        replace=False)
         else:
-            lower_indices = range(n_values - 1)
+            lower_indices = np.arange(n_values - 1)
+
+        # Range combinations [i, j] with i < j < i + max_width, in the order of
+        # the lower indices so that ties go to the first range evaluated. Ranges
+        # span at most half of the values, except in the binned training mode
+        max_width = n_values // 2 if self.max_bins is None else n_values
+        widths = np.maximum(np.minimum(lower_indices + max_width, n_values) - lower_indices - 1, 0)
+        i = np.repeat(lower_indices, widths)
+        j = i + 1 + np.arange(widths.sum()) - np.repeat(np.cumsum(widths) - widths, widths)
+        if len(i) == 0:
+            return None
 
-        # Try different range combinations
-        for i in lower_indices:
-            for j in range(i + 1, min(i + n_values // 2, n_values)):
-                lower = unique_values[i]
-                upper = unique_values[j]
+        group_stats, missing_stats = self._group_statistics(stats, missing, groups, n_values)
+        node_stats = group_stats.sum(axis=0) + missing_stats
+        directions = list(_missing_directions(missing))
+
+        cumulative = np.vstack([np.zeros(stats.shape[1]), np.cumsum(group_stats, axis=0)])
+        inside_stats = cumulative[j + 1] - cumulative[i]
+        left_stats = np.stack([
+            inside_stats + missing_stats if missing_go_to_left else inside_stats
+            for missing_go_to_left in directions], axis=1)
+        gains = self._split_gains(node_stats, left_stats)
+        if not np.any(np.isfinite(gains)):
+            return None
+        best, direction = np.unravel_index(np.argmax(gains), gains.shape)
+        missing_go_to_left = directions[direction]
 
-                # Split: inside range (left) vs outside range (right)
-                inside_mask = (X[:, feature_idx] >= lower) & (
-                    X[:, feature_idx] <= upper)
-                outside_mask = ~inside_mask
+        # Split: inside range (left) vs outside range (right)
+        inside_mask = (groups >= i[best]) & (groups <= j[best])
+        return {
+            'gain': gains[best, direction],
+            'feature': feature_idx,
+            'range_bounds': (lower_values[i[best]], upper_values[j[best]]),
+            'split_type': 'range',
+            'left_mask': _route_missing(inside_mask, missing, missing_go_to_left),
+            'missing_go_to_left': missing_go_to_left
+        }
 
-                if np.sum(inside_mask) < self.min_samples_leaf or \
-                        np.sum(outside_mask) < self.min_samples_leaf:
-                    continue
+    def _evaluate_categorical_splits(self, X, stats, feature_idx):
+        """
+        Evaluate category subset splits for a categorical feature.
 
-                gain = self._information_gain(
-                    y, y[inside_mask], y[outside_mask])
+        The categories present at the node are sorted by _category_order_key,
+        and every split between consecutive categories of this order is scored
+        from cumulative statistics, i.e. k - 1 candidate subsets for k
+        categories instead of 2^(k-1).
 
-                if gain > best_gain:
-                    best_gain = gain
-                    best_range = (lower, upper)
-                    best_left_mask = inside_mask
+        Parameters
+        ----------
+        X : ndarray of shape (n_samples, n_features)
+            Feature matrix with category codes in the categorical columns.
+
+        stats : ndarray of shape (n_samples, n_statistics)
+            Sample statistics from _sample_statistics.
+
+        feature_idx : int
+            Index of the feature to evaluate.
 
-        if best_range is None:
+        Returns
+        -------
+        dict or None
+            Dictionary containing:
+            - 'gain': impurity decrease of the best split
+            - 'feature': feature index
+            - 'categories': frozenset of the category codes of the left branch
+            - 'split_type': 'categorical'
+            - 'left_mask': boolean array for left branch (in subset)
+            - 'missing_go_to_left': direction of missing values (None if none)
+            Or None if no valid split found.
+        """
+        values = X[:, feature_idx]
+        missing = _is_missing(values)
+        codes = np.where(missing, 0, values).astype(np.intp)
+
+        # Statistics per category, restricted to the categories at this node
+        group_stats, missing_stats = self._group_statistics(
+            stats, missing, codes, len(self.categories_[feature_idx]))
+        present = np.flatnonzero(self._count_from_statistics(group_stats) > 0)
+        if len(present) <= 1:
+            return None
+        group_stats = group_stats[present]
+
+        node_stats = group_stats.sum(axis=0) + missing_stats
+        order = np.argsort(self._category_order_key(group_stats, node_stats), kind='stable')
+
+        # Left branch = first i categories of the order, for i = 1 .. k - 1,
+        # with the missing values on the right (first row) or on the left (second row)
+        subset_stats = np.cumsum(group_stats[order], axis=0)[:-1]
+        directions = list(_missing_directions(missing))
+        left_stats = np.stack([
+            subset_stats + missing_stats if missing_go_to_left else subset_stats
+            for missing_go_to_left in directions])
+        gains = self._split_gains(node_stats, left_stats)
+        if not np.any(np.isfinite(gains)):
             return None
+        direction, best = np.unravel_index(np.argmax(gains), gains.shape)
+        missing_go_to_left = directions[direction]
 
+        categories = frozenset(int(code) for code in present[order[:best + 1]])
         return {
-            'gain': best_gain,
+            'gain': gains[direction, best],
             'feature': feature_idx,
-            'range_bounds': best_range,
-            'split_type': 'range',
-            'left_mask': best_left_mask
+            'categories': categories,
+            'split_type': 'categorical',
+            'left_mask': _route_missing(
+                np.isin(codes, list(categories)) & ~missing, missing, missing_go_to_left),
+            'missing_go_to_left': missing_go_to_left
         }
 
     def _find_best_split(self, X, y):
@@ -360,7 +621,7 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
         Find the best split across all features and split types.
 
         Evaluates all features with the specified split_strategy and returns
-        the split with the highest information gain.
+        the split with the highest impurity decrease.
 
         Parameters
         ----------
@@ -368,7 +629,7 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
             Feature matrix.
 
         y : array-like of shape (n_samples,)
-            Class labels.
+            Target values.
 
         Returns
         -------
@@ -380,20 +641,30 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
         if n_samples < self.min_samples_split:
             return None
 
+        stats = self._sample_statistics(y)
+
         best_split = None
         best_gain = -np.inf
 
         for feature_idx in range(n_features):
+            # Categorical features are only split by category subsets
+            if self.is_categorical_[feature_idx]:
+                split_info = self._evaluate_categorical_splits(X, stats, feature_idx)
+                if split_info and split_info['gain'] > best_gain:
+                    best_gain = split_info['gain']
+                    best_split = split_info
+                continue
+
             # Evaluate standard splits
             if self.split_strategy in ['standard', 'both']:
-                split_info = self._evaluate_standard_splits(X, y, feature_idx)
+                split_info = self._evaluate_standard_splits(X, stats, feature_idx)
                 if split_info and split_info['gain'] > best_gain:
                     best_gain = split_info['gain']
                     best_split = split_info
 
             # Evaluate range splits
             if self.split_strategy in ['range', 'both']:
-                split_info = self._evaluate_range_splits(X, y, feature_idx)
+                split_info = self._evaluate_range_splits(X, stats, feature_idx)
                 if split_info and split_info['gain'] > best_gain:
                     best_gain = split_info['gain']
                     best_split = split_info
@@ -410,7 +681,7 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
             Feature matrix.
 
         y : array-like of shape (n_samples,)
-            Class labels.
+            Target values.
 
         depth : int, default=0
             Current depth in the tree (for max_depth check).
@@ -421,27 +692,27 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
             Root node of the constructed subtree.
         """
         n_samples, n_features = X.shape
-        n_classes = len(np.unique(y))
+        n_unique_targets = len(np.unique(y))
 
         # Stopping criteria
         if (self.max_depth is not None and depth >= self.max_depth) or \
-                n_classes == 1 or \
+                n_unique_targets == 1 or \
                 n_samples < self.min_samples_split:
             # Create leaf node
-            leaf_value = Counter(y).most_common(1)[0][0]
-            return Node(value=leaf_value,
+            return Node(value=self._leaf_value(y),
                         samples=n_samples,
-                        impurity=self._gini_impurity(y))
+                        impurity=self._node_impurity(y),
+                        distribution=self._node_distribution(y))
 
         # Find best split
         split_info = self._find_best_split(X, y)
 
         if split_info is None:
             # No valid split found, create leaf node
-            leaf_value = Counter(y).most_common(1)[0][0]
-            return Node(value=leaf_value,
+            return Node(value=self._leaf_value(y),
                         samples=n_samples,
-                        impurity=self._gini_impurity(y))
+                        impurity=self._node_impurity(y),
+                        distribution=self._node_distribution(y))
 
         # Create child nodes recursively
         left_mask = split_info['left_mask']
@@ -455,53 +726,204 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
             feature=split_info['feature'],
             threshold=split_info.get('threshold'),
             range_bounds=split_info.get('range_bounds'),
+            categories=split_info.get('categories'),
             split_type=split_info['split_type'],
+            missing_go_to_left=split_info['missing_go_to_left'],
             left=left_child,
             right=right_child,
             samples=n_samples,
-            impurity=self._gini_impurity(y)
+            impurity=self._node_impurity(y),
+            distribution=self._node_distribution(y)
         )
 
         return node
 
-    def _predict_sample(self, x, node):
+    def _resolve_categorical_features(self, X):
         """
-        Predict class for a single sample by traversing the tree.
+        Boolean mask of the categorical features from categorical_features.
 
         Parameters
         ----------
-        x : array-like of shape (n_features,)
-            Single feature vector.
+        X : array-like or DataFrame of shape (n_samples, n_features)
+            Training feature matrix.
 
-        node : Node
-            Current node in the tree.
+        Returns
+        -------
+        ndarray of shape (n_features,)
+            True for categorical features.
+        """
+        n_features = X.shape[1]
+        mask = np.zeros(n_features, dtype=bool)
+        if self.categorical_features is None:
+            return mask
+
+        if isinstance(self.categorical_features, str) and \
+                self.categorical_features == 'from_dtype':
+            if not isinstance(X, pd.DataFrame):
+                raise ValueError(
+                    "categorical_features='from_dtype' requires X to be a DataFrame")
+            for i, dtype in enumerate(X.dtypes):
+                mask[i] = isinstance(dtype, pd.CategoricalDtype) or \
+                    pd.api.types.is_object_dtype(dtype) or \
+                    pd.api.types.is_bool_dtype(dtype)
+            return mask
+
+        features = np.asarray(self.categorical_features)
+        if features.dtype == bool:
+            if len(features) != n_features:
+                raise ValueError(
+                    f"categorical_features mask has {len(features)} entries, "
+                    f"but X has {n_features} features")
+            return features.copy()
+        if features.dtype.kind in ('U', 'S', 'O'):
+            if not isinstance(X, pd.DataFrame):
+                raise ValueError(
+                    "categorical_features given as names require X to be a DataFrame")
+            columns = list(X.columns)
+            features = np.array([columns.index(name) for name in features], dtype=int)
+        mask[features] = True
+        return mask
+
+    def _encode_features(self, X):
+        """
+        Learn the categories of the categorical features and encode X.
+
+        Parameters
+        ----------
+        X : array-like or DataFrame of shape (n_samples, n_features)
+            Training feature matrix.
 
         Returns
         -------
-        class_label
-            Predicted class label.
+        ndarray of shape (n_samples, n_features)
+            Float matrix with the category codes in the categorical columns.
         """
-        if node.value is not None:
-            return node.value
+        self.is_categorical_ = self._resolve_categorical_features(X)
+        if not np.any(self.is_categorical_):
+            self.categories_ = [None] * X.shape[1]
+            return np.array(X, dtype=float)
+
+        columns = _columns(X)
+        self.categories_ = []
+        encoded = np.empty((X.shape[0], X.shape[1]))
+        for i, column in enumerate(columns):
+            if not self.is_categorical_[i]:
+                self.categories_.append(None)
+                encoded[:, i] = column.astype(float)
+                continue
+            # Missing categories stay NaN and are routed like missing numbers
+            missing = pd.isna(column)
+            categories, codes = np.unique(column[~missing].astype(str), return_inverse=True)
+            self.categories_.append(categories)
+            encoded[:, i] = np.nan
+            encoded[~missing, i] = codes
+        return encoded
+
+    def _transform(self, X):
+        """
+        Encode X for prediction with the categories learned in fit.
 
-        if node.split_type == 'standard':
-            # Standard split: feature <= threshold
-            if x[node.feature] <= node.threshold:
-                return self._predict_sample(x, node.left)
-            else:
-                return self._predict_sample(x, node.right)
+        Unknown categories are encoded as -1 and thus go right at every
+        categorical split, missing categories as NaN.
+        """
+        if not np.any(self.is_categorical_):
+            return np.array(X, dtype=float)
+
+        columns = _columns(X)
+        encoded = np.empty((X.shape[0], X.shape[1]))
+        for i, column in enumerate(columns):
+            categories = self.categories_[i]
+            if categories is None:
+                encoded[:, i] = column.astype(float)
+                continue
+            # Look up every distinct value once; factorize marks missing values with -1,
+            # which selects the trailing NaN
+            codes, uniques = pd.factorize(column)
+            lookup = np.append(_category_codes(np.asarray(uniques).astype(str), categories), np.nan)
+            encoded[:, i] = lookup[codes]
+        return encoded
+
+    def _bin_features(self, X):
+        """
+        Quantize the numeric features of the encoded X into uint8 bin codes.
 
-        elif node.split_type == 'range':
-            # Range split: feature in [lower, upper]
-            lower, upper = node.range_bounds
-            if lower <= x[node.feature] <= upper:
-                return self._predict_sample(x, node.left)  # Inside range
+        Categorical features keep their category codes, missing values get
+        the code MISSING_BIN.
+
+        Parameters
+        ----------
+        X : ndarray of shape (n_samples, n_features)
+            Encoded feature matrix from _encode_features.
+
+        Returns
+        -------
+        ndarray of shape (n_samples, n_features) and dtype uint8
+            Bin codes.
+        """
+        if not isinstance(self.max_bins, (int, np.integer)) or \
+                not 2 <= self.max_bins <= MISSING_BIN:
+            raise ValueError(
+                f"max_bins must be an integer from 2 to {MISSING_BIN}, got {self.max_bins!r}")
+
+        binned = np.empty(X.shape, dtype=np.uint8)
+        self.bin_min_, self.bin_max_ = [], []
+        for i in range(X.shape[1]):
+            values = X[:, i]
+            missing = np.isnan(values)
+            if self.is_categorical_[i]:
+                if len(self.categories_[i]) > MISSING_BIN:
+                    raise ValueError(
+                        f"Categorical feature {i} has more than {MISSING_BIN} categories, "
+                        f"which is not supported with max_bins")
+                self.bin_min_.append(None)
+                self.bin_max_.append(None)
+                binned[:, i] = np.where(missing, MISSING_BIN, values)
+                continue
+
+            present_values = values[~missing]
+            unique_values = np.unique(present_values)
+            if len(unique_values) <= self.max_bins:
+                edges = (unique_values[:-1] + unique_values[1:]) / 2
             else:
-                return self._predict_sample(x, node.right)  # Outside range
+                quantiles = np.linspace(0, 100, self.max_bins + 1)[1:-1]
+                edges = np.unique(np.percentile(present_values, quantiles, method='midpoint'))
+            # Bin k holds the values in (edges[k - 1], edges[k]]
+            codes = np.searchsorted(edges, present_values, side='left')
+            bin_min = np.full(len(edges) + 1, np.inf)
+            bin_max = np.full(len(edges) + 1, -np.inf)
+            np.minimum.at(bin_min, codes, present_values)
+            np.maximum.at(bin_max, codes, present_values)
+            self.bin_min_.append(bin_min)
+            self.bin_max_.append(bin_max)
+            binned[:, i] = MISSING_BIN
+            binned[~missing, i] = codes
+        return binned
+
+    def get_depth(self):
+        """Return the depth of the tree (0 for a single leaf)."""
+        children_left, children_right = self.flat_tree_.children_left, self.flat_tree_.children_right
+        depth, level = 0, np.zeros(1, dtype=np.intp)
+        while True:
+            level = level[children_left[level] != -1]
+            if len(level) == 0:
+                return depth
+            depth += 1
+            level = np.concatenate([children_left[level], children_right[level]])
+
+    def get_n_leaves(self):
+        """Return the number of leaves of the tree."""
+        return int(np.count_nonzero(self.flat_tree_.children_left == -1))
+
+    def _check_node_graph(self, name):
+        """Raise a ValueError if tree_ is missing, e.g. on a tree loaded with load_range_tree."""
+        if self.tree_ is None:
+            raise ValueError(
+                f"{name} needs the node graph tree_, which is not available on an unfitted "
+                f"tree or on a tree loaded with load_range_tree")
 
     def fit(self, X, y):
         """
-        Build decision tree classifier from training data.
+        Build the decision tree from training data.
 
         Parameters
         ----------
@@ -513,26 +935,79 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
 
         Returns
         -------
-        self : RangeDecisionTreeClassifier
-            Fitted classifier.
+        self
+            Fitted estimator.
         """
-        # Convert to numpy arrays
-        X = np.array(X)
-        y = np.array(y)
+        if self.ccp_alpha < 0:
+            raise ValueError(f"ccp_alpha must be non-negative, got {self.ccp_alpha!r}")
+
+        # Convert to numpy arrays, categorical features are encoded as category codes
+        if isinstance(X, pd.DataFrame):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        y = self._prepare_target(y)
+        X = self._encode_features(X)
 
         # Store training information
-        self.classes_ = np.unique(y)
-        self.n_classes_ = len(self.classes_)
         self.n_features_ = X.shape[1]
 
-        # Build tree
-        self.tree_ = self._build_tree(X, y)
+        # Build tree, on the bin codes in the binned training mode
+        if self.max_bins is None:
+            self.tree_ = self._build_tree(X, y)
+        else:
+            self.tree_ = self._build_tree(self._bin_features(X), y)
+
+        # Compact arrays for vectorized prediction
+        self.flat_tree_ = FlatTree.from_node(self.tree_, self.categories_, self._node_prediction)
+
+        # Prune with the pruning sequence of the grown tree
+        if self.ccp_alpha > 0:
+            self._prune(self.ccp_alpha)
+            self.flat_tree_ = FlatTree.from_node(self.tree_, self.categories_, self._node_prediction)
 
         # Calculate feature importances
         self._compute_feature_importances(X, y)
 
         return self
 
+    def _prune(self, ccp_alpha):
+        """Turn the nodes of tree_ with prune_alpha <= ccp_alpha into leaves."""
+        # flat_tree_ holds the nodes of tree_ in depth-first order
+        for node, prune_alpha in zip(_preorder(self.tree_), self.flat_tree_.prune_alpha):
+            if node.value is None and prune_alpha <= ccp_alpha:
+                node.value = self._value_from_distribution(node.distribution)
+                node.feature = node.threshold = node.range_bounds = node.categories = None
+                node.left = node.right = node.missing_go_to_left = None
+                node.split_type = 'standard'
+
+    def cost_complexity_pruning_path(self, X, y):
+        """
+        Compute the pruning path of minimal cost-complexity pruning.
+
+        The tree is grown once (with ccp_alpha=0) and the weakest links are
+        pruned bottom-up: the cost complexity of the subtree of a node t is
+        R(T_t) + alpha * |leaves(T_t)|, with R the impurity of the leaves
+        weighted by their fraction of the training samples, and t is pruned
+        at the effective alpha (R(t) - R(T_t)) / (|leaves(T_t)| - 1).
+
+        Parameters
+        ----------
+        X : array-like of shape (n_samples, n_features)
+            Training feature matrix.
+
+        y : array-like of shape (n_samples,)
+            Target values.
+
+        Returns
+        -------
+        Bunch
+            ccp_alphas: Effective alphas of the subtrees of the pruning
+            sequence, ascending, from 0 (the grown tree) to the alpha that
+            prunes the tree to its root.
+            impurities: Sum of the weighted leaf impurities of these subtrees.
+        """
+        tree = clone(self).set_params(ccp_alpha=0.0).fit(X, y)
+        return _cost_complexity_pruning(tree.flat_tree_)[1]
+
     def _compute_feature_importances(self, X, y):
         """
         Compute feature importances based on impurity decrease.
@@ -546,7 +1021,7 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
             Feature matrix.
 
         y : array-like of shape (n_samples,)
-            Class labels.
+            Target values.
         """
         importances = np.zeros(self.n_features_)
 
@@ -581,7 +1056,7 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
 
     def predict(self, X):
         """
-        Predict class labels for samples in X.
+        Predict class labels (classifier) or target values (regressor) for samples in X.
 
         Parameters
         ----------
@@ -591,30 +1066,53 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
         Returns
         -------
         y : ndarray of shape (n_samples,)
-            Predicted class labels.
+            Predictions.
         """
-        X = np.array(X)
-        return np.array([self._predict_sample(x, self.tree_) for x in X])
+        leaves = self.apply(X)
+        return self._predictions_from_values(self.flat_tree_.prediction[leaves])
 
-    def score(self, X, y):
+    def apply(self, X):
         """
-        Return the mean accuracy on the given test data and labels.
+        Return the index of the leaf (in flat_tree_) that every sample ends up in.
 
         Parameters
         ----------
         X : array-like of shape (n_samples, n_features)
-            Test feature matrix.
+            Feature matrix.
 
-        y : array-like of shape (n_samples,)
-            True labels.
+        Returns
+        -------
+        ndarray of shape (n_samples,)
+            Leaf indices.
+        """
+        return self.flat_tree_.apply(self._transform(X))
+
+    def predict_path(self, X, ccp_alphas):
+        """
+        Predict with the fitted tree pruned with every alpha in ccp_alphas.
+
+        The subtrees of the pruning sequence are nested, so the predictions for
+        all alphas come from the fitted tree without growing it again, e.g. to
+        cross-validate ccp_alpha with one fit per fold. Alphas below the
+        ccp_alpha of the estimator give the predictions of the fitted tree.
+
+        Parameters
+        ----------
+        X : array-like of shape (n_samples, n_features)
+            Feature matrix.
+
+        ccp_alphas : array-like of shape (n_alphas,)
+            Complexity parameters, e.g. the ccp_alphas of cost_complexity_pruning_path.
 
         Returns
         -------
-        float
-            Mean accuracy score.
+        ndarray of shape (n_alphas, n_samples)
+            Predictions of the pruned trees.
         """
-        y_pred = self.predict(X)
-        return np.mean(y_pred == y)
+        X = self._transform(X)
+        return np.array([
+            self._predictions_from_values(self.flat_tree_.prediction[self.flat_tree_.apply(X, ccp_alpha)])
+            for ccp_alpha in ccp_alphas])
 
     def print_tree(self, node=None, depth=0, feature_names=None):
         """
@@ -639,13 +1137,14 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
         >>> clf.print_tree(feature_names=['conc', 'equiv', 'temp'])
         """
         if node is None:
+            self._check_node_graph("print_tree")
             node = self.tree_
 
         indent = "  " * depth
 
         # Leaf node
         if node.value is not None:
-            print(f"{indent}Leaf: class={node.value} (samples={node.samples}, "
+            print(f"{indent}Leaf: {self._format_leaf(node)} (samples={node.samples}, "
                   f"impurity={node.impurity:.3f})")
             return
 
@@ -660,25 +1159,468 @@ class RangeDecisionTreeClassifier(BaseEstimator, ClassifierMixin):
         elif node.split_type == 'range':
             lower, upper = node.range_bounds
             print(f"{indent}If {feat_name} in [{lower:.3f}, {upper:.3f}]:")
+        elif node.split_type == 'categorical':
+            print(f"{indent}If {feat_name} in "
+                  f"{_format_categories(self, node)}:")
 
         # Print left branch (True condition)
-        print(f"{indent}  [TRUE] Left branch:")
+        print(f"{indent}  [TRUE] Left branch{_missing_note(node, left=True)}:")
         self.print_tree(node.left, depth + 2, feature_names)
 
         # Print right branch (False condition)
-        print(f"{indent}  [FALSE] Right branch:")
+        print(f"{indent}  [FALSE] Right branch{_missing_note(node, left=False)}:")
         self.print_tree(node.right, depth + 2, feature_names)
 
 
+class RangeDecisionTreeClassifier(ClassifierMixin, BaseRangeDecisionTree):
+    """
+    Decision Tree Classifier with support for range-based splits.
+
+    This classifier extends standard decision trees (CART) to evaluate both
+    traditional threshold-based splits (feature <= threshold) and range-based
+    splits (feature in [lower, upper]). At each node, the algorithm evaluates
+    both split types and selects the one with the highest information gain.
+
+    Parameters
+    ----------
+    max_depth : int, default=None
+        The maximum depth of the tree. If None, then nodes are expanded until
+        all leaves are pure or until they contain less than min_samples_split samples.
+
+    min_samples_split : int, default=2
+        The minimum number of samples required to split an internal node.
+
+    min_samples_leaf : int, default=1
+        The minimum number of samples required to be at a leaf node.
+
+    split_strategy : str, default='both'
+        Strategy for evaluating splits:
+        - 'standard': Only evaluate standard <= threshold splits
+        - 'range': Only evaluate range [a,b] splits
+        - 'both': Evaluate both types at each node and select the best
+
+    max_range_splits : int, default=10
+        Maximum number of range combinations to evaluate per feature.
+        This controls computational cost. Higher values are more thorough
+        but slower. For datasets with ~50 samples, 10 is a good default.
+
+    random_state : int, default=None
+        Controls the randomness in range split evaluation.
+
+    categorical_features : array-like of int, bool or str, or 'from_dtype', default=None
+        Features that are split by category subsets instead of thresholds and
+        ranges, given as indices, boolean mask or column names (if X is a
+        DataFrame). 'from_dtype' uses the category, object and bool columns of a
+        DataFrame. The categories of a node are sorted by the proportion of the
+        node's majority class, and the best of the splits between consecutive
+        categories in this order is used. For two classes this finds the optimal
+        subset (Breiman et al., 1984), for more classes it is a heuristic.
+        Categories unseen during fit take the false (right) branch.
+
+    max_bins : int, default=None
+        If set (2 to 255), every numeric feature is quantized once in fit into
+        at most max_bins bins (one bin per unique value if there are not more,
+        quantile bins otherwise), stored as uint8 codes. Standard and range
+        splits are then searched over class histograms of the bins, which
+        bounds the cost per node and feature at O(max_bins^2) independent of
+        the number of samples, and all range intervals are evaluated instead
+        of max_range_splits sampled lower bounds and ranges spanning at most
+        half of the values. Thresholds and range bounds
+        are still in the units of the features, so predict needs no binning.
+
+    ccp_alpha : float, default=0.0
+        Complexity parameter of minimal cost-complexity pruning. The grown
+        tree is pruned to the subtree of its pruning sequence (see
+        cost_complexity_pruning_path) whose effective alpha is the largest one
+        not exceeding ccp_alpha, and predict_path predicts with the subtrees of
+        larger alphas. Pruned nodes predict their majority class. No pruning
+        is done with 0.
+
+    Missing values (NaN) need no imputation: every split whose training samples
+    include missing values is evaluated with them in the left and in the right
+    branch, and the better direction is stored with the split. At splits without
+    missing training values, missing values take the branch with more samples.
+
+    Attributes
+    ----------
+    tree_ : Node
+        The underlying tree structure.
+
+    flat_tree_ : FlatTree
+        The tree as arrays, used for prediction. flat_tree_.value holds the
+        class counts of every node.
+
+    categories_ : list of (ndarray or None)
+        The categories of every categorical feature, None for the other features.
+
+    bin_min_, bin_max_ : list of (ndarray or None)
+        Smallest and largest training value of every bin of a numeric feature,
+        only set if max_bins is given.
+
+    classes_ : ndarray of shape (n_classes,)
+        The class labels.
+
+    n_classes_ : int
+        The number of classes.
+
+    n_features_ : int
+        The number of input features.
+
+    feature_names_in_ : ndarray of shape (n_features_,)
+        The column names of X, only set if X was a DataFrame.
+
+    feature_importances_ : ndarray of shape (n_features_,)
+        Impurity-based feature importances.
+
+    Examples
+    --------
+    >>> from sklearn.datasets import make_classification
+    >>> from sklearn.model_selection import train_test_split
+    >>> X, y = make_classification(n_samples=100, n_features=4, n_classes=2, random_state=42)
+    >>> X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2)
+    >>> clf = RangeDecisionTreeClassifier(max_depth=3, split_strategy='both')
+    >>> clf.fit(X_train, y_train)
+    >>> clf.score(X_test, y_test)
+    """
+
+    def _prepare_target(self, y):
+        y = np.array(y)
+        self.classes_ = np.unique(y)
+        self.n_classes_ = len(self.classes_)
+        return y
+
+    def _sample_statistics(self, y):
+        # One indicator column per class, their sums are the class counts
+        return np.eye(self.n_classes_)[np.searchsorted(self.classes_, y)]
+
+    def _count_from_statistics(self, stats):
+        return stats.sum(axis=-1)
+
+    def _impurity_from_statistics(self, stats):
+        return self._gini_from_counts(stats)
+
+    def _category_order_key(self, group_stats, node_stats):
+        # Proportion of the node's majority class
+        majority_class = np.argmax(node_stats)
+        return group_stats[:, majority_class] / group_stats.sum(axis=1)
+
+    def _leaf_value(self, y):
+        # The majority class with the lowest index on ties, as in predict_proba
+        return self._value_from_distribution(self._node_distribution(y))
+
+    def _node_impurity(self, y):
+        return self._gini_impurity(y)
+
+    def _format_leaf(self, node):
+        return f"class={node.value}"
+
+    def _node_distribution(self, y):
+        return np.bincount(np.searchsorted(self.classes_, y), minlength=self.n_classes_)
+
+    def _node_prediction(self, node):
+        # Index of the majority class, the first one on ties like argmax of predict_proba
+        return np.argmax(node.distribution)
+
+    def _predictions_from_values(self, values):
+        return self.classes_[values.astype(np.intp)]
+
+    def _value_from_distribution(self, distribution):
+        return self.classes_[np.argmax(distribution)]
+
+    def predict_proba(self, X):
+        """
+        Predict class probabilities for samples in X.
+
+        The probabilities are the class frequencies of the training samples in
+        the leaf of every sample, looked up for all samples at once.
+
+        Parameters
+        ----------
+        X : array-like of shape (n_samples, n_features)
+            Feature matrix.
+
+        Returns
+        -------
+        ndarray of shape (n_samples, n_classes_)
+            Class probabilities in the order of classes_.
+        """
+        counts = self.flat_tree_.value[self.apply(X)]
+        return counts / counts.sum(axis=1, keepdims=True)
+
+    def _gini_impurity(self, y):
+        """
+        Calculate Gini impurity for a set of class labels.
+
+        Gini impurity measures the probability of incorrectly classifying a
+        randomly chosen element if it were randomly labeled according to the
+        class distribution at this node.
+
+        Gini = 1 - sum(p_i^2) where p_i is the proportion of class i
+
+        Parameters
+        ----------
+        y : array-like of shape (n_samples,)
+            Class labels.
+
+        Returns
+        -------
+        float
+            Gini impurity value between 0 (pure) and 0.5 (maximally impure).
+        """
+        if len(y) == 0:
+            return 0
+
+        counter = Counter(y)
+        impurity = 1.0
+
+        for count in counter.values():
+            prob = count / len(y)
+            impurity -= prob ** 2
+
+        return impurity
+
+    @staticmethod
+    def _gini_from_counts(counts):
+        """Gini impurity of class counts, for the last axis of counts."""
+        counts = np.asarray(counts, dtype=float)
+        totals = counts.sum(axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            impurity = 1.0 - np.sum((counts / totals[..., None]) ** 2, axis=-1)
+        return np.where(totals > 0, impurity, 0.0)
+
+    def score(self, X, y):
+        """
+        Return the mean accuracy on the given test data and labels.
+
+        Parameters
+        ----------
+        X : array-like of shape (n_samples, n_features)
+            Test feature matrix.
+
+        y : array-like of shape (n_samples,)
+            True labels.
+
+        Returns
+        -------
+        float
+            Mean accuracy score.
+        """
+        y_pred = self.predict(X)
+        return np.mean(y_pred == y)
+
+
+class RangeDecisionTreeRegressor(RegressorMixin, BaseRangeDecisionTree):
+    """
+    Decision Tree Regressor with support for range-based splits.
+
+    The regression counterpart of RangeDecisionTreeClassifier, with the same
+    parameters and split types. Splits minimize the squared error: the sums
+    of 1, y and y^2 over the samples of a branch give its size, mean and
+    variance, so that every threshold, range and category subset is scored
+    in O(1) from cumulative sums after sorting. Leaves predict the mean target.
+    Categories are ordered by their mean target, which makes the categorical
+    splits optimal (Breiman et al., 1984).
+
+    Attributes
+    ----------
+    tree_ : Node
+        The underlying tree structure, the impurity of a node is the variance
+        (mean squared error) of its targets.
+
+    categories_ : list of (ndarray or None)
+        The categories of every categorical feature, None for the other features.
+
+    n_features_ : int
+        The number of input features.
+
+    feature_importances_ : ndarray of shape (n_features_,)
+        Impurity-based feature importances.
+
+    Examples
+    --------
+    >>> reg = RangeDecisionTreeRegressor(max_depth=3, min_samples_leaf=5)
+    >>> reg.fit(X, df["yield_MOCOF-1"])
+    >>> reg.score(X, df["yield_MOCOF-1"])  # R^2
+    """
+
+    def _prepare_target(self, y):
+        return np.asarray(y, dtype=float)
+
+    def _sample_statistics(self, y):
+        return np.column_stack([np.ones(len(y)), y, y * y])
+
+    def _count_from_statistics(self, stats):
+        return stats[..., 0]
+
+    def _impurity_from_statistics(self, stats):
+        # Variance = E[y^2] - E[y]^2, clipped at 0 against rounding
+        n = stats[..., 0]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = stats[..., 2] / n - (stats[..., 1] / n) ** 2
+        return np.where(n > 0, np.maximum(variance, 0.0), 0.0)
+
+    def _category_order_key(self, group_stats, node_stats):
+        # Mean target of the category
+        return group_stats[:, 1] / group_stats[:, 0]
+
+    def _leaf_value(self, y):
+        return float(np.mean(y))
+
+    def _node_impurity(self, y):
+        if len(y) == 0:
+            return 0
+        return float(np.var(y))
+
+    def _format_leaf(self, node):
+        return f"value={node.value:.3f}"
+
+    def _node_distribution(self, y):
+        return [np.mean(y)]
+
+    def _node_prediction(self, node):
+        return node.distribution[0]
+
+    def _value_from_distribution(self, distribution):
+        return distribution[0]
+
+
+def _preorder(root):
+    """The nodes of a tree in depth-first order, every node before its children."""
+    nodes = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        if node.value is None:
+            stack.append(node.right)
+            stack.append(node.left)
+    return nodes
+
+
+def _cost_complexity_pruning(flat_tree):
+    """
+    Weakest-link pruning sequence of a flattened tree, computed bottom-up.
+
+    Every iteration accumulates the impurity and the number of leaves of all
+    subtrees level by level, from the deepest level to the root, and prunes
+    the nodes with the smallest effective alpha.
+
+    Returns:
+        Tuple[ndarray, Bunch]: The prune_alpha of every node, the effective
+        alpha from which it is a leaf (inf for leaves), and the pruning path
+        (see BaseRangeDecisionTree.cost_complexity_pruning_path).
+    """
+    children_left, children_right = flat_tree.children_left, flat_tree.children_right
+    n_nodes = flat_tree.node_count
+    is_leaf = children_left == -1
+    # Impurity of every node weighted by its fraction of the training samples
+    risk = flat_tree.impurity * flat_tree.n_node_samples / flat_tree.n_node_samples[0]
+
+    # Internal nodes per depth, and the subtree of node i is i:i + subtree_size[i]
+    # since the nodes are in depth-first order
+    levels = []
+    level = np.zeros(1, dtype=np.intp)
+    while len(level):
+        level = level[~is_leaf[level]]
+        levels.append(level)
+        level = np.concatenate([children_left[level], children_right[level]])
+    subtree_size = np.ones(n_nodes, dtype=np.intp)
+    for level in reversed(levels):
+        subtree_size[level] += subtree_size[children_left[level]] + subtree_size[children_right[level]]
+
+    prune_alpha = np.full(n_nodes, np.inf)
+    ccp_alphas, impurities = [], []
+    alpha = 0.0
+    while True:
+        subtree_risk = np.where(is_leaf, risk, 0.0)
+        n_leaves = is_leaf.astype(np.intp)
+        for level in reversed(levels):
+            level = level[~is_leaf[level]]
+            left, right = children_left[level], children_right[level]
+            subtree_risk[level] = subtree_risk[left] + subtree_risk[right]
+            n_leaves[level] = n_leaves[left] + n_leaves[right]
+        ccp_alphas.append(alpha)
+        impurities.append(subtree_risk[0])
+        if is_leaf[0]:
+            break
+
+        # Prune the weakest links, the alphas of the sequence never decrease. Equal
+        # effective alphas that differ by rounding errors are pruned together
+        internal = np.flatnonzero(~is_leaf)
+        effective_alpha = (risk[internal] - subtree_risk[internal]) / (n_leaves[internal] - 1)
+        alpha = max(alpha, effective_alpha.min())
+        for i in internal[effective_alpha <= alpha + ALPHA_RTOL * abs(alpha)]:
+            if not is_leaf[i]:  # not pruned with an ancestor in this iteration
+                subtree = slice(i, i + subtree_size[i])
+                prune_alpha[subtree] = np.where(is_leaf[subtree], prune_alpha[subtree], alpha)
+                is_leaf[subtree] = True
+
+    return prune_alpha, Bunch(ccp_alphas=np.array(ccp_alphas), impurities=np.array(impurities))
+
+
+def _columns(X):
+    """The columns of a DataFrame or 2d array as a list of 1d arrays."""
+    if isinstance(X, pd.DataFrame):
+        return [X.iloc[:, i].to_numpy() for i in range(X.shape[1])]
+    return list(np.asarray(X, dtype=object).T)
+
+
+def _category_codes(values, categories):
+    """Codes of the string values in the sorted categories, -1 for unknown values."""
+    if len(categories) == 0:
+        return np.full(len(values), -1.0)
+    codes = np.minimum(np.searchsorted(categories, values), len(categories) - 1)
+    return np.where(categories[codes] == values, codes, -1).astype(float)
+
+
+def _is_missing(values):
+    """Missing values of a column of the encoded (NaN) or binned (MISSING_BIN) X."""
+    if values.dtype == np.uint8:
+        return values == MISSING_BIN
+    return np.isnan(values)
+
+
+def _missing_directions(missing):
+    """Directions to try for the missing values of a node: both if there are any."""
+    return (False, True) if np.any(missing) else (None,)
+
+
+def _route_missing(left_mask, missing, missing_go_to_left):
+    """Add the missing values to the left branch of a split if they go left."""
+    if missing_go_to_left:
+        return left_mask | missing
+    return left_mask
+
+
+def _missing_goes_left(node):
+    """Learned direction of missing values, or the branch with more training samples."""
+    if node.missing_go_to_left is not None:
+        return node.missing_go_to_left
+    return node.left.samples >= node.right.samples
+
+
+def _missing_note(node, left):
+    """Note on the branch that learned to take the missing values."""
+    if node.missing_go_to_left is not None and node.missing_go_to_left == left:
+        return " (with missing values)"
+    return ""
+
+
+def _format_categories(tree, node):
+    """Category labels of the left branch of a categorical split, e.g. "{a, b}"."""
+    categories = tree.categories_[node.feature]
+    return "{" + ", ".join(str(categories[code]) for code in sorted(node.categories)) + "}"
+
+
 # Utility function for extracting decision rules
-def extract_rules(tree_classifier, feature_names=None):
+def extract_rules(tree, feature_names=None):
     """
-    Extract all decision rules from a trained RangeDecisionTreeClassifier.
+    Extract all decision rules from a trained range tree.
 
     Parameters
     ----------
-    tree_classifier : RangeDecisionTreeClassifier
-        A fitted classifier.
+    tree : RangeDecisionTreeClassifier or RangeDecisionTreeRegressor
+        A fitted estimator.
 
     feature_names : list, optional
         Names for features. If None, uses X[i] notation.
@@ -686,16 +1628,18 @@ def extract_rules(tree_classifier, feature_names=None):
     Returns
     -------
     list of tuples
-        Each tuple contains (rule_str, predicted_class) where rule_str is
-        a human-readable condition string.
+        Each tuple contains (rule_str, prediction) where rule_str is a
+        human-readable condition string and prediction is the class of the
+        leaf for the classifier and the mean target of the leaf for the
+        regressor.
 
     Examples
     --------
     >>> clf = RangeDecisionTreeClassifier()
     >>> clf.fit(X, y)
     >>> rules = extract_rules(clf, feature_names=['conc', 'equiv', 'temp'])
-    >>> for rule, pred_class in rules:
-    ...     print(f"IF {rule} THEN {pred_class}")
+    >>> for rule, prediction in rules:
+    ...     print(f"IF {rule} THEN {prediction}")
     """
     rules = []
 
@@ -724,6 +1668,17 @@ def extract_rules(tree_classifier, feature_names=None):
             lower, upper = node.range_bounds
             condition_true = f"{feat_name} in [{lower:.3f}, {upper:.3f}]"
             condition_false = f"{feat_name} NOT in [{lower:.3f}, {upper:.3f}]"
+        elif node.split_type == 'categorical':
+            categories = _format_categories(tree, node)
+            condition_true = f"{feat_name} in {categories}"
+            condition_false = f"{feat_name} NOT in {categories}"
+
+        # Missing values satisfy the condition of the branch they take
+        if node.missing_go_to_left is not None:
+            if node.missing_go_to_left:
+                condition_true = f"({condition_true} OR {feat_name} is missing)"
+            else:
+                condition_false = f"({condition_false} OR {feat_name} is missing)"
 
         # Traverse left (condition true)
         traverse(node.left, path + [condition_true])
@@ -731,5 +1686,6 @@ def extract_rules(tree_classifier, feature_names=None):
         # Traverse right (condition false)
         traverse(node.right, path + [condition_false])
 
-    traverse(tree_classifier.tree_)
+    tree._check_node_graph("extract_rules")
+    traverse(tree.tree_)
     return rules
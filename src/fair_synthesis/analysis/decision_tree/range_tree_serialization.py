@@ -0,0 +1,152 @@
+"""
+Versioned file format for fitted range trees.
+
+Pickling a RangeDecisionTreeClassifier stores its graph of Node objects,
+which is slow to load and breaks when the classes change. save_range_tree
+writes the flattened tree (flat_tree_) instead: one array per FlatTree
+attribute in an uncompressed .npz file, plus a "metadata" member with the
+format version, estimator class, parameters, feature names, categories and
+classes as UTF-8 JSON. Because the members of an uncompressed .npz are stored
+as plain .npy data, load_range_tree memory-maps the file once and returns the
+tree arrays as read-only views into it, without reading or copying them. A
+loaded estimator predicts (predict, predict_proba, apply, predict_path) like
+the fitted one, and get_depth and get_n_leaves work on the stored arrays. The
+Node graph (tree_) is not stored, so print_tree, extract_rules and the graphviz
+plot raise a ValueError on a loaded tree.
+
+Usage:
+    save_range_tree(model.named_steps["classifier"], "range_tree.npz")
+    tree = load_range_tree("range_tree.npz")
+    probabilities = tree.predict_proba(X_candidates)
+"""
+
+import json
+import struct
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from fair_synthesis.analysis.decision_tree.range_decision_tree import (
+    FlatTree, RangeDecisionTreeClassifier, RangeDecisionTreeRegressor)
+
+# Incremented on every incompatible change of the stored arrays or metadata
+FORMAT_VERSION = 1
+
+ESTIMATORS = {cls.__name__: cls for cls in (RangeDecisionTreeClassifier, RangeDecisionTreeRegressor)}
+FLAT_TREE_ARRAYS = (
+    "children_left", "children_right", "feature", "split_type", "lower", "upper",
+    "category_offset", "category_left", "missing_go_to_left", "n_node_samples",
+    "impurity", "value", "prediction", "prune_alpha")
+METADATA = "metadata"
+# Size of the fixed part of a zip local file header, followed by the file name and extra field
+ZIP_LOCAL_HEADER_SIZE = 30
+
+
+def _to_json(value):
+    """JSON conversion of the NumPy values of the parameters and metadata."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot store {type(value).__name__} in the range tree metadata")
+
+
+def save_range_tree(tree, path) -> None:
+    """
+    Save a fitted range tree in the versioned .npz format.
+
+    Args:
+        tree (RangeDecisionTreeClassifier | RangeDecisionTreeRegressor): Fitted estimator.
+        path (str | Path): Output file, written as given (no ".npz" is appended).
+    """
+    if type(tree).__name__ not in ESTIMATORS:
+        raise TypeError(f"Expected a range tree estimator, got {type(tree).__name__}")
+    if getattr(tree, "flat_tree_", None) is None:
+        raise ValueError("The range tree is not fitted")
+
+    metadata = {
+        "format_version": FORMAT_VERSION,
+        "estimator": type(tree).__name__,
+        "params": tree.get_params(),
+        "n_features": tree.n_features_,
+        "feature_names": getattr(tree, "feature_names_in_", None),
+        "is_categorical": tree.is_categorical_,
+        "categories": tree.categories_,
+        "classes": getattr(tree, "classes_", None),
+    }
+    arrays = {name: getattr(tree.flat_tree_, name) for name in FLAT_TREE_ARRAYS}
+    arrays["feature_importances"] = tree.feature_importances_
+    arrays[METADATA] = np.frombuffer(json.dumps(metadata, default=_to_json).encode(), dtype=np.uint8)
+    with open(path, "wb") as file:
+        np.savez(file, **arrays)
+
+
+def _memory_map_npz(path) -> dict:
+    """
+    Read-only views of the arrays of an uncompressed .npz file into one memory map.
+
+    The data of a member starts after its zip local header, whose file name and
+    extra field lengths are read from the header itself, and its .npy header.
+    """
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as file:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: member {info.filename} is compressed and cannot be memory-mapped")
+            file.seek(info.header_offset + ZIP_LOCAL_HEADER_SIZE - 4)
+            name_length, extra_length = struct.unpack("<HH", file.read(4))
+            file.seek(info.header_offset + ZIP_LOCAL_HEADER_SIZE + name_length + extra_length)
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+            arrays[info.filename.removesuffix(".npy")] = np.ndarray(
+                shape, dtype=dtype, buffer=buffer, offset=file.tell(),
+                order="F" if fortran_order else "C")
+    return arrays
+
+
+def load_range_tree(path, mmap: bool = True):
+    """
+    Load a range tree saved with save_range_tree.
+
+    Args:
+        path (str | Path): File written by save_range_tree.
+        mmap (bool): Memory-map the file and use its arrays without copying. If False,
+            the arrays are read into memory and the file can be removed afterwards.
+
+    Returns:
+        RangeDecisionTreeClassifier | RangeDecisionTreeRegressor: Estimator ready to predict.
+    """
+    path = Path(path)
+    if mmap:
+        arrays = _memory_map_npz(path)
+    else:
+        with np.load(path) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+
+    metadata = json.loads(arrays.pop(METADATA).tobytes().decode())
+    if metadata["format_version"] > FORMAT_VERSION:
+        raise ValueError(
+            f"{path} has range tree format version {metadata['format_version']}, "
+            f"this version reads up to {FORMAT_VERSION}")
+    if metadata["estimator"] not in ESTIMATORS:
+        raise ValueError(f"{path}: unknown estimator {metadata['estimator']!r}")
+
+    tree = ESTIMATORS[metadata["estimator"]](**metadata["params"])
+    tree.flat_tree_ = FlatTree(**{name: arrays[name] for name in FLAT_TREE_ARRAYS})
+    tree.feature_importances_ = arrays["feature_importances"]
+    tree.n_features_ = metadata["n_features"]
+    tree.is_categorical_ = np.array(metadata["is_categorical"], dtype=bool)
+    tree.categories_ = [
+        None if categories is None else np.array(categories, dtype=str)
+        for categories in metadata["categories"]]
+    if metadata["feature_names"] is not None:
+        tree.feature_names_in_ = np.array(metadata["feature_names"], dtype=object)
+    if metadata["classes"] is not None:
+        tree.classes_ = np.array(metadata["classes"])
+        tree.n_classes_ = len(tree.classes_)
+    return tree
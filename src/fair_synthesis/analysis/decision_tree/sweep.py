@@ -0,0 +1,183 @@
+"""
+Sweep over decision tree configurations.
+
+generate_decision_trees.py trains one configuration set by module constants.
+A sweep builds the merged feature frame once, trains and cross-validates every
+configuration of a grid in a process pool and collects the metrics, feature
+importances and (optionally) plots into one results table.
+
+Usage:
+    from fair_synthesis.analysis.decision_tree.sweep import config_grid, run_sweep
+    from fair_synthesis.analysis.feature_matrix import build_merged_frame
+
+    configs = config_grid(max_depth=[2, 3, 4], extra_tree=[False, True], deduplicate=[False, True])
+    results = run_sweep(configs, build_merged_frame(), max_workers=4)
+    print(results.sort_values("accuracy_mean", ascending=False))
+"""
+
+import itertools
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+from sklearn.model_selection import RepeatedKFold
+from sklearn.preprocessing import LabelEncoder
+
+from fair_synthesis.analysis.decision_tree.cross_validation import cross_validate_models
+from fair_synthesis.analysis.decision_tree.decision_tree_model import create_model, create_preprocess, \
+    get_feature_names
+from fair_synthesis.analysis.feature_matrix import HIGH_YIELD_THRESHOLD, select_model_data
+
+# Depth of the "limitless" tree
+FULL_TREE_DEPTH = 10000
+
+
+@dataclass(frozen=True)
+class DecisionTreeConfig:
+    """One configuration of generate_decision_trees.py, defaults as in the script."""
+    task_is_classification: bool = True
+    range_tree: bool = False
+    extra_tree: bool = False
+    max_depth: int = 3
+    deduplicate: bool = True
+    deduplicate_relative_tolerance: float = 5  # in percent
+    target_is_product_type: bool = True
+
+    @property
+    def model_target(self) -> str:
+        if not self.task_is_classification:
+            return "yield_MOCOF-1"
+        return "main_product" if self.target_is_product_type else "MOCOF_high_yield"
+
+    @property
+    def model_target_label(self) -> str:
+        if not self.task_is_classification:
+            return "MOCOF-1 yield"
+        if self.target_is_product_type:
+            return "Main Product"
+        return ">={}% MOCOF-1".format(int(HIGH_YIELD_THRESHOLD * 100))
+
+    @property
+    def name(self) -> str:
+        return "_".join(f"{field.name}={getattr(self, field.name)}" for field in fields(self))
+
+
+def config_grid(**options) -> List[DecisionTreeConfig]:
+    """
+    All combinations of the given options, the other fields keep their defaults,
+    e.g. config_grid(max_depth=[2, 3], extra_tree=[False, True]) gives 4 configurations.
+    """
+    names = list(options)
+    return [DecisionTreeConfig(**dict(zip(names, values)))
+            for values in itertools.product(*(options[name] for name in names))]
+
+
+def run_config(config: DecisionTreeConfig, merged_frame: pd.DataFrame, plots_dir: Path | None = None) -> dict:
+    """
+    Train and cross-validate one configuration on the merged feature frame.
+
+    Returns:
+        dict: The configuration fields, number of samples and features, cross-validation
+        metrics (mean and std over the folds) of the tree with max_depth and of the
+        limitless tree (prefix "full_tree_"), feature importances of the tree with
+        max_depth, plot directory and duration.
+    """
+    start = time.perf_counter()
+    X, y = select_model_data(
+        merged_frame, config.model_target, config.deduplicate,
+        config.deduplicate_relative_tolerance, verbose=False)
+    X = X.drop(columns=["id", config.model_target])
+    if config.task_is_classification:
+        label_encoder = LabelEncoder()
+        y_encoded = label_encoder.fit_transform(y)
+        class_names = label_encoder.classes_
+    else:
+        class_names = None
+        y_encoded = y.astype(float)
+
+    preprocess, numeric_cols, categorical_cols = create_preprocess(X)
+    model_endless = create_model(
+        config.task_is_classification, config.range_tree, config.extra_tree, FULL_TREE_DEPTH, preprocess)
+    model = create_model(
+        config.task_is_classification, config.range_tree, config.extra_tree, config.max_depth, preprocess)
+
+    # Both models share the preprocessor, which is thus fitted once per fold
+    cv_results = cross_validate_models(
+        {"full_tree_": model_endless, "": model}, X, y_encoded,
+        cv=RepeatedKFold(n_splits=5, n_repeats=3, random_state=42),
+        task_is_classification=config.task_is_classification)
+
+    model_endless.fit(X, y_encoded)
+    model.fit(X, y_encoded)
+    tree_endless, tree = model_endless.steps[-1][1], model.steps[-1][1]
+    feature_names = get_feature_names(model, numeric_cols, categorical_cols)
+    importances = dict(sorted(zip(feature_names, tree.feature_importances_), key=lambda x: -x[1]))
+
+    row = asdict(config)
+    row.update(n_samples=len(y_encoded), n_features=len(feature_names))
+    for prefix, cv_result in cv_results.items():
+        for metric, scores in cv_result.fold_scores.items():
+            row[f"{prefix}{metric}_mean"] = scores.mean()
+            row[f"{prefix}{metric}_std"] = scores.std()
+    row["importances"] = {name: imp for name, imp in importances.items() if imp > 0}
+
+    if plots_dir is not None:
+        # plotting needs graphviz and dtreeviz, import them only when plots are requested
+        from fair_synthesis.analysis.decision_tree.plot_decision_tree import plot_decision_tree_dtreeviz, \
+            plot_decision_tree_graphviz
+        config_dir = Path(plots_dir) / config.name
+        config_dir.mkdir(parents=True, exist_ok=True)
+        plot_decision_tree_graphviz(
+            "Decision-tree_full", tree_endless,
+            get_feature_names(model_endless, numeric_cols, categorical_cols),
+            max_depth=10000000, plots_dir=config_dir)
+        plot_decision_tree_dtreeviz(
+            "Decision-tree_{}-levels".format(config.max_depth), tree, model, X, y_encoded,
+            class_names, config.max_depth, config.model_target_label, plots_dir=config_dir)
+        row["plots_dir"] = str(config_dir)
+    row["duration_s"] = time.perf_counter() - start
+    return row
+
+
+def _run_config_safe(config: DecisionTreeConfig, merged_frame: pd.DataFrame, plots_dir: Path | None) -> dict:
+    try:
+        row = run_config(config, merged_frame, plots_dir)
+        row["error"] = None
+    except Exception:
+        row = asdict(config)
+        row["error"] = traceback.format_exc()
+    return row
+
+
+def run_sweep(
+        configs: List[DecisionTreeConfig],
+        merged_frame: pd.DataFrame,
+        max_workers: int | None = None,
+        plots_dir: Path | None = None) -> pd.DataFrame:
+    """
+    Run every configuration in a process pool.
+
+    A failing configuration does not stop the sweep, its row has the traceback in
+    the column "error" (None for configurations that succeeded).
+
+    Args:
+        configs (List[DecisionTreeConfig]): Configurations, e.g. from config_grid.
+        merged_frame (pd.DataFrame): Result of feature_matrix.build_merged_frame, built once for all.
+        max_workers (int | None): Number of worker processes, 1 runs in this process.
+        plots_dir (Path | None): Write the plots of every configuration to a subdirectory of it.
+
+    Returns:
+        pd.DataFrame: One row per configuration, in the order of configs.
+    """
+    if max_workers == 1:
+        rows = [_run_config_safe(config, merged_frame, plots_dir) for config in configs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            rows = list(executor.map(
+                _run_config_safe, configs,
+                itertools.repeat(merged_frame), itertools.repeat(plots_dir)))
+    return pd.DataFrame(rows)
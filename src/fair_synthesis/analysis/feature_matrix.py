@@ -0,0 +1,358 @@
+"""
+Feature frame of the MOCOF-1 experiments for the decision tree models.
+
+Merges the synthesis parameters, the PXRD phase molar fractions and the product
+masses (from the normalized weights table of mofsy2parquet) into one DataFrame with one row per experiment, derives the model
+parameters (equivalents, concentrations, fractions) and the phase yields, and
+selects the feature matrix and target of a model from it.
+
+build_feature_matrix runs both steps and caches the resulting matrix as Parquet,
+keyed by the hashes of the input files, the code and the settings, so repeated
+model runs start from a warm matrix.
+
+Usage:
+    from fair_synthesis.analysis.feature_matrix import build_feature_matrix, build_merged_frame, \
+        select_model_data
+
+    X, y = build_feature_matrix("main_product", deduplicate=True, relative_tolerance=5)
+
+    # or, to select several models from one merged frame
+    df = build_merged_frame()
+    X, y = select_model_data(df, "main_product", deduplicate=True, relative_tolerance=5)
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from molmass import Formula
+
+from fair_synthesis.analysis.decision_tree.deduplicate_experiments import get_duplicate_indices
+from fair_synthesis.formatting.unit_conversion import convert_array
+from fair_synthesis.formatting.utils import load_json
+from fair_synthesis.code_hash import hash_code, hash_path
+from fair_synthesis.serialization.mofsy2parquet import load_table
+
+REPO_ROOT = Path(__file__).parents[3]
+PARAMS_PATH = REPO_ROOT / "data" / "MOCOF-1" / \
+    "converted" / "params_from_sciformation.json"
+TABLES_DIR = REPO_ROOT / "data" / "MOCOF-1" / "converted" / "parquet"
+FRAC_PATH = REPO_ROOT / "scripts" / "pxrd_analysis" / \
+    "data" / "phase_molar-fractions.csv"
+FEATURE_MATRIX_CACHE_DIR = REPO_ROOT / ".cache" / "feature_matrix"
+
+HIGH_YIELD_THRESHOLD = 0.90
+
+SUM_FORMULA = {
+    "COF-366-Co": "C60H36CoN8",
+    "MOCOF-1": "C52H33CoN8",
+    "amorphous": "C44H31CoN8",  # assuming Co(H−1tapp)
+}
+
+# Shorter names and labels for visualization: column -> (new name, {value: label}).
+# Labels only apply within their column.
+RELABELING = {
+    "aminoporphyrin_monomer_type": ("Co(tapp)_precursor", {
+        "C128H104N8O8.Co": "Co(tdpp)",
+        "C128H104N8O8.2C6H6N2O2.CHF3O3S.Co": "Co(III)(tdpp)",
+        "C44H32N8.Co": "Co(tapp)",
+        "C120H88N8.Co": "Co(ttpp)",
+    }),
+    "acid_pKa_DMSO": ("Acid_pKa", {}),
+    "degassing": ("Degas", {}),
+    "temperature_C": ("Temp_degC", {}),
+    "solvent_2_name": ("Solvent2", {
+        "o-dichlorobenzene": "o-DCB",
+        "nitrobenzene": "PhNO2",
+    }),
+    "aldehyde_monomer_structure": ("TPA_substitution", {
+        "C8H6O2": "none",
+        "C10H10O4": "(OMe)2",
+        "C8H4F2O2": "F2",
+        "C8H2F4O2": "F4",
+    }),
+    "vessel": ("Vessel", {}),
+    "other_additives": ("Additive", {
+        "C6H6BrN": "PBA",
+        "C19H16O": "TrOH",
+    }),
+}
+
+YIELD_COLUMNS = ["yield_COF-366-Co", "yield_MOCOF-1",
+                 "yield_Co(tapp)nXm", "yield_Co(tapp)"]
+
+# Already converted parameters, characterization parameters, and workup
+# parameters that are irrelevant for phase selectivity.
+NON_FEATURE_COLUMNS = YIELD_COLUMNS + ["product_mass_g",
+                                       "COF-366-Co",
+                                       "MOCOF-1",
+                                       "amorphous",
+                                       "water_amount_umol",
+                                       "acid_amount_umol",
+                                       "acid_name",
+                                       "aminoporphyrin_monomer_amount_umol",
+                                       "aldehyde_monomer_amount_umol",
+                                       "solvent_1_volume_uL",
+                                       "solvent_2_volume_uL",
+                                       "solvent_3_name",
+                                       "solvent_3_volume_uL",
+                                       "activation_with_scCO2",
+                                       "workup_with_NaCl",
+                                       "MeOH_in_scCO2_activation",
+                                       "activation_under_vacuum",
+                                       "duration_h",
+                                       "MOCOF_high_yield",
+                                       "main_product"]
+
+
+def load_product_masses(tables_dir, experiment_ids) -> pd.DataFrame:
+    """
+    Product mass in gram per experiment ID, columns "id" and "product_mass_g".
+
+    The product mass is the first weighing of an experiment (as in
+    mofsy_api.find_product_mass), read from the weights table exported by
+    mofsy2parquet. Experiments without a weighing have no row.
+    """
+    weights = load_table(
+        str(tables_dir), "weights", columns=["experiment_id", "position", "value", "unit"]).to_pandas()
+    weights = weights[(weights["position"] == 0) & weights["experiment_id"].isin(experiment_ids)]
+    char_df = pd.DataFrame({"id": weights["experiment_id"]})
+    char_df["product_mass_g"] = convert_array(weights["value"], weights["unit"], "gram", "mass")
+    return char_df.reset_index(drop=True)
+
+
+def relabel_columns(df: pd.DataFrame, relabeling: dict = RELABELING) -> pd.DataFrame:
+    """
+    Rename the columns and relabel the values given in relabeling, and store all
+    text parameters (except "id") as pd.Categorical.
+
+    Labels are applied to the categories, i.e. once per distinct value and column
+    instead of to every cell of the frame.
+    """
+    df = df.rename(columns={column: name for column, (name, _) in relabeling.items()})
+    labels_by_column = {name: labels for name, labels in relabeling.values()}
+    for column in df.columns:
+        if column == "id" or not pd.api.types.is_object_dtype(df[column]) or \
+                not df[column].dropna().map(type).eq(str).all():
+            continue
+        values = df[column].astype("category")
+        labels = labels_by_column.get(column)
+        if labels:
+            values = values.cat.rename_categories(
+                lambda category: labels.get(category, category))
+        df[column] = values
+    return df
+
+
+def build_merged_frame(
+        params_path: Path = PARAMS_PATH,
+        tables_dir: Path = TABLES_DIR,
+        frac_path: Path = FRAC_PATH,
+        high_yield_threshold: float = HIGH_YIELD_THRESHOLD) -> pd.DataFrame:
+    """
+    Load and merge the parameters, molar fractions and product masses and derive
+    the model parameters, the phase yields and the targets "main_product" and
+    "MOCOF_high_yield".
+    """
+    # 1. Build flat DataFrames from the three sources
+    # 1.1 Parameters (already flat)
+    params_df = (
+        pd.DataFrame.from_dict(load_json(params_path), orient="index")
+        .reset_index()
+        .rename(columns={"index": "id"})
+    )
+
+    # 1.2 Molar fractions (PXRD)
+    frac_df = pd.read_csv(frac_path)
+
+    # 1.3 Characterisation – product mass in g from the weights table
+    char_df = load_product_masses(tables_dir, frac_df["id"])
+
+    # 2. Merge everything
+    df = (
+        params_df
+        .merge(frac_df, on="id", how="inner")
+        .merge(char_df, on="id", how="left")
+    )
+
+    # Shorten parameter names and labels for visualization
+    df = relabel_columns(df)
+
+    # 3. Parameter conversion
+    solvent_volume = df[["solvent_1_volume_uL",
+                         "solvent_2_volume_uL", "solvent_3_volume_uL"]].sum(axis=1)
+    df["TPA_eq"] = df["aldehyde_monomer_amount_umol"] / \
+        df["aminoporphyrin_monomer_amount_umol"]
+    df["H2O_per_TPA"] = df["water_amount_umol"] / \
+        df["aldehyde_monomer_amount_umol"]
+    df["TAPP_conc_mM"] = (((df["aminoporphyrin_monomer_amount_umol"] /
+                          solvent_volume * 1e3) / 2).round()) * 2
+    df["Acid_conc_M"] = (df["acid_amount_umol"] / solvent_volume).round(1)
+    df["Solvent2_fraction"] = df["solvent_2_volume_uL"] / \
+        df[["solvent_1_volume_uL", "solvent_2_volume_uL"]].sum(axis=1)
+    df["m-DNB"] = (df["solvent_3_volume_uL"] > 0)
+
+    # 4. Yield calculation (real values) and categorical main product
+    formula_mass = {k: Formula(v).mass for k, v in SUM_FORMULA.items()}
+    mixture_molar_mass = (
+        df["COF-366-Co"] * formula_mass["COF-366-Co"]
+        + df["MOCOF-1"] * formula_mass["MOCOF-1"]
+        + df["amorphous"] * formula_mass["amorphous"]
+    )
+
+    def phase_yield(phase: str) -> pd.Series:
+        return (df[phase] * df["product_mass_g"] / mixture_molar_mass
+                / df["aminoporphyrin_monomer_amount_umol"] / 1e-6)
+
+    df["yield_MOCOF-1"] = phase_yield("MOCOF-1").round(2)
+    df["yield_COF-366-Co"] = phase_yield("COF-366-Co").round(2)
+    # Assuming the amorphous component was Co(tapp)nXm. Minimum function to
+    # avoid overestimation.
+    df["yield_Co(tapp)nXm"] = (
+        np.minimum(1 - df["yield_COF-366-Co"] - df["yield_MOCOF-1"],
+                   phase_yield("amorphous"))
+    ).round(2)
+    df["yield_Co(tapp)"] = (1 - df["yield_Co(tapp)nXm"] -
+                            df["yield_COF-366-Co"] - df["yield_MOCOF-1"]).round(2)
+    df["MOCOF_high_yield"] = df["yield_MOCOF-1"] >= high_yield_threshold
+
+    df["main_product"] = df[YIELD_COLUMNS].idxmax(
+        axis=1).str.replace("yield_", "")
+    return df
+
+
+def select_model_data(
+        df: pd.DataFrame,
+        model_target: str,
+        deduplicate: bool = True,
+        relative_tolerance: float = 5,
+        verbose: bool = True) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Select the feature matrix and target of a model from the merged frame.
+
+    Rows without target are removed, as well as the columns that are no model
+    features and, if deduplicate is set, experiments whose parameters are all
+    within relative_tolerance percent of another experiment.
+
+    Returns:
+        Tuple[pd.DataFrame, np.ndarray]: X (still including the columns "id" and
+        model_target) and y.
+    """
+    # 1. Remove rows where the target is NaN
+    n_before = len(df)
+    mask_missing = df[[model_target]].isnull().any(axis=1)
+    missing_counts = {
+        "target_nan": int(df[model_target].isnull().sum()),
+    }
+    dropped_ids = df.loc[mask_missing, "id"].tolist()
+    df = df.dropna(subset=[model_target]).reset_index(drop=True)
+    n_after = len(df)
+    if verbose:
+        print("\n=== Drop‑NaN‑Report ===")
+        print(f"Columns before filtering: {n_before}")
+        print(f"Columns after Filtering: {n_after}")
+        print(f"Removed (Total): {n_before - n_after}")
+        print("Reason (Amount per Column):")
+        for k, v in missing_counts.items():
+            print(f"  {k:20s} → {v}")
+        print(
+            f"Example‑IDs of removed experiments (max 10): {dropped_ids[:10]}")
+
+    # 2. Input parameters, the target column is kept for the input table
+    X = df.drop(columns=[c for c in NON_FEATURE_COLUMNS if c != model_target])
+    y = df[model_target].values
+
+    # Find duplicates
+    if deduplicate:
+        if verbose:
+            print("\n=== Deduplicating feature matrix ===")
+
+        duplicate_indices, duplicate_pairs, epsilon_dict, param_stats = get_duplicate_indices(
+            X.drop(columns=["id"]),
+            relative_tolerance=relative_tolerance,
+            verbose=False
+        )
+
+        if verbose:
+            print(f"Found {len(duplicate_indices)} duplicate rows")
+            # print the experiment id for all duplicates
+            print("Duplicate experiment IDs:")
+            for (i, j) in duplicate_pairs:
+                print(f"  {df.loc[i, 'id']} is duplicate of {df.loc[j, 'id']}")
+
+        # Remove duplicates from both X and y
+        X = X.drop(duplicate_indices)
+        mask = np.ones(len(y), dtype=bool)
+        mask[duplicate_indices] = False
+        y = y[mask]
+
+        if verbose:
+            print(f"Final shapes: X={X.shape}, y={y.shape}")
+
+    return X, y
+
+
+def _feature_matrix_cache_path(cache_dir: Path, input_paths, settings: dict) -> Tuple[str, Path]:
+    """(settings digest, cache file) of a feature matrix."""
+    settings_digest = hashlib.sha256(
+        json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    # The code building the matrix (this module and every fair_synthesis module it
+    # imports, e.g. mofsy_api and unit_conversion) counts as an input as well
+    hashes = [str(hash_path(str(path))) for path in input_paths] + [hash_code(__name__, __file__)]
+    inputs_digest = hashlib.sha256("".join(hashes).encode("ascii")).hexdigest()[:16]
+    return settings_digest, Path(cache_dir) / f"{settings_digest}-{inputs_digest}.parquet"
+
+
+def build_feature_matrix(
+        model_target: str = "main_product",
+        deduplicate: bool = True,
+        relative_tolerance: float = 5,
+        high_yield_threshold: float = HIGH_YIELD_THRESHOLD,
+        params_path: Path = PARAMS_PATH,
+        tables_dir: Path = TABLES_DIR,
+        frac_path: Path = FRAC_PATH,
+        cache_dir: Path | None = FEATURE_MATRIX_CACHE_DIR,
+        verbose: bool = True) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Feature matrix and target of a model, see build_merged_frame and select_model_data.
+
+    The result is cached as Parquet in cache_dir. The cache entry is reused as long
+    as params_from_sciformation.json, phase_molar-fractions.csv, the weights table
+    in tables_dir, the settings, this module and the fair_synthesis modules it imports (see
+    fair_synthesis.code_hash) are unchanged; outdated entries for the same settings
+    are removed. Pass cache_dir=None to disable the cache.
+
+    Returns:
+        Tuple[pd.DataFrame, np.ndarray]: X (still including the columns "id" and
+        model_target) and y.
+    """
+    settings = {
+        "model_target": model_target,
+        "deduplicate": deduplicate,
+        "relative_tolerance": relative_tolerance,
+        "high_yield_threshold": high_yield_threshold,
+    }
+    if cache_dir is not None:
+        settings_digest, cache_path = _feature_matrix_cache_path(
+            cache_dir, (params_path, Path(tables_dir) / "weights.parquet", frac_path), settings)
+        if cache_path.exists():
+            if verbose:
+                print(f"\nLoaded feature matrix from cache {cache_path}")
+            X = pd.read_parquet(cache_path)
+            return X, X[model_target].to_numpy()
+
+    df = build_merged_frame(params_path, tables_dir, frac_path, high_yield_threshold)
+    X, y = select_model_data(df, model_target, deduplicate, relative_tolerance, verbose)
+
+    if cache_dir is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        for outdated in cache_path.parent.glob(f"{settings_digest}-*.parquet"):
+            outdated.unlink()
+        tmp_path = cache_path.with_suffix(".tmp")
+        X.to_parquet(tmp_path)
+        os.replace(tmp_path, cache_path)
+    return X, y
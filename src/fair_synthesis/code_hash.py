@@ -0,0 +1,113 @@
+"""
+Content hashes of files and of the fair_synthesis code a module depends on.
+
+Used to decide whether derived data (pipeline stage outputs, cached feature
+matrices) is out of date. hash_code covers the source of a module and of every
+fair_synthesis module it imports, directly or through other modules, so that
+editing a helper module invalidates everything built with it. Imports are
+found statically in the source, including imports deferred into functions.
+"""
+
+import ast
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterable, List
+
+PACKAGE_NAME = "fair_synthesis"
+PACKAGE_DIR = Path(__file__).parent
+
+
+def hash_path(path: str) -> str | None:
+    """sha256 of a file, or of all files below a directory. None if the path does not exist."""
+    if os.path.isfile(path):
+        return _hash_file(path)
+    if os.path.isdir(path):
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file_name in sorted(files):
+                file_path = os.path.join(root, file_name)
+                digest.update(os.path.relpath(file_path, path).encode('utf-8'))
+                digest.update(_hash_file(file_path).encode('ascii'))
+        return digest.hexdigest()
+    return None
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _module_file(module_name: str) -> Path | None:
+    """Source file of a fair_synthesis module or package, None for other modules."""
+    parts = module_name.split('.')
+    if parts[0] != PACKAGE_NAME:
+        return None
+    path = PACKAGE_DIR.joinpath(*parts[1:])
+    if path.with_suffix('.py').is_file():
+        return path.with_suffix('.py')
+    if (path / '__init__.py').is_file():
+        return path / '__init__.py'
+    return None
+
+
+def _imported_modules(path: Path, module_name: str) -> Iterable[str]:
+    """Names of the modules (and possible submodules) imported anywhere in a source file."""
+    package = module_name if path.name == '__init__.py' else module_name.rpartition('.')[0]
+    for node in ast.walk(ast.parse(path.read_text(encoding='utf-8'), filename=str(path))):
+        if isinstance(node, ast.Import):
+            yield from (alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = '.'.join(package.split('.')[:len(package.split('.')) - node.level + 1])
+                base = f"{base}.{node.module}" if node.module else base
+            else:
+                base = node.module
+            yield base
+            # "from package import name" may import the submodule package.name
+            yield from (f"{base}.{alias.name}" for alias in node.names)
+
+
+def source_files(module_name: str, path: str | None = None) -> List[Path]:
+    """
+    Source files of a module and of all fair_synthesis modules it imports.
+
+    Args:
+        module_name (str): Dotted name of the module, e.g. func.__module__.
+        path (str | None): Source file of the module, needed for modules outside
+            fair_synthesis (e.g. scripts).
+
+    Returns:
+        List[Path]: Sorted source files, including the __init__.py of the packages
+        that are imported along the way.
+    """
+    start = Path(path) if path is not None else _module_file(module_name)
+    if start is None:
+        raise ValueError(f"No source file found for module {module_name}")
+    files = {start.resolve(): module_name}
+    queue = [(start, module_name)]
+    while queue:
+        file, name = queue.pop()
+        for imported in _imported_modules(file, name):
+            # Importing a.b.c runs the __init__.py of a and a.b as well
+            parts = imported.split('.')
+            for i in range(1, len(parts) + 1):
+                parent = '.'.join(parts[:i])
+                parent_file = _module_file(parent)
+                if parent_file is not None and parent_file.resolve() not in files:
+                    files[parent_file.resolve()] = parent
+                    queue.append((parent_file, parent))
+    return sorted(files)
+
+
+def hash_code(module_name: str, path: str | None = None) -> str:
+    """sha256 over the source files of a module and its fair_synthesis imports, see source_files."""
+    digest = hashlib.sha256()
+    for file in source_files(module_name, path):
+        digest.update(os.path.relpath(file, PACKAGE_DIR.parent).encode('utf-8'))
+        digest.update(_hash_file(str(file)).encode('ascii'))
+    return digest.hexdigest()
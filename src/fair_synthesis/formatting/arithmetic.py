@@ -0,0 +1,67 @@
+import ast
+import operator
+from fractions import Fraction
+from functools import lru_cache
+from typing import Tuple
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+RANGE_SEPARATOR = "->"
+
+
+def _evaluate_node(node: ast.AST) -> Fraction:
+    if isinstance(node, ast.Expression):
+        return _evaluate_node(node.body)
+    if isinstance(node, ast.Constant) and isinstance(
+            node.value, (int, float)) and not isinstance(node.value, bool):
+        # repr gives the shortest literal of a float, e.g. 0.1 -> Fraction(1, 10)
+        return Fraction(repr(node.value))
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        return _BINARY_OPERATORS[type(node.op)](
+            _evaluate_node(node.left), _evaluate_node(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        return _UNARY_OPERATORS[type(node.op)](_evaluate_node(node.operand))
+    raise ValueError(f"Unsupported expression: {ast.dump(node)}")
+
+
+@lru_cache(maxsize=4096)
+def evaluate_arithmetic(expression: str) -> float:
+    """
+    Evaluate a plain arithmetic expression from the ELN, e.g. "120", "51 + 63" or "2.5*24".
+
+    Only numbers, + - * / and parentheses are allowed. The expression is evaluated
+    exactly with fractions and rounded to float once. Results are cached, as the
+    same few strings occur in most experiments.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Cannot parse expression {expression!r}") from e
+    try:
+        return float(_evaluate_node(tree))
+    except ZeroDivisionError as e:
+        raise ValueError(f"Division by zero in expression {expression!r}") from e
+
+
+def evaluate_range(expression: str) -> Tuple[float, float]:
+    """
+    Evaluate a range such as "80 -> 120" into (start, end).
+    A single value gives the same start and end.
+    """
+    parts = expression.split(RANGE_SEPARATOR)
+    if len(parts) == 1:
+        value = evaluate_arithmetic(parts[0])
+        return value, value
+    if len(parts) == 2:
+        return evaluate_arithmetic(parts[0]), evaluate_arithmetic(parts[1])
+    raise ValueError(f"Cannot parse range {expression!r}")
@@ -1,7 +1,5 @@
 import os
 from typing import List, Tuple
-from jsonschema import validate
-from sympy import sympify
 
 from fair_synthesis.generated_apis.procedure_data_structure import SynthesisProcedure, SynthesisElement, ReagentElement, Metadata, ComponentElement, \
     ProcedureSectionClass, ProcedureSectionsClass, Reagents, XMLType, StepEntryClass, \
@@ -11,6 +9,9 @@ from fair_synthesis.generated_apis.characterization_data_structure import Charac
     Unit as UnitCharacterization, Pxrd, SampleHolderType
 from fair_synthesis.generated_apis.fe_terephthalate_json_from_excel_data_structure import Mil
 from .utils import load_json, save_json
+from .schema_validation import validate
+from .unit_conversion import parse_unit
+from .arithmetic import evaluate_arithmetic
 from .pxrd_collector import collect_pxrd_files, filter_pxrd_files
 
 
@@ -274,53 +275,37 @@ def convert_mil_2_json_from_excel_to_mofsy(mil: Mil,
 
 
 def format_temperature(temp: str, temp_unit: str) -> Temperature:
-    if temp_unit not in ["C", "°C", "deg C"]:
+    if parse_unit(temp_unit, "temperature") != AmountUnit.CELSIUS:
         raise ValueError(
             f"Only Celsius is supported as temperature unit in converter, but got {temp_unit}")
     temperature_string: str = temp.replace("RT", "25")
-    temp: float = float(sympify(temperature_string))
+    temp: float = evaluate_arithmetic(temperature_string)
     return Temperature(value=round(temp, 2), unit=TempUnit.CELSIUS)
 
 
 def format_mass(mass: float | None, mass_unit: str) -> Quantity:
     if (mass is None) or (mass_unit is None):
         return Quantity(value=-1, unit=None)
-    if mass_unit == "mg":
-        return Quantity(value=round(mass, 2), unit=AmountUnit.MILLIGRAM)
-    elif mass_unit == "mmol":
-        return Quantity(value=round(mass, 2), unit=AmountUnit.MILLIMOLE)
-    else:
+    unit = parse_unit(mass_unit)
+    if unit not in (AmountUnit.MILLIGRAM, AmountUnit.MILLIMOLE):
         raise ValueError(
             f"Only mg is supported as mass unit in converter, but got {mass_unit}")
+    return Quantity(value=round(mass, 2), unit=unit)
 
 
 def format_amount_volume(amount: float | None, volume_unit: str) -> Quantity:
     if amount is None:
         return Quantity(value=-1, unit=None)
-    if volume_unit.lower() == "ml":
-        return Quantity(value=amount, unit=AmountUnit.MILLILITRE)
-    elif volume_unit.lower() in ["l", "lt", "liter", "litre"]:
-        return Quantity(value=round(amount, 2), unit=AmountUnit.LITRE)
-    elif volume_unit.lower() in ["µl", "ul", "microliter", "microlitre", "μl"]:
-        return Quantity(value=round(amount, 2), unit=AmountUnit.MICROLITRE)
-
-    raise ValueError(
-        f"{volume_unit} is not supported as volume unit in converter")
+    unit = parse_unit(volume_unit, "volume")
+    if unit == AmountUnit.MILLILITRE:
+        return Quantity(value=amount, unit=unit)
+    return Quantity(value=round(amount, 2), unit=unit)
 
 
 def format_time(time: float | None, time_unit: str) -> Time:
     if time is None or time_unit is None:
         return Time(value=-1, unit=None)
-    if time_unit in ["h", "hour", "hours"]:
-        return Time(value=round(time, 2), unit=AmountUnit.HOUR)
-    elif time_unit in ["min", "mins", "minute", "minutes"]:
-        return Time(value=round(time, 2), unit=AmountUnit.MINUTE)
-    elif time_unit in ["s", "sec", "secs", "second", "seconds"]:
-        return Time(value=round(time, 2), unit=AmountUnit.SECOND)
-    elif time_unit in ["d", "day", "days"]:
-        return Time(value=round(time, 2), unit=AmountUnit.DAY)
-    else:
-        raise ValueError(f"Unknown time unit in {time_unit}")
+    return Time(value=round(time, 2), unit=parse_unit(time_unit, "time"))
 
 
 def format_length(length: str) -> AmountCharacterization:
@@ -347,8 +332,7 @@ def fe_terephthalate2Mofsy():
     mil = load_json(file_path)
 
     # Validate data according to schema
-    validate(instance=mil, schema=load_json(os.path.join(
-        repo_root_path, 'data_model', 'Fe–terephthalate.schema.json')))
+    validate(mil, 'Fe–terephthalate.schema.json')
 
     procedure, characterization = convert_mil_2_json_from_excel_to_mofsy(
         Mil.from_dict(mil), pxrd_folder, repo_root_path)
@@ -370,16 +354,9 @@ def fe_terephthalate2Mofsy():
     # print("Characterization Result: " + str(result_dict_characterization))
 
     # Validate results according to schemas
-    validate(instance=result_dict_procedure, schema=load_json(
-        os.path.join(repo_root_path, 'data_model', 'procedure.schema.json')))
+    validate(result_dict_procedure, 'procedure.schema.json')
     print("Valid procedure JSON was generated.")
-    validate(
-        instance=result_dict_characterization,
-        schema=load_json(
-            os.path.join(
-                repo_root_path,
-                'data_model',
-                'characterization.schema.json')))
+    validate(result_dict_characterization, 'characterization.schema.json')
     print("Valid characterization JSON was generated.")
 
     save_json(result_dict_procedure, result_file_path_procedure)
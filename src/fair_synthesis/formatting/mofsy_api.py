@@ -5,6 +5,7 @@ from fair_synthesis.generated_apis.procedure_data_structure import SynthesisProc
 from fair_synthesis.generated_apis.characterization_data_structure import CharacterizationEntry, Characterization
 from fair_synthesis.generated_apis.mocof_1_params import Mocof1Param
 from fair_synthesis.formatting.pxrd_collector import PXRDFile
+from fair_synthesis.formatting.mofsy_lazy_loader import LazyProcedure, LazyCharacterization
 
 
 class Product:
@@ -30,6 +31,16 @@ def load_characterization(file_path: str) -> Characterization:
     return Characterization.from_dict(data)
 
 
+def load_procedure_lazy(file_path: str) -> LazyProcedure:
+    """Index the procedure file and decode single syntheses only when requested."""
+    return LazyProcedure(file_path)
+
+
+def load_characterization_lazy(file_path: str) -> LazyCharacterization:
+    """Index the characterization file and decode single entries only when requested."""
+    return LazyCharacterization(file_path)
+
+
 def load_mocof_1_params(file_path: str) -> Dict[str, Mocof1Param]:
     with open(file_path, 'r') as f:
         data: dict[str, dict] = json.load(f)
@@ -43,8 +54,16 @@ def get_synthesis_list(
 
 
 def get_synthesis_by_experiment_id(
-        procedure: SynthesisProcedure,
+        procedure: 'SynthesisProcedure | ExperimentStore',
         experiment_id: str) -> SynthesisElement | None:
+    """
+    Synthesis with the given experiment ID (its metadata description), None if there is none.
+
+    Pass an ExperimentStore for repeated lookups: it is answered from the store's
+    index, whereas a SynthesisProcedure is scanned (always up to date, O(n) per call).
+    """
+    if isinstance(procedure, ExperimentStore):
+        return procedure.get_synthesis(experiment_id)
     for synthesis in procedure.synthesis:
         if synthesis.metadata.description == experiment_id:
             return synthesis
@@ -52,8 +71,15 @@ def get_synthesis_by_experiment_id(
 
 
 def get_characterization_by_experiment_id(
-        characterization: Characterization,
+        characterization: 'Characterization | ExperimentStore',
         experiment_id: str) -> CharacterizationEntry | None:
+    """
+    Characterization entry with the given experiment ID, None if there is none.
+
+    Pass an ExperimentStore for repeated lookups, see get_synthesis_by_experiment_id.
+    """
+    if isinstance(characterization, ExperimentStore):
+        return characterization.get_characterization(experiment_id)
     for entry in characterization.product_characterization:
         if entry.experiment_id == experiment_id:
             return entry
@@ -84,6 +110,126 @@ def find_reagents_by_role(
     return results
 
 
+class ExperimentStore:
+    """
+    Indexed view on the procedure, characterization and MOCOF-1 params of one dataset.
+
+    The files are loaded once and hash indices by experiment ID, reagent name and
+    reagent role are built up front, so every lookup is a dictionary access instead
+    of a scan over all experiments. If an experiment ID occurs more than once, the
+    first occurrence wins (same as the scanning functions of this module).
+
+    The indices are a snapshot of the procedure and characterization taken at
+    construction. After adding, removing or replacing experiments or reagents, or
+    changing an experiment ID, reagent name or role, call reindex(); until then
+    the lookups reflect the old data.
+    """
+
+    def __init__(
+            self,
+            procedure: SynthesisProcedure | None = None,
+            characterization: Characterization | None = None,
+            params: Dict[str, Mocof1Param] | None = None):
+        self.procedure = procedure
+        self.characterization = characterization
+        self.params = params if params is not None else {}
+        self.reindex()
+
+    def reindex(self):
+        """Rebuild all indices from the current procedure and characterization."""
+        self._synthesis_by_id: Dict[str, SynthesisElement] = {}
+        self._characterization_by_id: Dict[str, CharacterizationEntry] = {}
+        self._reagent_by_name: Dict[str, Dict[str, ReagentElement]] = {}
+        self._reagents_by_role: Dict[str, Dict[Role, List[ReagentElement]]] = {}
+        self._experiments_by_reagent_name: Dict[str, List[str]] = {}
+        self._experiments_by_role: Dict[Role, List[str]] = {}
+
+        if self.procedure is not None:
+            self._synthesis_by_id = _build_synthesis_index(self.procedure)
+            for experiment_id, synthesis in self._synthesis_by_id.items():
+                self._index_reagents(experiment_id, synthesis)
+        if self.characterization is not None:
+            self._characterization_by_id = _build_characterization_index(
+                self.characterization)
+
+    @staticmethod
+    def from_files(
+            procedure_file_path: str | None = None,
+            characterization_file_path: str | None = None,
+            params_file_path: str | None = None) -> 'ExperimentStore':
+        return ExperimentStore(
+            procedure=load_procedure(procedure_file_path) if procedure_file_path else None,
+            characterization=load_characterization(
+                characterization_file_path) if characterization_file_path else None,
+            params=load_mocof_1_params(params_file_path) if params_file_path else None)
+
+    def _index_reagents(self, experiment_id: str, synthesis: SynthesisElement):
+        by_name: Dict[str, ReagentElement] = {}
+        by_role: Dict[Role, List[ReagentElement]] = {}
+        for reagent in synthesis.reagents.reagent:
+            if reagent.name is not None and reagent.name not in by_name:
+                by_name[reagent.name] = reagent
+                self._experiments_by_reagent_name.setdefault(
+                    reagent.name, []).append(experiment_id)
+            if reagent.role is not None:
+                if reagent.role not in by_role:
+                    self._experiments_by_role.setdefault(
+                        reagent.role, []).append(experiment_id)
+                by_role.setdefault(reagent.role, []).append(reagent)
+        self._reagent_by_name[experiment_id] = by_name
+        self._reagents_by_role[experiment_id] = by_role
+
+    def experiment_ids(self) -> List[str]:
+        """Experiment IDs of the procedure in file order."""
+        return list(self._synthesis_by_id)
+
+    def get_synthesis(self, experiment_id: str) -> SynthesisElement | None:
+        return self._synthesis_by_id.get(experiment_id)
+
+    def get_characterization(
+            self, experiment_id: str) -> CharacterizationEntry | None:
+        return self._characterization_by_id.get(experiment_id)
+
+    def get_params(self, experiment_id: str) -> Mocof1Param | None:
+        return self.params.get(experiment_id)
+
+    def find_reagent_by_name(
+            self,
+            experiment_id: str,
+            reagent_name: str) -> ReagentElement | None:
+        return self._reagent_by_name.get(experiment_id, {}).get(reagent_name)
+
+    def find_reagents_by_role(
+            self,
+            experiment_id: str,
+            role: Role) -> list[ReagentElement]:
+        return list(self._reagents_by_role.get(experiment_id, {}).get(role, []))
+
+    def find_experiments_by_reagent_name(self, reagent_name: str) -> List[str]:
+        """IDs of all experiments that use a reagent with the given name."""
+        return list(self._experiments_by_reagent_name.get(reagent_name, []))
+
+    def find_experiments_by_role(self, role: Role) -> List[str]:
+        """IDs of all experiments with at least one reagent of the given role."""
+        return list(self._experiments_by_role.get(role, []))
+
+
+def _build_synthesis_index(
+        procedure: SynthesisProcedure) -> Dict[str, SynthesisElement]:
+    index: Dict[str, SynthesisElement] = {}
+    for synthesis in procedure.synthesis:
+        index.setdefault(synthesis.metadata.description, synthesis)
+    return index
+
+
+def _build_characterization_index(
+        characterization: Characterization) -> Dict[str, CharacterizationEntry]:
+    index: Dict[str, CharacterizationEntry] = {}
+    for entry in characterization.product_characterization:
+        index.setdefault(entry.experiment_id, entry)
+    return index
+
+
 def find_product(
         synthesis: SynthesisElement,
         product_characterization: CharacterizationEntry) -> Product | None:
@@ -0,0 +1,225 @@
+import codecs
+import json
+import os
+from typing import Any, Callable, Dict, Generic, Iterator, List, Tuple, TypeVar
+
+from fair_synthesis.generated_apis.procedure_data_structure import SynthesisElement
+from fair_synthesis.generated_apis.characterization_data_structure import CharacterizationEntry
+
+T = TypeVar("T")
+
+_WHITESPACE = " \t\n\r"
+# Bytes read from the file at a time while streaming
+_CHUNK_SIZE = 1 << 16
+
+
+class LazyMofsyFile(Generic[T]):
+    """
+    Read-only view on a MOFSY JSON file that decodes single experiments on demand.
+
+    On first access, the entries of the top-level array (e.g. "Synthesis") are
+    indexed by experiment ID together with their byte offset and length in the
+    file. Afterwards, a lookup only reads and decodes the bytes of the requested
+    entry. The index is rebuilt automatically when the file changes on disk.
+    Indexing and stream() read the file in chunks and decode one entry at a
+    time, so their memory does not grow with the number of experiments.
+
+    Args:
+        file_path (str): Path to the MOFSY JSON file.
+        array_key (str): Key of the top-level array holding the experiments.
+        id_path (Tuple[str, ...]): Keys leading from an entry to its experiment ID.
+        from_dict (Callable): Converts a decoded entry into its class structure.
+    """
+
+    def __init__(self,
+                 file_path: str,
+                 array_key: str,
+                 id_path: Tuple[str, ...],
+                 from_dict: Callable[[Any], T]):
+        self.file_path = file_path
+        self.array_key = array_key
+        self.id_path = id_path
+        self.from_dict = from_dict
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._file_signature: Tuple[int, int] | None = None
+
+    def _ensure_index(self):
+        stat = os.stat(self.file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._file_signature:
+            self._index = self._build_index()
+            self._file_signature = signature
+
+    def _build_index(self) -> Dict[str, Tuple[int, int]]:
+        index: Dict[str, Tuple[int, int]] = {}
+        for entry, offset, length in self._iter_array():
+            experiment_id = entry
+            for key in self.id_path:
+                experiment_id = experiment_id.get(key) if isinstance(
+                    experiment_id, dict) else None
+            if isinstance(experiment_id, str):
+                index.setdefault(experiment_id, (offset, length))
+        return index
+
+    def _iter_array(self) -> Iterator[Tuple[Any, int, int]]:
+        """Decoded entries of the top-level array with their byte offset and length, in file order."""
+        with open(self.file_path, 'rb') as f:
+            stream = _JsonStream(f, self.file_path)
+            stream.expect('{')
+            # Walk the members of the top-level object until the array is found
+            while stream.peek() != '}':
+                key = stream.decode()
+                stream.expect(':')
+                if key == self.array_key:
+                    if stream.peek() != '[':
+                        raise ValueError(
+                            f"'{self.array_key}' in {self.file_path} is not an array")
+                    stream.expect('[')
+                    while stream.peek() != ']':
+                        # Drop the entries already read, the buffer holds one entry at a time
+                        stream.discard_consumed()
+                        offset = stream.byte_position()
+                        entry = stream.decode()
+                        yield entry, offset, stream.byte_position() - offset
+                        stream.skip_comma()
+                    return
+                stream.decode()
+                stream.skip_comma()
+        raise ValueError(
+            f"{self.file_path} has no top-level array '{self.array_key}'")
+
+    def experiment_ids(self) -> List[str]:
+        """Experiment IDs in file order."""
+        self._ensure_index()
+        return list(self._index)
+
+    def get(self, experiment_id: str) -> T | None:
+        """Decode and return the entry with the given experiment ID, or None."""
+        self._ensure_index()
+        location = self._index.get(experiment_id)
+        if location is None:
+            return None
+        offset, length = location
+        with open(self.file_path, 'rb') as f:
+            f.seek(offset)
+            raw = f.read(length)
+        return self.from_dict(json.loads(raw))
+
+    def __contains__(self, experiment_id: str) -> bool:
+        self._ensure_index()
+        return experiment_id in self._index
+
+    def __len__(self) -> int:
+        self._ensure_index()
+        return len(self._index)
+
+    def __iter__(self) -> Iterator[T]:
+        for experiment_id in self.experiment_ids():
+            yield self.get(experiment_id)
+
+    def stream_dicts(self) -> Iterator[Any]:
+        """
+        Decoded JSON of all entries in file order, read sequentially from the file.
+
+        Unlike iterating over the experiment IDs, entries with duplicate or
+        missing experiment IDs are included as well.
+        """
+        for entry, _, _ in self._iter_array():
+            yield entry
+
+    def stream(self) -> Iterator[T]:
+        """All entries in file order as class structures, see stream_dicts."""
+        for entry in self.stream_dicts():
+            yield self.from_dict(entry)
+
+
+class LazyProcedure(LazyMofsyFile[SynthesisElement]):
+    """Lazily loaded MOFSY procedure file, yielding SynthesisElement objects."""
+
+    def __init__(self, file_path: str):
+        super().__init__(file_path, "Synthesis",
+                         ("Metadata", "_description"), SynthesisElement.from_dict)
+
+
+class LazyCharacterization(LazyMofsyFile[CharacterizationEntry]):
+    """Lazily loaded MOFSY characterization file, yielding CharacterizationEntry objects."""
+
+    def __init__(self, file_path: str):
+        super().__init__(file_path, "ProductCharacterization",
+                         ("ExperimentId",), CharacterizationEntry.from_dict)
+
+
+class _JsonStream:
+    """
+    Sequential JSON tokenizer over a binary file that keeps only the unread part in memory.
+
+    The file is decoded incrementally as UTF-8 into a text buffer. Values are
+    decoded with json.JSONDecoder.raw_decode; if a value may extend beyond
+    the buffer, more of the file is read and it is decoded again.
+    """
+
+    def __init__(self, file, file_path: str):
+        self._file = file
+        self._file_path = file_path
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json_decoder = json.JSONDecoder()
+        self._text = ''
+        self._pos = 0
+        # Byte offset of the start of the text buffer in the file
+        self._byte_offset = 0
+        self._eof = False
+
+    def _read(self, size: int = _CHUNK_SIZE) -> bool:
+        """Append the next chunk of the file to the buffer, False at the end of the file."""
+        if self._eof:
+            return False
+        chunk = self._file.read(size)
+        self._eof = not chunk
+        self._text += self._decoder.decode(chunk, final=self._eof)
+        return not self._eof
+
+    def peek(self) -> str:
+        """Next non-whitespace character, '' at the end of the file."""
+        while True:
+            self._pos = _skip_whitespace(self._text, self._pos)
+            if self._pos < len(self._text) or not self._read():
+                return self._text[self._pos:self._pos + 1]
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Malformed JSON in {self._file_path}: expected '{char}'")
+        self._pos += 1
+
+    def skip_comma(self):
+        if self.peek() == ',':
+            self._pos += 1
+
+    def decode(self) -> Any:
+        if self.peek() == '':
+            raise ValueError(f"Malformed JSON in {self._file_path}: unexpected end of file")
+        size = _CHUNK_SIZE
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._text, self._pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self._text) or not self._read(size):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if not self._read(size):
+                    raise
+            size *= 2
+
+    def discard_consumed(self):
+        self._byte_offset += len(self._text[:self._pos].encode('utf-8'))
+        self._text = self._text[self._pos:]
+        self._pos = 0
+
+    def byte_position(self) -> int:
+        return self._byte_offset + len(self._text[:self._pos].encode('utf-8'))
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
@@ -0,0 +1,96 @@
+import os
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Tuple
+
+from jsonschema import validators
+from jsonschema.exceptions import ValidationError, best_match
+from referencing import Registry, Resource
+from referencing.jsonschema import DRAFT202012
+
+from .utils import load_json
+
+DATA_MODEL_DIR = os.path.join(
+    __file__.rsplit('/', 1)[0], '../../..', 'data_model')
+
+
+@lru_cache(maxsize=None)
+def _registry() -> Registry:
+    """All schemas of the data model, so that "$ref"s between schema files resolve without I/O."""
+    resources = []
+    for file_name in sorted(os.listdir(DATA_MODEL_DIR)):
+        if file_name.endswith('.schema.json'):
+            resources.append(
+                (file_name, Resource.from_contents(
+                    _load_schema(file_name), default_specification=DRAFT202012)))
+    return Registry().with_resources(resources).crawl()
+
+
+@lru_cache(maxsize=None)
+def _load_schema(schema_name: str) -> Dict[str, Any]:
+    return load_json(os.path.join(DATA_MODEL_DIR, schema_name))
+
+
+@lru_cache(maxsize=None)
+def get_validator(schema_name: str):
+    """
+    Compiled validator for a schema file in data_model/, e.g. "procedure.schema.json".
+    The schema is loaded, checked and compiled only once per process, and formats
+    (e.g. "date-time", "iri") are checked as far as the installed format libraries allow.
+    """
+    schema = _load_schema(schema_name)
+    cls = validators.validator_for(schema)
+    cls.check_schema(schema)
+    return cls(
+        schema,
+        registry=_registry(),
+        format_checker=cls.FORMAT_CHECKER)
+
+
+def validate(instance: Any, schema_name: str):
+    """Drop-in replacement for jsonschema.validate using the cached validator."""
+    error = best_match(get_validator(schema_name).iter_errors(instance))
+    if error is not None:
+        raise error
+
+
+def iter_invalid_entries(
+        document: Dict[str, Any],
+        schema_name: str,
+        array_key: str,
+        id_path: Tuple[str, ...]) -> Iterator[Tuple[str | None, ValidationError]]:
+    """
+    Validate the entries of a top-level array one by one.
+
+    Every entry is validated as a document of its own that contains only this entry
+    (plus the other top-level members), so an invalid experiment is reported with its
+    ID and validation stops at the first error of each entry.
+
+    Args:
+        document (dict): The document, e.g. a MOFSY procedure as dict.
+        schema_name (str): Schema file in data_model/.
+        array_key (str): Key of the top-level array, e.g. "Synthesis".
+        id_path (Tuple[str, ...]): Keys leading from an entry to its experiment ID.
+
+    Yields:
+        Tuple[str | None, ValidationError]: Experiment ID and error of each invalid entry.
+    """
+    validator = get_validator(schema_name)
+    single_entry_document = dict(document)
+    for entry in document[array_key]:
+        single_entry_document[array_key] = [entry]
+        error = best_match(validator.iter_errors(single_entry_document))
+        if error is not None:
+            experiment_id = entry
+            for key in id_path:
+                experiment_id = experiment_id.get(key) if isinstance(
+                    experiment_id, dict) else None
+            yield experiment_id, error
+
+
+def find_invalid_entries(
+        document: Dict[str, Any],
+        schema_name: str,
+        array_key: str,
+        id_path: Tuple[str, ...]) -> List[Tuple[str | None, ValidationError]]:
+    """List version of iter_invalid_entries."""
+    return list(iter_invalid_entries(document, schema_name, array_key, id_path))
@@ -1,7 +1,5 @@
 import os
 from typing import List, Tuple
-from jsonschema import validate
-from sympy import sympify
 
 from fair_synthesis.generated_apis.procedure_data_structure import SynthesisProcedure, SynthesisElement, ReagentElement, Metadata, ComponentElement, \
     ProcedureSectionsClass, Reagents, XMLType, StepEntryClass, ProcedureSectionClass, \
@@ -12,11 +10,19 @@ from fair_synthesis.generated_apis.characterization_data_structure import Charac
 from fair_synthesis.generated_apis.sciformation_eln_cleaned_data_structure import SciformationCleanedELNSchema, RxnRole, \
     Experiment, ReactionComponent, MassUnit
 from .mofsy_utils import rxn_role_to_xdl_role
-from .sciformation_cleaned_utils import find_reaction_components, get_inchi, mass_to_target_format, time_to_target_format, Unit as TimeUnit
+from .sciformation_cleaned_utils import find_reaction_components, get_inchi, Unit as TimeUnit
 from .sciformation_cleaner import clean_sciformation_eln
 from .utils import load_json, save_json
+from .schema_validation import validate, find_invalid_entries
+from .unit_conversion import convert
+from .arithmetic import evaluate_arithmetic, evaluate_range
 from .pxrd_collector import collect_pxrd_files, filter_pxrd_files
 
+# Experiment KE-113 had been planned in sciformation but never been carried out,
+# hence it has no specified amounts for the reagents. It is caught by the
+# validation based on procedure_MOCOF-1.schema and kept in the converted data.
+KNOWN_INVALID_EXPERIMENTS = {'KE-113'}
+
 
 def convert_cleaned_eln_to_mofsy(eln: SciformationCleanedELNSchema,
                                  pxrd_folder_path: str,
@@ -251,13 +257,12 @@ def construct_hardware(experiment: Experiment):
 def format_temperature(temp: str) -> Temperature:
     temperature_string: str = temp.replace("RT", "25")
     if "->" in temperature_string:  # if temperature is a range
-        start_temp: float = float(sympify(temperature_string.split("->")[0]))
-        end_temp: float = float(sympify(temperature_string.split("->")[1]))
+        start_temp, end_temp = evaluate_range(temperature_string)
         return Temperature(value=float(end_temp), unit=TempUnit.CELSIUS)
         # raise ValueError("Temperature ranges are not supported in MOFSY. Please provide a single temperature value.")
         # return str(start_temp) + " -> " + str(end_temp) + " C"
     else:
-        temp: float = float(sympify(temperature_string))
+        temp: float = evaluate_arithmetic(temperature_string)
         return Temperature(value=round(temp, 2), unit=TempUnit.CELSIUS)
 
 
@@ -267,7 +272,7 @@ def format_mass(
     if (mass is None) or (mass_unit is None):
         return AmountCharacterization(
             value=-1, unit=UnitCharacterization.MILLIGRAM)
-    mass_in_mg = mass_to_target_format(mass, mass_unit, MassUnit.MG)
+    mass_in_mg = convert(mass, mass_unit, AmountUnit.MILLIGRAM, "mass")
     return AmountCharacterization(
         value=round(
             mass_in_mg,
@@ -278,11 +283,12 @@ def format_mass(
 def format_amount_mole(amount: float | None) -> Quantity:
     if amount is None:
         return Quantity(value=-1, unit=AmountUnit.MICROMOLE)
+    # original value from sciformation is in mol
+    amount_in_umol = convert(amount, AmountUnit.MOLE, AmountUnit.MICROMOLE)
     return Quantity(
         value=float(
             round(
-                amount *
-                1000000,
+                amount_in_umol,
                 2)),
         unit=AmountUnit.MICROMOLE)
 
@@ -292,13 +298,14 @@ def format_amount_volume(amount: float | None) -> Quantity:
         return Quantity(value=-1, unit=AmountUnit.MICROLITRE)
     # original value from sciformation is in mL but we want to export to
     # microLitre
-    amount_in_ul = round(float(amount) * 1000, 3)
+    amount_in_ul = round(
+        convert(float(amount), AmountUnit.MILLILITRE, AmountUnit.MICROLITRE), 3)
     return Quantity(value=amount_in_ul, unit=AmountUnit.MICROLITRE)
 
 
 def format_time(time: str, time_unit: TimeUnit) -> Time:
-    time_in_h = time_to_target_format(
-        float(sympify(time)), time_unit, TimeUnit.H)
+    time_in_h = convert(
+        evaluate_arithmetic(time), time_unit, AmountUnit.HOUR, "time")
     return Time(value=round(time_in_h, 2), unit=AmountUnit.HOUR)
 
 
@@ -327,8 +334,7 @@ def sciformation2mofsy():
     print("The Sciformation ELN data has been cleaned.")
 
     # Validate data according to schema
-    validate(instance=cleaned_eln, schema=load_json(os.path.join(
-        repo_root_path, 'data_model', 'sciformation_eln_cleaned.schema.json')))
+    validate(cleaned_eln, 'sciformation_eln_cleaned.schema.json')
 
     procedure, characterization = convert_cleaned_eln_to_mofsy(
         SciformationCleanedELNSchema.from_dict(cleaned_eln), pxrd_folder, repo_root_path)
@@ -353,32 +359,24 @@ def sciformation2mofsy():
     save_json(result_dict_characterization, result_file_path_characterization)
 
     # Validate results according to schemas
-    validate(instance=result_dict_procedure, schema=load_json(
-        os.path.join(repo_root_path, 'data_model', 'procedure.schema.json')))
+    validate(result_dict_procedure, 'procedure.schema.json')
     print("Valid procedure JSON was generated.")
-    validate(
-        instance=result_dict_characterization,
-        schema=load_json(
-            os.path.join(
-                repo_root_path,
-                'data_model',
-                'characterization.schema.json')))
+    validate(result_dict_characterization, 'characterization.schema.json')
     print("Valid characterization JSON was generated.")
 
-    # Remove entry with id KE-113 because it is invalid. It had been caught via our validation based on procedure_MOCOF-1.schema.
-    # Experiment KE-113 had been planned in sciformation but never been
-    # carried out, hence it has no specified amounts for the reagents.
-    result_dict_procedure['Synthesis'] = [
-        entry for entry in result_dict_procedure['Synthesis'] if entry['Metadata']['_description'] != 'KE-113']
-
-    # Additionally validate based on more strict use case specific schema
-    validate(
-        instance=result_dict_procedure,
-        schema=load_json(
-            os.path.join(
-                repo_root_path,
-                'data_model',
-                'procedure_MOCOF-1.schema.json')))
+    # Additionally validate each experiment based on more strict use case specific schema
+    invalid_entries = find_invalid_entries(
+        result_dict_procedure,
+        'procedure_MOCOF-1.schema.json',
+        'Synthesis',
+        ('Metadata', '_description'))
+    for experiment_id, error in invalid_entries:
+        print(
+            f"Experiment {experiment_id} is invalid according to the MOCOF-1 specific schema: {error.message}")
+    unexpected_errors = [error for experiment_id, error in invalid_entries
+                         if experiment_id not in KNOWN_INVALID_EXPERIMENTS]
+    if unexpected_errors:
+        raise unexpected_errors[0]
     print("The procedure JSON is valid according to the MOCOF-1 specific schema.")
 
 
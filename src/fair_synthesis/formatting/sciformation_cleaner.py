@@ -3,7 +3,6 @@ from datetime import datetime
 from copy import deepcopy
 
 from .utils import format_to_camel_case, load_json, save_json
-from fair_synthesis.formatting.sciformation_text_extractor_llm_mocof1 import process_data_use_case_specific as process_data_with_llm
 from fair_synthesis.formatting.sciformation_text_extractor_mocof1 import process_data_use_case_specific as process_data
 
 important_item_attributes = [
@@ -130,6 +129,9 @@ def clean_sciformation_eln(
 
     # Process the data according to the current use-case
     if use_llm_for_extraction:
+        # Only import the LLM extractor (and openai) when it is used
+        from fair_synthesis.formatting.sciformation_text_extractor_llm_mocof1 import \
+            process_data_use_case_specific as process_data_with_llm
         process_data_with_llm(postprocessed_data)
     else:
         process_data(postprocessed_data)
@@ -1,15 +1,19 @@
 import json
+from functools import lru_cache
 from pathlib import Path
-from openai import OpenAI
 from jsonschema import validate, ValidationError
 
 from .sciformation_text_extractor_mocof1 import fix_inchi_code_for_do, use_more_detailed_reagent_roles
 
-# Load schema from file
 schema_path = Path(__file__).parent / \
     "sciformation_text_extractor_llm_mocof1_experiment_diff.schema.json"
-with open(schema_path, "r", encoding="utf-8") as f:
-    experiment_diff_schema = json.load(f)
+
+
+@lru_cache(maxsize=None)
+def load_experiment_diff_schema() -> dict:
+    """Load the ExperimentDiff schema from file on first use."""
+    with open(schema_path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
 
 def extract_experiment_diff(realization_text: str):
@@ -18,6 +22,11 @@ def extract_experiment_diff(realization_text: str):
     following the ExperimentDiff schema. The result is validated
     against the schema before returning.
     """
+    # openai is slow to import and only needed here
+    from openai import OpenAI
+
+    experiment_diff_schema = load_experiment_diff_schema()
+
     # Initialize client (requires OPENAI_API_KEY in env)
     client = OpenAI()
 
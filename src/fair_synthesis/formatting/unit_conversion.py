@@ -0,0 +1,225 @@
+from enum import Enum
+from fractions import Fraction
+from typing import Any, Dict, Tuple
+
+from fair_synthesis.generated_apis.procedure_data_structure import AmountUnit
+
+# Units of the MOFSY data model per dimension with their exact factor to the
+# dimension's base unit (second, gram, mole, litre, metre, pascal).
+_FACTORS_TO_BASE: Dict[str, Dict[AmountUnit, Fraction]] = {
+    "time": {
+        AmountUnit.MILLISECOND: Fraction(1, 1000),
+        AmountUnit.SECOND: Fraction(1),
+        AmountUnit.MINUTE: Fraction(60),
+        AmountUnit.HOUR: Fraction(3600),
+        AmountUnit.DAY: Fraction(86400),
+        AmountUnit.WEEK: Fraction(604800),
+    },
+    "mass": {
+        AmountUnit.MICROGRAM: Fraction(1, 1000000),
+        AmountUnit.MILLIGRAM: Fraction(1, 1000),
+        AmountUnit.GRAM: Fraction(1),
+        AmountUnit.KILOGRAM: Fraction(1000),
+        AmountUnit.TON: Fraction(1000000),
+    },
+    "amount": {
+        AmountUnit.MICROMOLE: Fraction(1, 1000000),
+        AmountUnit.MILLIMOLE: Fraction(1, 1000),
+        AmountUnit.MOLE: Fraction(1),
+    },
+    "volume": {
+        AmountUnit.MICROLITRE: Fraction(1, 1000000),
+        AmountUnit.MILLILITRE: Fraction(1, 1000),
+        AmountUnit.CENTILITRE: Fraction(1, 100),
+        AmountUnit.DECILITRE: Fraction(1, 10),
+        AmountUnit.LITRE: Fraction(1),
+    },
+    "length": {
+        AmountUnit.MILLIMETER: Fraction(1, 1000),
+        AmountUnit.CENTIMETER: Fraction(1, 100),
+        AmountUnit.METER: Fraction(1),
+    },
+    "pressure": {
+        AmountUnit.PASCAL: Fraction(1),
+        AmountUnit.BAR: Fraction(100000),
+    },
+}
+
+# Temperatures are affine: kelvin = celsius + 273.15
+_TEMPERATURE_OFFSETS_TO_KELVIN: Dict[AmountUnit, Fraction] = {
+    AmountUnit.KELVIN: Fraction(0),
+    AmountUnit.CELSIUS: Fraction(27315, 100),
+}
+
+DIMENSIONS = tuple(_FACTORS_TO_BASE) + ("temperature",)
+
+# Spellings found in the raw data (ELN exports, Excel sheets) per dimension.
+# "m" is minutes in the Sciformation ELN, hence aliases are looked up per dimension.
+_UNIT_ALIASES: Dict[str, Dict[str, AmountUnit]] = {
+    "time": {
+        "ms": AmountUnit.MILLISECOND,
+        "s": AmountUnit.SECOND, "sec": AmountUnit.SECOND, "secs": AmountUnit.SECOND,
+        "second": AmountUnit.SECOND, "seconds": AmountUnit.SECOND,
+        "m": AmountUnit.MINUTE, "min": AmountUnit.MINUTE, "mins": AmountUnit.MINUTE,
+        "minute": AmountUnit.MINUTE, "minutes": AmountUnit.MINUTE,
+        "h": AmountUnit.HOUR, "hour": AmountUnit.HOUR, "hours": AmountUnit.HOUR,
+        "d": AmountUnit.DAY, "day": AmountUnit.DAY, "days": AmountUnit.DAY,
+        "week": AmountUnit.WEEK, "weeks": AmountUnit.WEEK,
+    },
+    "mass": {
+        "ug": AmountUnit.MICROGRAM, "µg": AmountUnit.MICROGRAM, "μg": AmountUnit.MICROGRAM,
+        "mg": AmountUnit.MILLIGRAM,
+        "g": AmountUnit.GRAM,
+        "kg": AmountUnit.KILOGRAM,
+        "t": AmountUnit.TON,
+    },
+    "amount": {
+        "umol": AmountUnit.MICROMOLE, "µmol": AmountUnit.MICROMOLE, "μmol": AmountUnit.MICROMOLE,
+        "mmol": AmountUnit.MILLIMOLE,
+        "mol": AmountUnit.MOLE,
+    },
+    "volume": {
+        "ul": AmountUnit.MICROLITRE, "µl": AmountUnit.MICROLITRE, "μl": AmountUnit.MICROLITRE,
+        "microliter": AmountUnit.MICROLITRE,
+        "ml": AmountUnit.MILLILITRE, "milliliter": AmountUnit.MILLILITRE,
+        "cl": AmountUnit.CENTILITRE,
+        "dl": AmountUnit.DECILITRE,
+        "l": AmountUnit.LITRE, "lt": AmountUnit.LITRE, "liter": AmountUnit.LITRE,
+    },
+    "length": {
+        "mm": AmountUnit.MILLIMETER,
+        "cm": AmountUnit.CENTIMETER,
+        "m": AmountUnit.METER, "meter": AmountUnit.METER, "metre": AmountUnit.METER,
+    },
+    "pressure": {
+        "pa": AmountUnit.PASCAL,
+        "bar": AmountUnit.BAR,
+    },
+    "temperature": {
+        "c": AmountUnit.CELSIUS, "°c": AmountUnit.CELSIUS, "deg c": AmountUnit.CELSIUS,
+        "k": AmountUnit.KELVIN,
+    },
+}
+# The MOFSY unit names themselves (e.g. "milligram") are valid spellings as well
+for _dimension, _units in list(_FACTORS_TO_BASE.items()) + [
+        ("temperature", _TEMPERATURE_OFFSETS_TO_KELVIN)]:
+    for _unit in _units:
+        _UNIT_ALIASES[_dimension][_unit.value] = _unit
+
+_DIMENSION_OF_UNIT: Dict[AmountUnit, str] = {
+    unit: dimension for dimension, units in _FACTORS_TO_BASE.items() for unit in units}
+_DIMENSION_OF_UNIT.update(
+    {unit: "temperature" for unit in _TEMPERATURE_OFFSETS_TO_KELVIN})
+
+
+def _conversion(from_unit: AmountUnit, to_unit: AmountUnit) -> Tuple[float, float, float]:
+    """
+    (multiplier, divisor, offset) with value_in_to_unit = value * multiplier / divisor + offset.
+
+    multiplier / divisor is the exact ratio of the two unit factors in lowest terms,
+    e.g. minute -> hour is value * 1 / 60 and millilitre -> microlitre is
+    value * 1000 / 1. For the units of the data model one of the two is always 1,
+    so a conversion is a single multiplication or division by an integer and gives
+    bitwise the same result as converting by hand with that integer.
+    """
+    dimension = _DIMENSION_OF_UNIT[from_unit]
+    if dimension != _DIMENSION_OF_UNIT[to_unit]:
+        raise ValueError(
+            f"Cannot convert {from_unit.value} ({dimension}) to "
+            f"{to_unit.value} ({_DIMENSION_OF_UNIT[to_unit]})")
+    if dimension == "temperature":
+        offset = _TEMPERATURE_OFFSETS_TO_KELVIN[from_unit] - \
+            _TEMPERATURE_OFFSETS_TO_KELVIN[to_unit]
+        return 1.0, 1.0, float(offset)
+    ratio = _FACTORS_TO_BASE[dimension][from_unit] / _FACTORS_TO_BASE[dimension][to_unit]
+    return float(ratio.numerator), float(ratio.denominator), 0.0
+
+
+# Precomputed conversion for every pair of units of the same dimension
+_CONVERSIONS: Dict[Tuple[AmountUnit, AmountUnit], Tuple[float, float, float]] = {
+    (from_unit, to_unit): _conversion(from_unit, to_unit)
+    for from_unit, dimension in _DIMENSION_OF_UNIT.items()
+    for to_unit in _DIMENSION_OF_UNIT
+    if _DIMENSION_OF_UNIT[to_unit] == dimension}
+
+
+def _apply(values, conversion):
+    multiplier, divisor, offset = conversion
+    return values * multiplier / divisor + offset
+
+
+def parse_unit(unit: Any, dimension: str | None = None) -> AmountUnit:
+    """
+    Resolve a unit given as MOFSY AmountUnit, as enum of another data structure
+    (e.g. the Sciformation MassUnit or the characterization Unit) or as string.
+
+    Args:
+        unit: The unit.
+        dimension (str): One of DIMENSIONS. Required for ambiguous spellings such as "m".
+    """
+    if isinstance(unit, AmountUnit):
+        result = unit
+    else:
+        name = (unit.value if isinstance(unit, Enum) else str(unit)).strip().lower()
+        dimensions = [dimension] if dimension is not None else list(_UNIT_ALIASES)
+        candidates = {_UNIT_ALIASES[d][name]
+                      for d in dimensions if name in _UNIT_ALIASES[d]}
+        if len(candidates) != 1:
+            reason = "ambiguous" if candidates else "unknown"
+            raise ValueError(
+                f"{reason} unit {unit!r}" + (f" for {dimension}" if dimension else ""))
+        result = candidates.pop()
+    if dimension is not None and _DIMENSION_OF_UNIT.get(result) != dimension:
+        raise ValueError(f"{result.value} is not a unit of {dimension}")
+    return result
+
+
+def convert(value: float, from_unit: Any, to_unit: Any, dimension: str | None = None) -> float:
+    """Convert a single value, e.g. convert(90, "min", AmountUnit.HOUR) == 1.5."""
+    return _apply(value, _CONVERSIONS[(
+        parse_unit(from_unit, dimension), parse_unit(to_unit, dimension))])
+
+
+def convert_array(values, units, to_unit: Any, dimension: str | None = None):
+    """
+    Convert a whole column of (value, unit) pairs to one unit in a single pass.
+
+    The distinct units are resolved once and their conversions are broadcast back
+    onto the column. Missing values or units (None/NaN) give NaN.
+
+    Args:
+        values: Array-like of numbers, e.g. a NumPy array or pandas Series.
+        units: Array-like of units (same length as values) or a single unit for all
+            values. A single missing unit (None or NaN) gives NaN for all values.
+        to_unit: Target unit.
+        dimension (str): One of DIMENSIONS, for ambiguous spellings.
+
+    Returns:
+        np.ndarray of float, or a pandas Series with the index of values if values is a Series.
+    """
+    # NumPy and pandas are only needed for columns, not for the per-value converters
+    import numpy as np
+    import pandas as pd
+
+    target = parse_unit(to_unit, dimension)
+    array = pd.to_numeric(pd.Series(np.asarray(values, dtype=object)), errors="coerce").to_numpy(
+        dtype=float)
+    if np.ndim(units) == 0:
+        # A single unit for all values, None or NaN if the unit is missing
+        if pd.isna(units):
+            result = np.full(len(array), np.nan)
+        else:
+            result = _apply(array, _CONVERSIONS[(parse_unit(units, dimension), target)])
+    else:
+        codes, uniques = pd.factorize(pd.Series(np.asarray(units, dtype=object)), use_na_sentinel=True)
+        if len(codes) != len(array):
+            raise ValueError(
+                f"Got {len(array)} values but {len(codes)} units")
+        # One row per distinct unit, the last row (code -1) is for missing units
+        table = np.full((len(uniques) + 1, 3), np.nan)
+        for i, unit in enumerate(uniques):
+            table[i] = _CONVERSIONS[(parse_unit(unit, dimension), target)]
+        result = _apply(array, table[codes].T)
+    if isinstance(values, pd.Series):
+        return pd.Series(result, index=values.index, name=values.name)
+    return result
@@ -1,9 +1,12 @@
 import json
 import os
-import starfile
-import yaml
 import re
-import pubchempy as pcp
+from typing import TYPE_CHECKING
+
+# pubchempy, starfile (pulls in pandas) and yaml are imported on first use, so that
+# importing the converters does not pay for them
+if TYPE_CHECKING:
+    import pubchempy as pcp
 
 # Partially copied and adapted from https://github.com/FAIRChemistry/substance-query/blob/main/substancewidget
 # /substancewidget.py
@@ -20,7 +23,7 @@ RE_INCHIKEY = re.compile(r"/^([0-9A-Z\-]+)$/")
 cached_compounds = {}
 
 
-def query_compound_from_pub_chem(query: str) -> pcp.Compound | None:
+def query_compound_from_pub_chem(query: str) -> "pcp.Compound | None":
     """
     Query a compound using the PubChemPy library. The query can be a CID, SMILES, InChI, or InChIKey.
     :param query: The query string
@@ -28,6 +31,8 @@ def query_compound_from_pub_chem(query: str) -> pcp.Compound | None:
     if query in cached_compounds:
         return cached_compounds[query]
 
+    import pubchempy as pcp
+
     match query:
         case query if query.isdigit():
             compound_options = [(pcp.Compound.from_cid(query))]
@@ -65,6 +70,7 @@ def save_json(data, file_path):
 def save_starfile(data, file_path):
     # create missing directories
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    import starfile
     starfile.write(data, file_path)
 
 
@@ -74,6 +80,7 @@ def save_string_as_file(data: str, file_path):
 
 
 def load_yaml(file_path):
+    import yaml
     with open(file_path, 'r') as f:
         data = yaml.safe_load(f)
     return data
@@ -60,6 +60,8 @@ class Unit(Enum):
 
 
 class Quantity:
+    __slots__ = ('unit', 'value')
+
     unit: Unit
     value: float
 
@@ -87,6 +89,8 @@ class SampleHolderType(Enum):
 
 
 class SampleHolder:
+    __slots__ = ('diameter', 'type')
+
     diameter: Quantity
     type: SampleHolderType
 
@@ -114,6 +118,13 @@ class XRaySource(Enum):
 
 
 class Pxrd:
+    __slots__ = (
+        'other_metadata',
+        'relative_file_path',
+        'sample_holder',
+        'x_ray_source',
+    )
+
     other_metadata: Optional[str]
     relative_file_path: str
     sample_holder: SampleHolder
@@ -156,6 +167,8 @@ class Pxrd:
 
 
 class Weighing:
+    __slots__ = ('weight',)
+
     weight: Quantity
 
     def __init__(self, weight: Quantity) -> None:
@@ -174,6 +187,8 @@ class Weighing:
 
 
 class CharacterizationClass:
+    __slots__ = ('pxrd', 'weight')
+
     pxrd: List[Pxrd]
     weight: List[Weighing]
 
@@ -197,6 +212,8 @@ class CharacterizationClass:
 
 
 class CharacterizationEntry:
+    __slots__ = ('characterization', 'experiment_id')
+
     characterization: CharacterizationClass
     experiment_id: str
 
@@ -226,6 +243,8 @@ class CharacterizationEntry:
 class Characterization:
     """characterization data and analysis results of products from the MOF synthesis test cases"""
 
+    __slots__ = ('product_characterization',)
+
     product_characterization: List[CharacterizationEntry]
 
     def __init__(
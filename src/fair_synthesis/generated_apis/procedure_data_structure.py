@@ -61,6 +61,8 @@ def from_bool(x: Any) -> bool:
 
 
 class ComponentElement:
+    __slots__ = ('chemical', 'comment', 'id', 'type')
+
     chemical: Optional[str]
     comment: Optional[str]
     id: str
@@ -101,6 +103,8 @@ class ComponentElement:
 
 
 class Hardware:
+    __slots__ = ('component',)
+
     component: Optional[List[ComponentElement]]
 
     def __init__(self, component: Optional[List[ComponentElement]]) -> None:
@@ -122,6 +126,8 @@ class Hardware:
 
 
 class Metadata:
+    __slots__ = ('description', 'product', 'product_inchi')
+
     description: str
     product: Optional[str]
     product_inchi: Optional[str]
@@ -191,6 +197,8 @@ class AmountUnit(Enum):
 class Quantity:
     """amount of the involved chemical"""
 
+    __slots__ = ('unit', 'value')
+
     unit: Optional[AmountUnit]
     value: float
 
@@ -226,6 +234,8 @@ class PressureUnit(Enum):
 class Pressure:
     """amount of the involved chemical"""
 
+    __slots__ = ('unit', 'value')
+
     unit: Optional[PressureUnit]
     value: float
 
@@ -270,6 +280,8 @@ class TempUnit(Enum):
 class Temperature:
     """amount of the involved chemical"""
 
+    __slots__ = ('unit', 'value')
+
     unit: Optional[TempUnit]
     value: float
 
@@ -297,6 +309,8 @@ class Temperature:
 class Time:
     """amount of the involved chemical"""
 
+    __slots__ = ('value', 'unit')
+
     value: float
     unit: Optional[AmountUnit]
 
@@ -332,6 +346,19 @@ class XMLType(Enum):
 
 
 class StepEntryClass:
+    __slots__ = (
+        'comment',
+        'vessel',
+        'xml_type',
+        'amount',
+        'reagent',
+        'temp',
+        'time',
+        'gas',
+        'solvent',
+        'pressure',
+    )
+
     comment: Optional[str]
     vessel: Optional[str]
     xml_type: XMLType
@@ -432,6 +459,8 @@ class StepEntryClass:
 
 
 class ProcedureSectionClass:
+    __slots__ = ('step',)
+
     step: List[Optional[Union[float, int, bool, str, List[Any], StepEntryClass]]]
 
     def __init__(self,
@@ -484,6 +513,8 @@ class ProcedureSectionClass:
 
 
 class ProcedureSectionsClass:
+    __slots__ = ('prep', 'reaction', 'workup')
+
     prep: Optional[Union[float, int, bool,
                          str, List[Any], ProcedureSectionClass]]
     reaction: Optional[Union[float, int, bool,
@@ -604,6 +635,8 @@ class Role(Enum):
 
 
 class ReagentElement:
+    __slots__ = ('cas', 'comment', 'id', 'inchi', 'name', 'purity', 'role')
+
     cas: Optional[str]
     comment: Optional[str]
     id: Optional[str]
@@ -663,6 +696,8 @@ class ReagentElement:
 
 
 class Reagents:
+    __slots__ = ('reagent',)
+
     reagent: List[ReagentElement]
 
     def __init__(self, reagent: List[ReagentElement]) -> None:
@@ -682,6 +717,8 @@ class Reagents:
 
 
 class SynthesisElement:
+    __slots__ = ('hardware', 'metadata', 'procedure', 'reagents')
+
     hardware: Optional[Hardware]
     metadata: Metadata
     procedure: Optional[Union[float, int, bool,
@@ -746,6 +783,8 @@ class SynthesisElement:
 
 
 class SynthesisProcedure:
+    __slots__ = ('synthesis',)
+
     synthesis: List[SynthesisElement]
 
     def __init__(self, synthesis: List[SynthesisElement]) -> None:
@@ -0,0 +1,218 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+from fair_synthesis.code_hash import hash_code, hash_path
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One step of the data pipeline.
+
+    Args:
+        name (str): Unique name of the stage.
+        func (Callable): Module-level function that is run in a worker process.
+        inputs (Tuple[str, ...]): Files or directories the stage reads.
+        outputs (Tuple[str, ...]): Files the stage writes.
+        args (Tuple): Positional arguments passed to func.
+    """
+    name: str
+    func: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    args: Tuple[Any, ...] = field(default_factory=tuple)
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # "ran", "skipped", "failed" or "blocked"
+    duration_s: float = 0.0
+    error: str | None = None
+
+
+def _fingerprint(stage: Stage) -> Dict[str, str | None]:
+    # The module defining the stage function and all fair_synthesis modules it
+    # imports count as an input, so that changes to the conversion code or to
+    # any helper it uses invalidate the stage as well.
+    fingerprint = {path: hash_path(path) for path in stage.inputs}
+    fingerprint['code'] = hash_code(stage.func.__module__, inspect.getsourcefile(stage.func))
+    fingerprint['args'] = hashlib.sha256(repr(stage.args).encode('utf-8')).hexdigest()
+    return fingerprint
+
+
+def _run_stage(stage: Stage) -> float:
+    start = time.perf_counter()
+    stage.func(*stage.args)
+    return time.perf_counter() - start
+
+
+class Pipeline:
+    """
+    Make-style runner for a set of stages.
+
+    Dependencies are derived from the declared files: a stage depends on every
+    stage that writes one of its inputs. A stage is skipped if the hashes of its
+    inputs, of its source module and of the fair_synthesis modules that module
+    imports (see fair_synthesis.code_hash) match the last successful run and all
+    of its outputs still exist with the recorded hashes. Stages that do not
+    depend on each other run concurrently in worker processes.
+
+    Args:
+        stages (List[Stage]): The stages of the pipeline.
+        state_file_path (str): JSON file storing hashes and timings between runs.
+    """
+
+    def __init__(self, stages: List[Stage], state_file_path: str):
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Stage names must be unique, got {names}")
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_file_path = state_file_path
+
+        producers: Dict[str, str] = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(
+                        f"{output} is written by both {producers[output]} and {stage.name}")
+                producers[output] = stage.name
+        self.dependencies = {
+            stage.name: {producers[path] for path in stage.inputs if path in producers}
+            for stage in stages}
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle involving stage {name}")
+            visiting.add(name)
+            for dependency in self.dependencies[name]:
+                visit(dependency)
+            visiting.remove(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _load_state(self) -> Dict[str, Any]:
+        if not os.path.exists(self.state_file_path):
+            return {}
+        with open(self.state_file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_state(self, state: Dict[str, Any]):
+        with open(self.state_file_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, ensure_ascii=False)
+
+    def _is_up_to_date(self, stage: Stage, state: Dict[str, Any]) -> bool:
+        recorded = state.get(stage.name)
+        if recorded is None:
+            return False
+        if recorded.get('inputs') != _fingerprint(stage):
+            return False
+        return all(
+            os.path.exists(path) and recorded.get('outputs', {}).get(path) == hash_path(path)
+            for path in stage.outputs)
+
+    def run(self,
+            only: List[str] | None = None,
+            force: bool = False,
+            max_workers: int | None = None) -> List[StageResult]:
+        """
+        Run all stages that are out of date.
+
+        Args:
+            only (List[str]): Restrict the run to these stages. Their upstream
+                stages are not run, existing files are used instead.
+            force (bool): Run the stages even if they are up to date.
+            max_workers (int): Number of worker processes. Defaults to the CPU count.
+
+        Returns:
+            List[StageResult]: Status and duration of every stage, in completion order.
+        """
+        selected = set(self.stages) if only is None else set(only)
+        unknown = selected - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown stages: {sorted(unknown)}")
+
+        state = self._load_state()
+        pending = {name: self.dependencies[name] & selected
+                   for name in self.stages if name in selected}
+        results: List[StageResult] = []
+        finished: Dict[str, str] = {}
+        running = {}
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+                for name in list(pending):
+                    dependency_status = [finished.get(dep) for dep in pending[name]]
+                    if any(status in ('failed', 'blocked') for status in dependency_status):
+                        del pending[name]
+                        finished[name] = 'blocked'
+                        results.append(StageResult(name, 'blocked'))
+                        continue
+                    if any(status is None for status in dependency_status):
+                        continue
+                    del pending[name]
+                    stage = self.stages[name]
+                    missing = [path for path in stage.inputs if not os.path.exists(path)]
+                    if missing:
+                        finished[name] = 'failed'
+                        results.append(StageResult(
+                            name, 'failed', error=f"missing inputs {missing}"))
+                        continue
+                    if not force and self._is_up_to_date(stage, state):
+                        finished[name] = 'skipped'
+                        results.append(StageResult(name, 'skipped'))
+                        continue
+                    # Hash the inputs before the stage runs, so that changes
+                    # made while it runs are picked up next time.
+                    fingerprint = _fingerprint(stage)
+                    running[executor.submit(_run_stage, stage)] = (name, fingerprint)
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, fingerprint = running.pop(future)
+                    stage = self.stages[name]
+                    try:
+                        duration = future.result()
+                    except Exception as e:
+                        finished[name] = 'failed'
+                        results.append(StageResult(name, 'failed', error=repr(e)))
+                        state.pop(name, None)
+                        continue
+                    finished[name] = 'ran'
+                    results.append(StageResult(name, 'ran', duration))
+                    state[name] = {
+                        'inputs': fingerprint,
+                        'outputs': {path: hash_path(path) for path in stage.outputs},
+                        'duration_s': duration,
+                    }
+                self._save_state(state)
+
+        self._save_state(state)
+        return results
+
+
+def print_results(results: List[StageResult]):
+    width = max((len(result.name) for result in results), default=0)
+    for result in results:
+        line = f"{result.name:<{width}}  {result.status:<7}"
+        if result.status == 'ran':
+            line += f"  {result.duration_s:8.2f} s"
+        if result.error:
+            line += f"  {result.error}"
+        print(line)
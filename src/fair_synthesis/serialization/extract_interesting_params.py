@@ -1,8 +1,59 @@
 import os
 
+import polars as pl
+
 from fair_synthesis.generated_apis.procedure_data_structure import SynthesisProcedure, Role, AmountUnit, TempUnit, XMLType, Solvent
 from fair_synthesis.generated_apis.characterization_data_structure import Characterization
 from fair_synthesis.formatting.utils import load_json, save_json
+from fair_synthesis.serialization.mofsy2parquet import procedure_to_tables
+
+NONE_DEFAULT = "none"
+
+WATER_INCHI = "InChI=1S/H2O/h1H2"
+DIOXANE_INCHI = "InChI=1S/C4H8O2/c1-2-6-4-3-5-1/h1-4H2"
+
+# sum formula -> (name, pKa in DMSO)
+ACID_STRUCTURE_MAPPING = {
+    "C6H4N2O5": ("2,4-Dinitrophenol", 5.1),
+    "C7H6O2": ("Benzoic acid", 11.0),
+    "C6H5BrO": ("m-Bromophenol", 15),
+    "C7H5NO": ("p-Cyanophenol", 13.2),
+    "C5H10O2": ("Pivalic acid", 13),
+    "C6HF5O": ("Pentafluorophenol", 5.55),
+    "unknown": ("unknown", 31.4),
+    "C2HF3O2": ("Trifluoroacetic acid", 3.45),
+    "C7H4N2O6": ("Dinitrobenzoic acid", 7),
+    "C6H4ClNO3": ("4-Chloro-2-nitrophenol", 8),
+    "C6H5NO3": ("p-Nitrophenol", 10.8),
+    "C7H5NO4": ("p-Nitrobenzoic acid", 9.1),
+    "C2H4O2": ("Acetic acid", 12.6),
+    "3CHF3O3S.Sc": ("Scandium triflate", 20)
+}
+
+# InChI -> (solvent slot, name)
+SOLVENT_INCHI_MAP = {
+    DIOXANE_INCHI: (1, "1,4-dioxane"),
+    "InChI=1S/C6H5NO2/c8-7(9)6-4-2-1-3-5-6/h1-5H": (2, "nitrobenzene"),
+    "InChI=1S/C6H4Cl2/c7-5-3-1-2-4-6(5)8/h1-4H": (2, "o-dichlorobenzene"),
+    "InChI=1S/C9H12/c1-7-4-8(2)6-9(3)5-7/h4-6H,1-3H3": (2, "mesitylene"),
+    "InChI=1S/C6H4N2O4/c9-7(10)5-2-1-3-6(4-5)8(11)12/h1-4H": (3, "m-dinitrobenzene")
+}
+
+
+def _sum_formula(inchi: pl.Expr) -> pl.Expr:
+    """Sum formula layer of a standard InChI, other identifiers are kept as they are."""
+    return pl.when(inchi.str.starts_with("InChI=1S/")).then(
+        inchi.str.split("/").list.get(1, null_on_oob=True)).otherwise(inchi)
+
+
+def _first_per_experiment(
+        frame: pl.DataFrame,
+        condition: pl.Expr,
+        *columns: pl.Expr) -> pl.DataFrame:
+    """Columns of the first row per experiment that satisfies the condition."""
+    return frame.filter(condition).unique(
+        subset="experiment_id", keep="first", maintain_order=True).select(
+        pl.col("experiment_id"), *columns)
 
 
 def extract_interesting_params_for_mocof_1(
@@ -33,203 +84,187 @@ Duration (h): HeatChill _time
 Workup with NaCl (boolean): If there is WashSolid with _solvent = NaCl aq
 Activation with scCO2 (boolean): If there is WashSolid with _solvent = scCO2 or MeOH+scCO2
 MeOH in scCO2 activation (boolean): If the above condition is true and _solvent = MeOH+scCO2
-Activation under vacuum (boolean): If there is Dry"""
-    params_per_experiment = {}
+Activation under vacuum (boolean): If there is Dry
 
-    none_default = "none"
+    All reagents and steps are flattened into tables once (see mofsy2parquet), so every
+    parameter is derived with column expressions, joins and group-bys instead of
+    scanning the reagents and steps of each synthesis again."""
 
-    for synthesis in procedure.synthesis:
-        experiment_id = synthesis.metadata.description if synthesis.metadata.description else "unknown"
-        params = {}
+    tables = procedure_to_tables(procedure)
+    steps = tables["steps"]
+    prep_steps = steps.filter(pl.col("section") == "prep")
+    reaction_steps = steps.filter(pl.col("section") == "reaction")
+    workup_steps = steps.filter(pl.col("section") == "workup")
 
-        # Aminoporphyrin monomer
-        aminoporphyrin_reagent = next(
-            (r for r in synthesis.reagents.reagent if r.inchi and "Co" in r.inchi),
-            none_default)
-        if aminoporphyrin_reagent:
-            params['aminoporphyrin_monomer_type'] = aminoporphyrin_reagent.inchi.split(
-                '/')[1] if aminoporphyrin_reagent.inchi.startswith("InChI=1S/") else aminoporphyrin_reagent.inchi
-            add_step = next(
-                (step for step in synthesis.procedure.prep.step if step.reagent == aminoporphyrin_reagent.name),
-                None)
-            if add_step and add_step.amount and add_step.amount.unit == AmountUnit.MICROMOLE:
-                params['aminoporphyrin_monomer_amount_umol'] = add_step.amount.value
-            else:
-                params['aminoporphyrin_monomer_amount_umol'] = -1.0
-        else:
-            params['aminoporphyrin_monomer_type'] = "unknown"
-            params['aminoporphyrin_monomer_amount_umol'] = -1.0
+    # The amount of a reagent is taken from the first prep step adding it
+    prep_amounts = prep_steps.unique(
+        subset=["experiment_id", "reagent"], keep="first", maintain_order=True).select(
+        "experiment_id",
+        pl.col("reagent").alias("name"),
+        "amount_value",
+        "amount_unit")
+    reagents = tables["reagents"].with_columns(
+        pl.when(
+            (pl.col("role") == Role.SOLVENT.value) & (
+                pl.col("inchi") == "None") & (
+                pl.col("name") == "C4H8O2")).then(
+            pl.lit(DIOXANE_INCHI)).otherwise(
+            pl.col("inchi")).alias("inchi")).join(
+        prep_amounts, on=["experiment_id", "name"], how="left", maintain_order="left")
 
-        # Aldehyde monomer
-        aldehyde_reagent = next(
-            (r for r in synthesis.reagents.reagent if r.role == Role.SUBSTRATE and (
-                not r.inchi or "Co" not in r.inchi)), none_default)
-        if aldehyde_reagent:
-            params['aldehyde_monomer_structure'] = aldehyde_reagent.inchi.split(
-                '/')[1]
-            add_step = next(
-                (step for step in synthesis.procedure.prep.step if step.reagent == aldehyde_reagent.name),
-                None)
-            if add_step and add_step.amount and add_step.amount.unit == AmountUnit.MICROMOLE:
-                params['aldehyde_monomer_amount_umol'] = add_step.amount.value
-            else:
-                params['aldehyde_monomer_amount_umol'] = -1.0
-        else:
-            params['aldehyde_monomer_structure'] = "unknown"
-            params['aldehyde_monomer_amount_umol'] = -1.0
+    inchi = pl.col("inchi")
+    role = pl.col("role")
+    amount_umol = pl.when(
+        pl.col("amount_unit") == AmountUnit.MICROMOLE.value).then(
+        pl.col("amount_value")).otherwise(-1.0)
+    volume_ul = pl.when(
+        pl.col("amount_unit") == AmountUnit.MICROLITRE.value).then(
+        pl.col("amount_value"))
 
-        # Water amount
-        water_reagent = next(
-            (r for r in synthesis.reagents.reagent if r.inchi == "InChI=1S/H2O/h1H2"),
-            None)
-        if water_reagent:
-            add_step = next(
-                (step for step in synthesis.procedure.prep.step if step.reagent == water_reagent.name),
-                None)
-            if add_step and add_step.amount and add_step.amount.unit == AmountUnit.MICROMOLE:
-                params['water_amount_umol'] = add_step.amount.value
-            else:
-                params['water_amount_umol'] = -1.0
-        else:
-            params['water_amount_umol'] = 0.0
+    aminoporphyrin = _first_per_experiment(
+        reagents,
+        inchi.str.contains("Co", literal=True),
+        _sum_formula(inchi).alias("aminoporphyrin_monomer_type"),
+        amount_umol.alias("aminoporphyrin_monomer_amount_umol"))
+    aldehyde = _first_per_experiment(
+        reagents,
+        (role == Role.SUBSTRATE.value) & ~inchi.fill_null("").str.contains(
+            "Co", literal=True),
+        inchi.str.split("/").list.get(1, null_on_oob=True).alias(
+            "aldehyde_monomer_structure"),
+        amount_umol.alias("aldehyde_monomer_amount_umol"))
+    water = _first_per_experiment(
+        reagents,
+        inchi == WATER_INCHI,
+        amount_umol.alias("water_amount_umol"))
+    acid = _first_per_experiment(
+        reagents,
+        role == Role.ACID.value,
+        _sum_formula(inchi).alias("acid_structure"),
+        amount_umol.alias("acid_amount_umol"))
+    additive = _first_per_experiment(
+        reagents,
+        role.is_in([Role.CATALYST.value, Role.REAGENT.value]) & inchi.ne_missing(WATER_INCHI),
+        _sum_formula(inchi).alias("other_additives"))
 
-        # Acid
-        acid_structure_mapping = {
-            "C6H4N2O5": ("2,4-Dinitrophenol", 5.1),
-            "C7H6O2": ("Benzoic acid", 11.0),
-            "C6H5BrO": ("m-Bromophenol", 15),
-            "C7H5NO": ("p-Cyanophenol", 13.2),
-            "C5H10O2": ("Pivalic acid", 13),
-            "C6HF5O": ("Pentafluorophenol", 5.55),
-            "unknown": ("unknown", 31.4),
-            "C2HF3O2": ("Trifluoroacetic acid", 3.45),
-            "C7H4N2O6": ("Dinitrobenzoic acid", 7),
-            "C6H4ClNO3": ("4-Chloro-2-nitrophenol", 8),
-            "C6H5NO3": ("p-Nitrophenol", 10.8),
-            "C7H5NO4": ("p-Nitrobenzoic acid", 9.1),
-            "C2H4O2": ("Acetic acid", 12.6),
-            "3CHF3O3S.Sc": ("Scandium triflate", 20)
-        }
+    # Solvents with a known InChI have a fixed slot. If a slot is used by
+    # several solvents, the name of the last one is kept.
+    solvent_slots = pl.DataFrame(
+        [(k, slot, name) for k, (slot, name) in SOLVENT_INCHI_MAP.items()],
+        schema={"inchi": pl.String, "slot": pl.Int64, "slot_name": pl.String},
+        orient="row")
+    solvents = reagents.filter(role == Role.SOLVENT.value).join(
+        solvent_slots, on="inchi", how="left", maintain_order="left").with_columns(
+        volume_ul.alias("volume"))
+    known_solvents = solvents.filter(pl.col("slot").is_not_null()).group_by(
+        ["experiment_id", "slot"], maintain_order=True).agg(
+        pl.col("slot_name").last(),
+        pl.col("volume").drop_nulls().last()).group_by(
+        "experiment_id", maintain_order=True).agg(
+        pl.col("slot").alias("known_solvent_slots"),
+        pl.col("slot_name").alias("known_solvent_names"),
+        pl.col("volume").alias("known_solvent_volumes"))
+    # Free slots 1 and 2 are filled with the first solvent of unknown InChI
+    other_solvent = _first_per_experiment(
+        solvents,
+        pl.col("slot").is_null(),
+        pl.col("name").alias("other_solvent_name"),
+        pl.col("volume").alias("other_solvent_volume"))
 
-        def get_acid_name_and_pKa(acid_structure):
-            return acid_structure_mapping.get(
-                acid_structure, ("unknown", -100.0))
+    heat_chill = _first_per_experiment(
+        reaction_steps,
+        pl.col("xml_type") == XMLType.HEAT_CHILL.value,
+        pl.col("temp_value").alias("temperature_C"),
+        pl.col("temp_unit"),
+        pl.col("time_value").alias("duration_h"),
+        pl.col("time_unit"))
+    assert heat_chill.filter(
+        pl.col("temperature_C").is_not_null() & pl.col("temp_unit").ne_missing(
+            TempUnit.CELSIUS.value)).is_empty()
+    assert heat_chill.filter(
+        pl.col("duration_h").is_not_null() & pl.col("time_unit").ne_missing(
+            AmountUnit.HOUR.value)).is_empty()
 
-        acid_reagent = next(
-            (r for r in synthesis.reagents.reagent if r.role == Role.ACID),
-            none_default)
-        if acid_reagent:
-            acid_structure = acid_reagent.inchi.split(
-                '/')[1] if acid_reagent.inchi.startswith("InChI=1S/") else acid_reagent.inchi
-            acid_name, acid_pKa = get_acid_name_and_pKa(acid_structure)
-            params['acid_name'] = acid_name
-            params['acid_pKa_DMSO'] = acid_pKa
-            add_step = next(
-                (step for step in synthesis.procedure.prep.step if step.reagent == acid_reagent.name),
-                None)
-            if add_step and add_step.amount and add_step.amount.unit == AmountUnit.MICROMOLE:
-                params['acid_amount_umol'] = add_step.amount.value
-            else:
-                params['acid_amount_umol'] = -1.0
-        else:
-            params['acid_name'] = "unknown"
-            params['acid_pKa_DMSO'] = 31.4
-            params['acid_amount_umol'] = -1.0
+    wash_solid = pl.col("xml_type") == XMLType.WASH_SOLID.value
+    workup_flags = workup_steps.group_by("experiment_id").agg(
+        (wash_solid & (pl.col("solvent") == Solvent.NA_CL_AQ.value)).any().alias(
+            "workup_with_NaCl"),
+        (wash_solid & pl.col("solvent").is_in(
+            [Solvent.SC_CO2.value, Solvent.ME_OH_SC_CO2.value])).any().alias(
+            "activation_with_scCO2"),
+        (wash_solid & (pl.col("solvent") == Solvent.ME_OH_SC_CO2.value)).any().alias(
+            "MeOH_in_scCO2_activation"),
+        (pl.col("xml_type") == XMLType.DRY.value).any().alias(
+            "activation_under_vacuum"))
+    degassing = prep_steps.group_by("experiment_id").agg(
+        (pl.col("xml_type") == XMLType.EVACUATE_AND_REFILL.value).any().alias("degassing"))
 
-        # Other additives
-        catalyst_reagent = next(
-            (r for r in synthesis.reagents.reagent if (
-                r.role == Role.CATALYST or r.role == Role.REAGENT) and r.inchi != "InChI=1S/H2O/h1H2"),
-            None)
-        if catalyst_reagent:
-            params['other_additives'] = catalyst_reagent.inchi.split(
-                '/')[1] if catalyst_reagent.inchi.startswith("InChI=1S/") else catalyst_reagent.inchi
-        else:
-            params['other_additives'] = none_default
+    experiments = tables["syntheses"].select("experiment_id", "vessel")
+    for frame in [aminoporphyrin, aldehyde, water, acid, additive,
+                  known_solvents, other_solvent, heat_chill, workup_flags, degassing]:
+        experiments = experiments.join(
+            frame, on="experiment_id", how="left", maintain_order="left")
+    experiments = experiments.with_columns(
+        pl.col("aminoporphyrin_monomer_type").fill_null("unknown"),
+        pl.col("aminoporphyrin_monomer_amount_umol").fill_null(-1.0),
+        pl.col("aldehyde_monomer_structure").fill_null("unknown"),
+        pl.col("aldehyde_monomer_amount_umol").fill_null(-1.0),
+        pl.col("water_amount_umol").fill_null(0.0),
+        pl.col("acid_amount_umol").fill_null(-1.0),
+        pl.col("other_additives").fill_null(NONE_DEFAULT),
+        pl.col("degassing").fill_null(False),
+        pl.col("workup_with_NaCl").fill_null(False),
+        pl.col("activation_with_scCO2").fill_null(False),
+        pl.col("MeOH_in_scCO2_activation").fill_null(False),
+        pl.col("activation_under_vacuum").fill_null(False))
 
-        # Solvents
-        solvent_inchi_map = {
-            "InChI=1S/C4H8O2/c1-2-6-4-3-5-1/h1-4H2": (1, "1,4-dioxane"),
-            "InChI=1S/C6H5NO2/c8-7(9)6-4-2-1-3-5-6/h1-5H": (2, "nitrobenzene"),
-            "InChI=1S/C6H4Cl2/c7-5-3-1-2-4-6(5)8/h1-4H": (2, "o-dichlorobenzene"),
-            "InChI=1S/C9H12/c1-7-4-8(2)6-9(3)5-7/h4-6H,1-3H3": (2, "mesitylene"),
-            "InChI=1S/C6H4N2O4/c9-7(10)5-2-1-3-6(4-5)8(11)12/h1-4H": (3, "m-dinitrobenzene")
+    params_per_experiment = {}
+    for row in experiments.iter_rows(named=True):
+        experiment_id = row["experiment_id"] if row["experiment_id"] else "unknown"
+        params = {
+            'aminoporphyrin_monomer_type': row['aminoporphyrin_monomer_type'],
+            'aminoporphyrin_monomer_amount_umol': row['aminoporphyrin_monomer_amount_umol'],
+            'aldehyde_monomer_structure': row['aldehyde_monomer_structure'],
+            'aldehyde_monomer_amount_umol': row['aldehyde_monomer_amount_umol'],
+            'water_amount_umol': row['water_amount_umol'],
         }
-        solvent_reagents = [
-            r for r in synthesis.reagents.reagent if r.role == Role.SOLVENT]
-        solvent_others = []
-        for idx, solvent_reagent in enumerate(solvent_reagents):
-            if solvent_reagent.inchi == "None" and solvent_reagent.name == "C4H8O2":
-                solvent_reagent.inchi = "InChI=1S/C4H8O2/c1-2-6-4-3-5-1/h1-4H2"
-            if solvent_reagent.inchi in solvent_inchi_map:
-                solvent_number, solvent_name = solvent_inchi_map[solvent_reagent.inchi]
-                params[f'solvent_{solvent_number}_name'] = solvent_name
-                add_step = next(
-                    (step for step in synthesis.procedure.prep.step if step.reagent == solvent_reagent.name),
-                    none_default)
-                if add_step and add_step.amount and add_step.amount.unit == AmountUnit.MICROLITRE:
-                    params[f'solvent_{solvent_number}_volume_uL'] = add_step.amount.value
-            else:
-                solvent_others.append(solvent_reagent.name)
-
-        for solvent_other in solvent_others:
-            for solvent_number in range(1, 3):
-                if f'solvent_{solvent_number}_name' not in params:
-                    params[f'solvent_{solvent_number}_name'] = solvent_other
-                    add_step = next(
-                        (step for step in synthesis.procedure.prep.step if step.reagent == solvent_other),
-                        none_default)
-                    if add_step and add_step.amount and add_step.amount.unit == AmountUnit.MICROLITRE:
-                        params[f'solvent_{solvent_number}_volume_uL'] = add_step.amount.value
-
-        # if solvent slots 1-3 are missing, fill them with "None" and 0.0
-        for solvent_number in range(1, 4):
-            if f'solvent_{solvent_number}_name' not in params:
-                params[f'solvent_{solvent_number}_name'] = none_default
-                params[f'solvent_{solvent_number}_volume_uL'] = 0.0
-
-        # Vessel
-        if synthesis.hardware and synthesis.hardware.component:
-            vessel_component = next(
-                (comp for comp in synthesis.hardware.component if comp.type),
-                none_default)
-            if vessel_component:
-                params['vessel'] = vessel_component.type
-
-        # Degassing
-        params['degassing'] = any(
-            step for step in synthesis.procedure.prep.step if step.xml_type == XMLType.EVACUATE_AND_REFILL)
-
-        # Temperature and Duration
-        heat_chill_step = next(
-            (step for step in synthesis.procedure.reaction.step if step.xml_type == XMLType.HEAT_CHILL),
-            none_default)
-        if heat_chill_step:
-            if heat_chill_step.temp:
-                params['temperature_C'] = heat_chill_step.temp.value
-                assert heat_chill_step.temp.unit == TempUnit.CELSIUS
-            if heat_chill_step.time:
-                params['duration_h'] = heat_chill_step.time.value
-                assert heat_chill_step.time.unit == AmountUnit.HOUR
-
-        # Workup with NaCl
-        params['workup_with_NaCl'] = any(
-            step for step in synthesis.procedure.workup.step if step.xml_type == XMLType.WASH_SOLID and step.solvent == Solvent.NA_CL_AQ)
-
-        # Activation with scCO2
-        scCO2_activation = any(
-            step for step in synthesis.procedure.workup.step if step.xml_type == XMLType.WASH_SOLID and (
-                step.solvent == Solvent.SC_CO2 or step.solvent == Solvent.ME_OH_SC_CO2))
-        params['activation_with_scCO2'] = scCO2_activation
-        if scCO2_activation:
-            params['MeOH_in_scCO2_activation'] = any(
-                step for step in synthesis.procedure.workup.step if step.xml_type == XMLType.WASH_SOLID and step.solvent == Solvent.ME_OH_SC_CO2)
+        if row['acid_structure'] is not None:
+            params['acid_name'], params['acid_pKa_DMSO'] = ACID_STRUCTURE_MAPPING.get(
+                row['acid_structure'], ("unknown", -100.0))
         else:
-            params['MeOH_in_scCO2_activation'] = False
+            params['acid_name'], params['acid_pKa_DMSO'] = ACID_STRUCTURE_MAPPING["unknown"]
+        params['acid_amount_umol'] = row['acid_amount_umol']
+        params['other_additives'] = row['other_additives']
+
+        # Solvent keys are emitted in the order the slots get assigned
+        for slot, name, volume in zip(row['known_solvent_slots'] or [],
+                                      row['known_solvent_names'] or [],
+                                      row['known_solvent_volumes'] or []):
+            params[f'solvent_{slot}_name'] = name
+            if volume is not None:
+                params[f'solvent_{slot}_volume_uL'] = volume
+        if row['other_solvent_name'] is not None:
+            for slot in range(1, 3):
+                if f'solvent_{slot}_name' not in params:
+                    params[f'solvent_{slot}_name'] = row['other_solvent_name']
+                    if row['other_solvent_volume'] is not None:
+                        params[f'solvent_{slot}_volume_uL'] = row['other_solvent_volume']
+        for slot in range(1, 4):
+            if f'solvent_{slot}_name' not in params:
+                params[f'solvent_{slot}_name'] = NONE_DEFAULT
+                params[f'solvent_{slot}_volume_uL'] = 0.0
 
-        # Activation under vacuum
-        params['activation_under_vacuum'] = any(
-            step for step in synthesis.procedure.workup.step if step.xml_type == XMLType.DRY)
+        if row['vessel'] is not None:
+            params['vessel'] = row['vessel']
+        params['degassing'] = row['degassing']
+        if row['temperature_C'] is not None:
+            params['temperature_C'] = row['temperature_C']
+        if row['duration_h'] is not None:
+            params['duration_h'] = row['duration_h']
+        params['workup_with_NaCl'] = row['workup_with_NaCl']
+        params['activation_with_scCO2'] = row['activation_with_scCO2']
+        params['MeOH_in_scCO2_activation'] = row['MeOH_in_scCO2_activation']
+        params['activation_under_vacuum'] = row['activation_under_vacuum']
 
         params_per_experiment[experiment_id] = params
 
@@ -0,0 +1,267 @@
+"""
+Export of MOFSY procedures and characterizations to normalized Parquet tables.
+
+The tables syntheses, reagents, steps (procedure) and pxrd, weights
+(characterization) have one row per entry, keyed by experiment_id, with the
+layouts of TABLE_SCHEMAS. load_table reads only the requested columns, so
+analyses do not need to load and flatten the MOFSY JSON files.
+
+Usage:
+    weights = load_table("data/MOCOF-1/converted/parquet", "weights",
+                         columns=["experiment_id", "position", "value", "unit"])
+"""
+
+import os
+from typing import Dict, List
+
+import polars as pl
+
+from fair_synthesis.formatting.utils import load_json
+from fair_synthesis.generated_apis.procedure_data_structure import SynthesisProcedure, ProcedureSectionClass, \
+    ProcedureSectionsClass, StepEntryClass
+from fair_synthesis.generated_apis.characterization_data_structure import Characterization
+
+# Normalized table layouts. Every table is keyed by experiment_id; "position"
+# keeps the order of the entries within an experiment.
+SYNTHESES_SCHEMA = {
+    "experiment_id": pl.String,
+    "position": pl.Int32,
+    "product": pl.String,
+    "product_inchi": pl.String,
+    "vessel": pl.String,
+}
+
+REAGENTS_SCHEMA = {
+    "experiment_id": pl.String,
+    "position": pl.Int32,
+    "id": pl.String,
+    "name": pl.String,
+    "role": pl.String,
+    "inchi": pl.String,
+    "cas": pl.String,
+    "purity": pl.String,
+    "comment": pl.String,
+}
+
+STEPS_SCHEMA = {
+    "experiment_id": pl.String,
+    "section": pl.String,
+    "position": pl.Int32,
+    "xml_type": pl.String,
+    "vessel": pl.String,
+    "reagent": pl.String,
+    "amount_value": pl.Float64,
+    "amount_unit": pl.String,
+    "temp_value": pl.Float64,
+    "temp_unit": pl.String,
+    "time_value": pl.Float64,
+    "time_unit": pl.String,
+    "gas": pl.String,
+    "solvent": pl.String,
+    "pressure_value": pl.Float64,
+    "pressure_unit": pl.String,
+    "comment": pl.String,
+}
+
+PXRD_SCHEMA = {
+    "experiment_id": pl.String,
+    "position": pl.Int32,
+    "relative_file_path": pl.String,
+    "x_ray_source": pl.String,
+    "sample_holder_type": pl.String,
+    "sample_holder_diameter_value": pl.Float64,
+    "sample_holder_diameter_unit": pl.String,
+    "other_metadata": pl.String,
+}
+
+WEIGHTS_SCHEMA = {
+    "experiment_id": pl.String,
+    "position": pl.Int32,
+    "value": pl.Float64,
+    "unit": pl.String,
+}
+
+TABLE_SCHEMAS = {
+    "syntheses": SYNTHESES_SCHEMA,
+    "reagents": REAGENTS_SCHEMA,
+    "steps": STEPS_SCHEMA,
+    "pxrd": PXRD_SCHEMA,
+    "weights": WEIGHTS_SCHEMA,
+}
+
+PROCEDURE_SECTIONS = ("prep", "reaction", "workup")
+
+
+def _enum_value(x):
+    return x.value if x is not None else None
+
+
+def procedure_to_tables(
+        procedure: SynthesisProcedure) -> Dict[str, pl.DataFrame]:
+    """
+    Flatten a MOFSY procedure into the normalized syntheses, reagents and steps tables.
+    """
+    syntheses: List[dict] = []
+    reagents: List[dict] = []
+    steps: List[dict] = []
+
+    for synthesis_position, synthesis in enumerate(procedure.synthesis):
+        experiment_id = synthesis.metadata.description
+
+        vessel = None
+        if synthesis.hardware and synthesis.hardware.component:
+            vessel = next(
+                (comp.type for comp in synthesis.hardware.component if comp.type), None)
+        syntheses.append({
+            "experiment_id": experiment_id,
+            "position": synthesis_position,
+            "product": synthesis.metadata.product,
+            "product_inchi": synthesis.metadata.product_inchi,
+            "vessel": vessel,
+        })
+
+        for position, reagent in enumerate(synthesis.reagents.reagent):
+            reagents.append({
+                "experiment_id": experiment_id,
+                "position": position,
+                "id": reagent.id,
+                "name": reagent.name,
+                "role": _enum_value(reagent.role),
+                "inchi": reagent.inchi,
+                "cas": reagent.cas,
+                "purity": reagent.purity,
+                "comment": reagent.comment,
+            })
+
+        if not isinstance(synthesis.procedure, ProcedureSectionsClass):
+            continue
+        for section_name in PROCEDURE_SECTIONS:
+            section = getattr(synthesis.procedure, section_name)
+            if not isinstance(section, ProcedureSectionClass):
+                continue
+            for position, step in enumerate(section.step):
+                if not isinstance(step, StepEntryClass):
+                    continue
+                steps.append({
+                    "experiment_id": experiment_id,
+                    "section": section_name,
+                    "position": position,
+                    "xml_type": step.xml_type.value,
+                    "vessel": step.vessel,
+                    "reagent": step.reagent,
+                    "amount_value": step.amount.value if step.amount else None,
+                    "amount_unit": _enum_value(step.amount.unit) if step.amount else None,
+                    "temp_value": step.temp.value if step.temp else None,
+                    "temp_unit": _enum_value(step.temp.unit) if step.temp else None,
+                    "time_value": step.time.value if step.time else None,
+                    "time_unit": _enum_value(step.time.unit) if step.time else None,
+                    "gas": _enum_value(step.gas),
+                    "solvent": _enum_value(step.solvent),
+                    "pressure_value": step.pressure.value if step.pressure else None,
+                    "pressure_unit": _enum_value(step.pressure.unit) if step.pressure else None,
+                    "comment": step.comment,
+                })
+
+    return {
+        "syntheses": pl.DataFrame(syntheses, schema=SYNTHESES_SCHEMA, orient="row"),
+        "reagents": pl.DataFrame(reagents, schema=REAGENTS_SCHEMA, orient="row"),
+        "steps": pl.DataFrame(steps, schema=STEPS_SCHEMA, orient="row"),
+    }
+
+
+def characterization_to_tables(
+        characterization: Characterization) -> Dict[str, pl.DataFrame]:
+    """
+    Flatten a MOFSY characterization into the normalized pxrd and weights tables.
+    """
+    pxrd: List[dict] = []
+    weights: List[dict] = []
+
+    for entry in characterization.product_characterization:
+        experiment_id = entry.experiment_id
+        for position, pattern in enumerate(entry.characterization.pxrd):
+            pxrd.append({
+                "experiment_id": experiment_id,
+                "position": position,
+                "relative_file_path": pattern.relative_file_path,
+                "x_ray_source": pattern.x_ray_source.value,
+                "sample_holder_type": pattern.sample_holder.type.value,
+                "sample_holder_diameter_value": pattern.sample_holder.diameter.value,
+                "sample_holder_diameter_unit": pattern.sample_holder.diameter.unit.value,
+                "other_metadata": pattern.other_metadata,
+            })
+        for position, weighing in enumerate(entry.characterization.weight):
+            weights.append({
+                "experiment_id": experiment_id,
+                "position": position,
+                "value": weighing.weight.value,
+                "unit": weighing.weight.unit.value,
+            })
+
+    return {
+        "pxrd": pl.DataFrame(pxrd, schema=PXRD_SCHEMA, orient="row"),
+        "weights": pl.DataFrame(weights, schema=WEIGHTS_SCHEMA, orient="row"),
+    }
+
+
+def write_tables(tables: Dict[str, pl.DataFrame], output_dir: str):
+    os.makedirs(output_dir, exist_ok=True)
+    for name, table in tables.items():
+        table.write_parquet(os.path.join(output_dir, f"{name}.parquet"))
+
+
+def load_table(
+        table_dir: str,
+        table: str,
+        columns: List[str] | None = None) -> pl.DataFrame:
+    """
+    Load one of the exported tables. Only the requested columns are read from disk.
+
+    Args:
+        table_dir (str): Directory the tables were exported to.
+        table (str): One of "syntheses", "reagents", "steps", "pxrd", "weights".
+        columns (list): Columns to read. If None, all columns are read.
+    """
+    if table not in TABLE_SCHEMAS:
+        raise ValueError(
+            f"Unknown table {table}, expected one of {list(TABLE_SCHEMAS)}")
+    lazy_frame = pl.scan_parquet(os.path.join(table_dir, f"{table}.parquet"))
+    if columns is not None:
+        lazy_frame = lazy_frame.select(columns)
+    return lazy_frame.collect()
+
+
+def convert_mofsy_to_parquet(
+        procedure_file_path: str,
+        characterization_file_path: str,
+        output_dir: str):
+    procedure = SynthesisProcedure.from_dict(load_json(procedure_file_path))
+    characterization = Characterization.from_dict(
+        load_json(characterization_file_path))
+    tables = procedure_to_tables(procedure)
+    tables.update(characterization_to_tables(characterization))
+    write_tables(tables, output_dir)
+
+
+def mofsy2parquet():
+    current_file_dir = __file__.rsplit('/', 1)[0]
+
+    # MOCOF-1 case
+    converted_dir = os.path.join(
+        current_file_dir, '../../..', 'data', 'MOCOF-1', 'converted')
+    convert_mofsy_to_parquet(
+        os.path.join(converted_dir, 'procedure_from_sciformation.json'),
+        os.path.join(converted_dir, 'characterization_from_sciformation.json'),
+        os.path.join(converted_dir, 'parquet'))
+
+    # Fe–terephthalate case
+    converted_dir = os.path.join(
+        current_file_dir, '../../..', 'data', 'Fe–terephthalate', 'converted')
+    convert_mofsy_to_parquet(
+        os.path.join(converted_dir, 'procedure_from_Fe–terephthalate.json'),
+        os.path.join(converted_dir, 'characterization_from_Fe–terephthalate.json'),
+        os.path.join(converted_dir, 'parquet'))
+
+
+if __name__ == '__main__':
+    mofsy2parquet()
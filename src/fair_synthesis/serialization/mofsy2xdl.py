@@ -1,8 +1,21 @@
+import argparse
+import hashlib
+import io
+import itertools
+import json
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, Iterable
 
-from fair_synthesis.formatting.utils import load_json, save_string_as_file
-from fair_synthesis.generated_apis.procedure_data_structure import SynthesisProcedure
+from fair_synthesis.code_hash import hash_code, hash_path
+from fair_synthesis.formatting.mofsy_lazy_loader import LazyProcedure
+from fair_synthesis.formatting.utils import load_json, save_json
+from fair_synthesis.generated_apis.procedure_data_structure import SynthesisProcedure, SynthesisElement, \
+    ComponentElement, Hardware, Metadata, ProcedureSectionsClass, ProcedureSectionClass, StepEntryClass, \
+    ReagentElement, Reagents
 from lxml import etree
+from operator import attrgetter
 from string import Template
 
 
@@ -10,127 +23,358 @@ def convert_mofsy_procedure_to_xdl_string(mofsy: SynthesisProcedure) -> str:
     """
     Convert Mofsy procedure to XDL format, which is in XML.
     """
-    # Convert the Mofsy to a dictionary
-    xdl_dict = mofsy.to_dict()
+    root = etree.Element("XDL")
+    for synthesis in mofsy.synthesis:
+        build_synthesis_element(root, synthesis)
+    return etree.tostring(root, pretty_print=True, encoding="unicode")
 
-    # Convert the dictionary to XML
-    xdl_xml = dict_to_xml("XDL", xdl_dict)
 
-    return xdl_xml
+def _build_element(parent, key, value):
+    """Append the XML element for one dict entry of a MOFSY procedure to parent."""
+    # Determine tag name
+    tag = value.get('$xml_type') if isinstance(
+        value, dict) and '$xml_type' in value else key
 
+    if isinstance(value, dict):
+        # Build attributes including support for $xml_append inside _/@
+        # fields
+        attribs = {}
+        for k, v in value.items():
+            if k.startswith('@') or k.startswith('_'):
+                attr_name = k.lstrip('@_')
+                if isinstance(v, dict) and '$xml_append' in v:
+                    template = Template(v['$xml_append'])
+                    rendered = template.safe_substitute(v)
+                    attribs[attr_name] = str(rendered)
+                else:
+                    attribs[attr_name] = str(v)
 
-def dict_to_xml(root_tag, data):
-    """Convert a dict to XML with support for $xml_type, @attr, _attr, $xml_append, text/cdata/comments."""
+        text = value.get('#text')
+        cdata = value.get('#cdata')
+        comment = value.get('#comment')
 
-    def build_element(parent, key, value):
-        # Determine tag name
-        tag = value.get('$xml_type') if isinstance(
-            value, dict) and '$xml_type' in value else key
-
-        if isinstance(value, dict):
-            # Build attributes including support for $xml_append inside _/@
-            # fields
-            attribs = {}
-            for k, v in value.items():
-                if k.startswith('@') or k.startswith('_'):
-                    attr_name = k.lstrip('@_')
-                    if isinstance(v, dict) and '$xml_append' in v:
-                        template = Template(v['$xml_append'])
-                        rendered = template.safe_substitute(v)
-                        attribs[attr_name] = str(rendered)
-                    else:
-                        attribs[attr_name] = str(v)
-
-            text = value.get('#text')
-            cdata = value.get('#cdata')
-            comment = value.get('#comment')
-
-            elem = etree.SubElement(parent, tag, attrib=attribs)
-
-            if comment:
-                elem.append(etree.Comment(comment))
-            if cdata:
-                elem.text = etree.CDATA(cdata)
-            elif text:
-                elem.text = text.strip() if isinstance(text, str) else str(text)
-
-            # Recursively handle children
-            for subkey, subval in value.items():
-                if subkey in {
-                    '$xml_type',
-                    '$xml_append',
-                    '#text',
-                    '#cdata',
-                        '#comment'}:
-                    continue
-                if subkey.startswith('@') or subkey.startswith('_'):
-                    continue  # already handled as attribute
-                if isinstance(subval, list):
-                    for item in subval:
-                        build_element(elem, subkey, item)
-                else:
-                    build_element(elem, subkey, subval)
+        elem = etree.SubElement(parent, tag, attrib=attribs)
 
-        elif isinstance(value, list):
-            for item in value:
-                build_element(parent, key, item)
+        if comment:
+            elem.append(etree.Comment(comment))
+        if cdata:
+            elem.text = etree.CDATA(cdata)
+        elif text:
+            elem.text = text.strip() if isinstance(text, str) else str(text)
 
-        else:
-            elem = etree.SubElement(parent, tag)
-            elem.text = str(value)
+        # Recursively handle children
+        for subkey, subval in value.items():
+            if subkey in {
+                '$xml_type',
+                '$xml_append',
+                '#text',
+                '#cdata',
+                    '#comment'}:
+                continue
+            if subkey.startswith('@') or subkey.startswith('_'):
+                continue  # already handled as attribute
+            if isinstance(subval, list):
+                for item in subval:
+                    _build_element(elem, subkey, item)
+            else:
+                _build_element(elem, subkey, subval)
+
+    elif isinstance(value, list):
+        for item in value:
+            _build_element(parent, key, item)
+
+    else:
+        elem = etree.SubElement(parent, tag)
+        elem.text = str(value)
 
-    # Build root
+
+def dict_to_xml(root_tag, data):
+    """Convert a dict to XML with support for $xml_type, @attr, _attr, $xml_append, text/cdata/comments."""
     root = etree.Element(root_tag)
     for key, val in data.items():
-        build_element(root, key, val)
+        _build_element(root, key, val)
     return etree.tostring(root, pretty_print=True, encoding="unicode")
 
 
-def mofsy2xdl():
+def _quantity_to_attribute(quantity) -> str:
+    # Same as rendering "${Value} ${Unit}" of the dict, including the
+    # unsubstituted placeholder if there is no unit.
+    if quantity.unit is None:
+        return f"{quantity.value} ${{Unit}}"
+    return f"{quantity.value} {quantity.unit.value}"
+
+
+def _enum_to_attribute(value) -> str:
+    return str(value.value)
+
+
+# XDL layout of the MOFSY classes, in the order of the keys of their to_dict().
+# attributes: (attribute name, field, formatter)
+# children: (tag, field, required). Required children are emitted even if None.
+_XDL_LAYOUTS = {
+    SynthesisElement: {
+        'children': (('Hardware', 'hardware', False), ('Metadata', 'metadata', True),
+                     ('Procedure', 'procedure', True), ('Reagents', 'reagents', True)),
+    },
+    Hardware: {
+        'children': (('Component', 'component', False),),
+    },
+    ComponentElement: {
+        'attributes': (('chemical', 'chemical', str), ('comment', 'comment', str),
+                       ('id', 'id', str), ('type', 'type', str)),
+    },
+    Metadata: {
+        'attributes': (('description', 'description', str), ('product', 'product', str),
+                       ('product_inchi', 'product_inchi', str)),
+    },
+    ProcedureSectionsClass: {
+        'children': (('Prep', 'prep', False), ('Reaction', 'reaction', True),
+                     ('Workup', 'workup', False)),
+    },
+    ProcedureSectionClass: {
+        'children': (('Step', 'step', True),),
+    },
+    StepEntryClass: {
+        'tag': 'xml_type',
+        'attributes': (('comment', 'comment', str), ('vessel', 'vessel', str),
+                       ('amount', 'amount', _quantity_to_attribute),
+                       ('reagent', 'reagent', str),
+                       ('temp', 'temp', _quantity_to_attribute),
+                       ('time', 'time', _quantity_to_attribute),
+                       ('gas', 'gas', _enum_to_attribute),
+                       ('solvent', 'solvent', _enum_to_attribute),
+                       ('pressure', 'pressure', _quantity_to_attribute)),
+    },
+    ReagentElement: {
+        'attributes': (('cas', 'cas', str), ('comment', 'comment', str), ('id', 'id', str),
+                       ('inchi', 'inchi', str), ('name', 'name', str),
+                       ('purity', 'purity', str), ('role', 'role', _enum_to_attribute)),
+    },
+    Reagents: {
+        'children': (('Reagent', 'reagent', True),),
+    },
+}
+
+
+def _compile_emitter(layout: dict):
+    """
+    Compile the layout of a class into a function that appends its XDL element to a parent.
+    The result is the same as dict_to_xml on the output of to_dict, without building the dict.
+    """
+    tag_getter = attrgetter(layout['tag']) if 'tag' in layout else None
+    attributes = tuple((name, attrgetter(field), formatter)
+                       for name, field, formatter in layout.get('attributes', ()))
+    children = tuple((tag, attrgetter(field), required)
+                     for tag, field, required in layout.get('children', ()))
+
+    def emit(parent, key, obj):
+        tag = tag_getter(obj).value if tag_getter is not None else key
+        attrib = {}
+        for name, getter, formatter in attributes:
+            value = getter(obj)
+            if value is not None:
+                attrib[name] = formatter(value)
+        elem = etree.SubElement(parent, tag, attrib)
+        for child_tag, getter, required in children:
+            value = getter(obj)
+            if value is None and not required:
+                continue
+            if isinstance(value, list):
+                for item in value:
+                    _emit(elem, child_tag, item)
+            else:
+                _emit(elem, child_tag, value)
+
+    return emit
+
+
+_EMITTERS = {cls: _compile_emitter(layout) for cls, layout in _XDL_LAYOUTS.items()}
+
+
+def _emit(parent, key, value):
+    emitter = _EMITTERS.get(type(value))
+    if emitter is not None:
+        emitter(parent, key, value)
+    else:
+        # Plain JSON values, e.g. a procedure given as string or None
+        _build_element(parent, key, value)
+
+
+def build_synthesis_element(parent, synthesis: SynthesisElement):
+    """Append the <Synthesis> element of a typed MOFSY synthesis to parent."""
+    _EMITTERS[SynthesisElement](parent, 'Synthesis', synthesis)
+
+
+def write_xdl(syntheses: Iterable[SynthesisElement], file: BinaryIO):
+    """
+    Write the XDL of a MOFSY procedure to a binary file handle, one Synthesis at a time.
+
+    Only the element of the current synthesis is kept in memory. The output is
+    byte-identical to the UTF-8 encoded result of convert_mofsy_procedure_to_xdl_string.
+    """
+    syntheses = iter(syntheses)
+    first = next(syntheses, None)
+    if first is None:
+        file.write(b'<XDL/>\n')
+        return
+    with etree.xmlfile(file, encoding='utf-8') as xf:
+        with xf.element('XDL'):
+            for synthesis in itertools.chain([first], syntheses):
+                container = etree.Element('XDL')
+                build_synthesis_element(container, synthesis)
+                elem = container[0]
+                # Same whitespace as pretty_print for an element one level below the root
+                etree.indent(elem, level=1)
+                elem.tail = None
+                xf.write('\n  ')
+                xf.write(elem)
+            xf.write('\n')
+    file.write(b'\n')
+
+
+def convert_mofsy_file_to_xdl(mofsy_file_path: str, xdl_file_path: str):
+    """
+    Convert a MOFSY procedure file to XDL, streaming both sides: the syntheses
+    are read from the JSON file and written to the XDL file one at a time.
+    """
+    with open(xdl_file_path, 'wb') as f:
+        write_xdl(LazyProcedure(mofsy_file_path).stream(), f)
+
+
+XDL_SHARD_INDEX_FILE_NAME = 'index.json'
+
+
+def _synthesis_hash(entry: dict) -> str:
+    return hashlib.sha256(json.dumps(
+        entry, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def _shard_file_name(experiment_id: str) -> str:
+    """
+    File name of the shard of an experiment. IDs with characters other than
+    letters, digits, '.', '_' and '-' get a suffix from the hash of the full ID,
+    so that e.g. "KE 1" and "KE_1" do not share a file.
+    """
+    name = re.sub(r'[^A-Za-z0-9._-]', '_', experiment_id)
+    if name != experiment_id:
+        name += '-' + hashlib.sha256(experiment_id.encode('utf-8')).hexdigest()[:8]
+    return name + '.xml'
+
+
+def _write_xdl_shard(entry: dict, file_path: str) -> str:
+    """Write the XDL of one synthesis and return the sha256 of the file."""
+    buffer = io.BytesIO()
+    write_xdl([SynthesisElement.from_dict(entry)], buffer)
+    with open(file_path, 'wb') as f:
+        f.write(buffer.getvalue())
+    return hashlib.sha256(buffer.getvalue()).hexdigest()
+
+
+def convert_mofsy_file_to_xdl_shards(
+        mofsy_file_path: str,
+        output_dir: str,
+        max_workers: int | None = None,
+        force: bool = False) -> Dict[str, str]:
+    """
+    Write one XDL file per experiment to output_dir, converting the syntheses in a process pool.
+
+    output_dir/index.json maps each experiment ID to its file (relative to output_dir),
+    the sha256 of its source synthesis and the sha256 of the written file, and stores
+    a hash of the conversion code (this module and the fair_synthesis modules it
+    imports). A shard is regenerated if its synthesis changed or its file is missing
+    or was modified; all shards are regenerated if the conversion code changed.
+    Shards of removed experiments are deleted. Use force to regenerate all shards.
+
+    Raises:
+        ValueError: If an experiment ID occurs twice, or two IDs map to the same file
+            name (compared case-insensitively, as on macOS and Windows).
+
+    Returns:
+        Dict[str, str]: Experiment ID -> path of the XDL file.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    index_file_path = os.path.join(output_dir, XDL_SHARD_INDEX_FILE_NAME)
+    old_index = load_json(index_file_path) if os.path.exists(index_file_path) else {}
+    code_sha256 = hash_code('fair_synthesis.serialization.mofsy2xdl', __file__)
+    old_shards = old_index.get('shards', {}) if old_index.get('code_sha256') == code_sha256 else {}
+
+    shards = {}
+    experiment_ids_by_file = {}
+    outdated = []
+    for entry in LazyProcedure(mofsy_file_path).stream_dicts():
+        experiment_id = entry['Metadata']['_description']
+        if experiment_id in shards:
+            raise ValueError(f"Duplicate experiment ID {experiment_id} in {mofsy_file_path}")
+        shard = {
+            'path': _shard_file_name(experiment_id),
+            'sha256': _synthesis_hash(entry),
+        }
+        other_id = experiment_ids_by_file.setdefault(shard['path'].casefold(), experiment_id)
+        if other_id != experiment_id:
+            raise ValueError(
+                f"Experiment IDs {other_id} and {experiment_id} in {mofsy_file_path} "
+                f"map to the same XDL file {shard['path']}")
+        file_path = os.path.join(output_dir, shard['path'])
+        old_shard = old_shards.get(experiment_id, {})
+        if not force and {key: old_shard.get(key) for key in shard} == shard and \
+                hash_path(file_path) == old_shard.get('xdl_sha256'):
+            shard['xdl_sha256'] = old_shard['xdl_sha256']
+        else:
+            outdated.append((experiment_id, entry, file_path))
+        shards[experiment_id] = shard
+
+    if outdated:
+        experiment_ids, entries, file_paths = zip(*outdated)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            xdl_hashes = executor.map(_write_xdl_shard, entries, file_paths,
+                                      chunksize=max(1, len(outdated) // 64))
+            for experiment_id, xdl_sha256 in zip(experiment_ids, xdl_hashes):
+                shards[experiment_id]['xdl_sha256'] = xdl_sha256
+
+    current_paths = {shard['path'] for shard in shards.values()}
+    for shard in old_index.get('shards', {}).values():
+        if shard['path'] not in current_paths:
+            stale_file_path = os.path.join(output_dir, shard['path'])
+            if os.path.exists(stale_file_path):
+                os.remove(stale_file_path)
+
+    save_json({'code_sha256': code_sha256, 'shards': shards}, index_file_path)
+    return {experiment_id: os.path.join(output_dir, shard['path'])
+            for experiment_id, shard in shards.items()}
+
+
+def mofsy2xdl(sharded: bool = False):
+    """
+    Convert the MOFSY procedures to XDL. If sharded, one file per experiment is written
+    to converted/xdl/ instead of a single XDL file per dataset.
+    """
     current_file_dir = __file__.rsplit('/', 1)[0]
 
     # MOCOF-1 case
-    mofsy_file_path = os.path.join(
-        current_file_dir,
-        '../../..',
-        'data',
-        'MOCOF-1',
-        'converted',
-        'procedure_from_sciformation.json')
-    xml = convert_mofsy_procedure_to_xdl_string(
-        SynthesisProcedure.from_dict(load_json(mofsy_file_path)))
-    # print("XML Result: " + xml)
-    save_string_as_file(
-        xml,
-        os.path.join(
-            current_file_dir,
-            '../../..',
-            'data',
-            'MOCOF-1',
-            'converted',
-            'xdl_from_sciformation.xml'))
+    converted_dir = os.path.join(
+        current_file_dir, '../../..', 'data', 'MOCOF-1', 'converted')
+    mofsy_file_path = os.path.join(converted_dir, 'procedure_from_sciformation.json')
+    if sharded:
+        convert_mofsy_file_to_xdl_shards(
+            mofsy_file_path, os.path.join(converted_dir, 'xdl'))
+    else:
+        convert_mofsy_file_to_xdl(
+            mofsy_file_path, os.path.join(converted_dir, 'xdl_from_sciformation.xml'))
 
     # Fe–terephthalate case
-    mil_2_file_path = os.path.join(
-        current_file_dir,
-        '../../..',
-        'data',
-        'Fe–terephthalate',
-        'converted',
-        'procedure_from_Fe–terephthalate.json')
-    xml = convert_mofsy_procedure_to_xdl_string(
-        SynthesisProcedure.from_dict(load_json(mil_2_file_path)))
-    # print("XML Result: " + xml)
-    save_string_as_file(
-        xml,
-        os.path.join(
-            current_file_dir,
-            '../../..',
-            'data',
-            'Fe–terephthalate',
-            'converted',
-            'xdl_from_Fe–terephthalate.xml'))
+    converted_dir = os.path.join(
+        current_file_dir, '../../..', 'data', 'Fe–terephthalate', 'converted')
+    mofsy_file_path = os.path.join(converted_dir, 'procedure_from_Fe–terephthalate.json')
+    if sharded:
+        convert_mofsy_file_to_xdl_shards(
+            mofsy_file_path, os.path.join(converted_dir, 'xdl'))
+    else:
+        convert_mofsy_file_to_xdl(
+            mofsy_file_path, os.path.join(converted_dir, 'xdl_from_Fe–terephthalate.xml'))
 
 
 if __name__ == '__main__':
-    mofsy2xdl()
+    parser = argparse.ArgumentParser(description="Convert the MOFSY procedures to XDL.")
+    parser.add_argument('--sharded', action='store_true',
+                        help="Write one XDL file per experiment to converted/xdl/.")
+    mofsy2xdl(sharded=parser.parse_args().sharded)
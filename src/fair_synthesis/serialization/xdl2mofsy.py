@@ -0,0 +1,182 @@
+import io
+import os
+from typing import BinaryIO, Callable, Iterator, List
+
+from fair_synthesis.formatting.utils import load_json
+from fair_synthesis.generated_apis.procedure_data_structure import SynthesisProcedure, SynthesisElement, \
+    ComponentElement, Hardware, Metadata, ProcedureSectionsClass, ProcedureSectionClass, StepEntryClass, \
+    ReagentElement, Reagents, Quantity, Temperature, Time, Pressure, AmountUnit, TempUnit, PressureUnit, \
+    XMLType, Gas, Solvent, Role
+from fair_synthesis.serialization.mofsy2xdl import convert_mofsy_procedure_to_xdl_string
+from lxml import etree
+
+# Text that mofsy2xdl writes for a missing (None) value, e.g. <Reaction>None</Reaction>
+_NONE_TEXT = "None"
+# Placeholder left in a quantity attribute by mofsy2xdl if the quantity has no unit
+_MISSING_UNIT = "${Unit}"
+
+
+def _parse_quantity(cls, unit_enum) -> Callable[[str], object]:
+    def parse(text: str):
+        value, unit = text.split(" ", 1)
+        unit = None if unit == _MISSING_UNIT else unit_enum(unit)
+        if cls is Time:
+            return Time(float(value), unit)
+        return cls(unit, float(value))
+
+    return parse
+
+
+_STEP_ATTRIBUTE_PARSERS = {
+    "comment": str,
+    "vessel": str,
+    "amount": _parse_quantity(Quantity, AmountUnit),
+    "reagent": str,
+    "temp": _parse_quantity(Temperature, TempUnit),
+    "time": _parse_quantity(Time, AmountUnit),
+    "gas": Gas,
+    "solvent": Solvent,
+    "pressure": _parse_quantity(Pressure, PressureUnit),
+}
+
+
+def _text_value(elem):
+    """Value of an element that mofsy2xdl wrote from a plain (non-object) value."""
+    return None if elem.text == _NONE_TEXT else elem.text
+
+
+def _parse_step(elem):
+    if elem.tag == "Step":
+        return _text_value(elem)
+    attributes = {
+        name: parse(elem.get(name)) if elem.get(name) is not None else None
+        for name, parse in _STEP_ATTRIBUTE_PARSERS.items()}
+    return StepEntryClass(xml_type=XMLType(elem.tag), **attributes)
+
+
+def _parse_section(elem):
+    if elem is None:
+        return None
+    if len(elem) == 0 and elem.text is not None:
+        return _text_value(elem)
+    return ProcedureSectionClass([_parse_step(child) for child in elem])
+
+
+def _parse_procedure(elem):
+    if len(elem) == 0 and elem.text is not None:
+        return _text_value(elem)
+    return ProcedureSectionsClass(
+        prep=_parse_section(elem.find("Prep")),
+        reaction=_parse_section(elem.find("Reaction")),
+        workup=_parse_section(elem.find("Workup")))
+
+
+def _parse_hardware(elem):
+    if elem is None:
+        return None
+    components = [
+        ComponentElement(
+            chemical=component.get("chemical"),
+            comment=component.get("comment"),
+            id=component.get("id"),
+            type=component.get("type"))
+        for component in elem.iterfind("Component")]
+    return Hardware(components if components else None)
+
+
+def _parse_reagent(elem) -> ReagentElement:
+    role = elem.get("role")
+    return ReagentElement(
+        cas=elem.get("cas"),
+        comment=elem.get("comment"),
+        id=elem.get("id"),
+        inchi=elem.get("inchi"),
+        name=elem.get("name"),
+        purity=elem.get("purity"),
+        role=Role(role) if role is not None else None)
+
+
+def xdl_element_to_synthesis(elem) -> SynthesisElement:
+    """Convert a <Synthesis> element written by mofsy2xdl back into a SynthesisElement."""
+    metadata = elem.find("Metadata")
+    return SynthesisElement(
+        hardware=_parse_hardware(elem.find("Hardware")),
+        metadata=Metadata(
+            description=metadata.get("description"),
+            product=metadata.get("product"),
+            product_inchi=metadata.get("product_inchi")),
+        procedure=_parse_procedure(elem.find("Procedure")),
+        reagents=Reagents([_parse_reagent(reagent)
+                           for reagent in elem.find("Reagents").iterfind("Reagent")]))
+
+
+def iter_xdl_syntheses(source: str | BinaryIO) -> Iterator[SynthesisElement]:
+    """
+    Stream the <Synthesis> elements of an XDL file as SynthesisElement objects.
+
+    The file is parsed incrementally with iterparse and every processed element is
+    cleared and detached from the tree, so memory stays flat for large files.
+
+    Args:
+        source (str | BinaryIO): Path or binary file handle of the XDL file.
+    """
+    for _, elem in etree.iterparse(source, events=("end",), tag="Synthesis"):
+        yield xdl_element_to_synthesis(elem)
+        elem.clear(keep_tail=True)
+        parent = elem.getparent()
+        if parent is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+def xdl2mofsy(source: str | BinaryIO) -> SynthesisProcedure:
+    """Convert an XDL file written by mofsy2xdl (or an automation platform) to a MOFSY procedure."""
+    return SynthesisProcedure(list(iter_xdl_syntheses(source)))
+
+
+def _changed_experiments(original: SynthesisProcedure, parsed: SynthesisProcedure) -> List[str]:
+    if len(parsed.synthesis) != len(original.synthesis):
+        return [synthesis.metadata.description for synthesis in original.synthesis]
+    return [
+        synthesis.metadata.description
+        for synthesis, result in zip(original.synthesis, parsed.synthesis)
+        if synthesis.to_dict() != result.to_dict()]
+
+
+def check_round_trip(procedure: SynthesisProcedure) -> List[str]:
+    """
+    Convert a procedure to XDL and back and compare the results.
+
+    Returns:
+        List[str]: Experiment IDs of the syntheses that changed in the round trip.
+    """
+    xml = convert_mofsy_procedure_to_xdl_string(procedure).encode("utf-8")
+    return _changed_experiments(procedure, xdl2mofsy(io.BytesIO(xml)))
+
+
+def validate_xdl_round_trip(mofsy_file_path: str, xdl_file_path: str) -> None:
+    """
+    Check that an XDL file written by mofsy2xdl converts back to its MOFSY procedure.
+
+    Raises:
+        ValueError: If any synthesis differs after the round trip.
+    """
+    procedure = SynthesisProcedure.from_dict(load_json(mofsy_file_path))
+    changed = _changed_experiments(procedure, xdl2mofsy(xdl_file_path))
+    if changed:
+        raise ValueError(
+            f"XDL round trip of {mofsy_file_path} changed {len(changed)} experiments: {changed}")
+
+
+if __name__ == '__main__':
+    current_file_dir = __file__.rsplit('/', 1)[0]
+    for dataset, file_name in [('MOCOF-1', 'procedure_from_sciformation.json'),
+                               ('Fe–terephthalate', 'procedure_from_Fe–terephthalate.json')]:
+        mofsy_file_path = os.path.join(
+            current_file_dir, '../../..', 'data', dataset, 'converted', file_name)
+        changed = check_round_trip(
+            SynthesisProcedure.from_dict(load_json(mofsy_file_path)))
+        if changed:
+            raise AssertionError(
+                f"{dataset}: XDL round trip changed experiments {changed}")
+        print(f"{dataset}: MOFSY -> XDL -> MOFSY round trip is lossless.")